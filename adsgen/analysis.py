@@ -1,10 +1,10 @@
 import argparse
 import os
 import glob
-import matplotlib.pyplot as plt
 import numpy as np
 import csv
-from ase.io import read
+import json
+from concurrent.futures import ThreadPoolExecutor
 
 
 def load_energy_list_from_txt(file_path):
@@ -19,113 +19,326 @@ def save_energy_list_to_txt(energies, path):
     print(f"💾 Saved energies to {path}")
 
 
+def conf_id(name):
+    """Configuration index of a conf_XXX folder name (or a plain integer string)."""
+    return int(os.path.basename(str(name)).replace("conf_", ""))
+
+
+def load_energies_by_id_from_txt(file_path):
+    """
+    Read {configuration index: energy} from a text file.
+
+    Lines are either "conf_XXX energy" (as written by save_energies_by_id) or a
+    bare energy, in which case the line number is the configuration index.
+    """
+    energies = {}
+    with open(file_path) as f:
+        for i, line in enumerate(line for line in f if line.strip()):
+            fields = line.split()
+            if len(fields) >= 2:
+                energies[conf_id(fields[0])] = float(fields[1])
+            else:
+                energies[i] = float(fields[0])
+    return energies
+
+
+def save_energies_by_id(energies, path):
+    with open(path, 'w') as f:
+        for i in sorted(energies):
+            f.write(f"conf_{i:03d} {energies[i]:.6f}\n")
+    print(f"💾 Saved {len(energies)} energies to {path}")
+
+
+def iter_traj_energies(traj_path):
+    """
+    Yield (index, energy, natoms) for every frame of an ASE .traj file.
+
+    Only the stored calculator results and atomic numbers are read from each
+    frame; positions are never loaded and no Atoms objects are built, so this
+    stays fast and flat in memory for very long trajectories. Frames without
+    a stored energy yield None.
+    """
+    from ase.io import ulm
+
+    reader = ulm.open(traj_path)
+    try:
+        natoms = None
+        for i in range(len(reader)):
+            frame = reader[i]
+            keys = frame.keys()
+            if "numbers" in keys:
+                natoms = len(frame.numbers)
+            energy = None
+            if "calculator" in keys and "energy" in frame.calculator.keys():
+                energy = float(frame.calculator.energy)
+            yield i, energy, natoms
+    finally:
+        reader.close()
+
+
+def load_energies_by_id_from_traj(traj_path):
+    """Return ({frame index: energy}, {frame index: natoms}) for frames with an energy."""
+    energies, natoms = {}, {}
+    for i, energy, n in iter_traj_energies(traj_path):
+        if energy is None:
+            continue
+        energies[i] = energy
+        natoms[i] = n
+    return energies, natoms
+
+
 def load_energies_from_traj(traj_path):
-    frames = read(traj_path, index=":")
-    return sorted([float(atoms.get_potential_energy()) for atoms in frames])
+    return sorted(e for _, e, _ in iter_traj_energies(traj_path) if e is not None)
 
 
-def extract_dft_energies_from_outcars(base_dir="vasp_inputs"):
-    """Parse total energies from OUTCAR or OSZICAR in each conf_* subfolder."""
-    energies = []
+ENERGY_CACHE_FILE = ".adsgen_energy_cache.json"
+
+
+def tail_find_line(path, marker, block_size=1 << 16):
+    """
+    Return the last line of a file containing marker, or None.
+
+    Reads fixed-size blocks backwards from the end of the file, so only the
+    tail of large OUTCARs is ever read.
+    """
+    marker = marker.encode()
+    overlap = 4096
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            buf = f.read(size) + tail
+            idx = buf.rfind(marker)
+            if idx != -1:
+                start = buf.rfind(b"\n", 0, idx) + 1
+                if start > 0 or pos == 0:
+                    end = buf.find(b"\n", idx)
+                    return buf[start:end if end != -1 else None].decode(errors="replace")
+            # Keep a little of this block so markers split across blocks are found
+            tail = buf[:overlap]
+    return None
+
+
+def _energy_file(conf_dir):
+    """OUTCAR if present, else OSZICAR, else None."""
+    for name in ("OUTCAR", "OSZICAR"):
+        path = os.path.join(conf_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def read_dft_energy(path):
+    """Final free energy (OUTCAR) or E0 (OSZICAR) of a VASP run."""
+    if os.path.basename(path) == "OUTCAR":
+        line = tail_find_line(path, "free  energy   TOTEN")
+        return float(line.split()[-2]) if line else None
+    line = tail_find_line(path, "E0=")
+    return float(line.split("E0=")[-1].split()[0]) if line else None
+
+
+def extract_dft_energies_by_conf(base_dir="vasp_inputs", jobs=8, use_cache=True):
+    """
+    Map each conf_* subfolder name to its DFT energy (None if not found).
+
+    Files are parsed in parallel. Results are cached in base_dir keyed by
+    path, size and mtime, so re-running only parses new or changed files.
+    """
     conf_dirs = sorted(glob.glob(os.path.join(base_dir, "conf_*")))
+    cache_path = os.path.join(base_dir, ENERGY_CACHE_FILE)
+    cache = {}
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
 
+    energies = {os.path.basename(d): None for d in conf_dirs}
+    todo = []
+    n_cached = 0
     for d in conf_dirs:
-        outcar = os.path.join(d, "OUTCAR")
-        oszicar = os.path.join(d, "OSZICAR")
-
-        energy = None
-        if os.path.exists(outcar):
-            with open(outcar) as f:
-                for line in reversed(f.readlines()):
-                    if "free  energy   TOTEN" in line:
-                        energy = float(line.split()[-2])
-                        break
-        elif os.path.exists(oszicar):
-            with open(oszicar) as f:
-                for line in reversed(f.readlines()):
-                    if "E0=" in line:
-                        energy = float(line.split("E0=")[-1].split()[0])
-                        break
+        name = os.path.basename(d)
+        path = _energy_file(d)
+        if path is None:
+            continue
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        entry = cache.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+            energies[name] = entry["energy"]
+            n_cached += 1
+        else:
+            todo.append((name, path, key, st))
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        parsed = executor.map(lambda item: read_dft_energy(item[1]), todo)
+        for (name, path, key, st), energy in zip(todo, parsed):
+            energies[name] = energy
+            cache[key] = {"size": st.st_size, "mtime": st.st_mtime_ns, "energy": energy}
+
+    if use_cache and todo:
+        with open(cache_path, "w") as f:
+            json.dump(cache, f)
+    print(f"🔎 Parsed {len(todo)} of {len(conf_dirs)} DFT runs ({n_cached} cached)")
+    return energies
+
 
+def extract_dft_energies_from_outcars(base_dir="vasp_inputs", jobs=8, use_cache=True):
+    """Parse total energies from OUTCAR or OSZICAR in each conf_* subfolder."""
+    energies = []
+    for name, energy in extract_dft_energies_by_conf(base_dir, jobs=jobs, use_cache=use_cache).items():
         if energy is not None:
             energies.append(energy)
         else:
-            print(f"⚠️  Warning: No energy found in {d}")
+            print(f"⚠️  Warning: No energy found in {os.path.join(base_dir, name)}")
 
     return sorted(energies)
 
 
-def compare_energies(mace_energies, dft_energies, out_file):
-    if len(mace_energies) != len(dft_energies):
-        print(f"⚠️  Warning: Length mismatch – MACE={len(mace_energies)} vs DFT={len(dft_energies)}")
-        min_len = min(len(mace_energies), len(dft_energies))
-        mace_energies = mace_energies[:min_len]
-        dft_energies = dft_energies[:min_len]
+def plot_comparison(mace, dft, out_file, max_points=20000, bins=50):
+    """Parity plot (scatter, or hexbin above max_points) and error histogram of matched energies."""
+    import matplotlib.pyplot as plt
+
+    diffs = mace - dft
+    rmse = np.sqrt(np.mean(diffs ** 2))
+    mae = np.mean(np.abs(diffs))
+
+    fig, (ax_parity, ax_hist) = plt.subplots(1, 2, figsize=(11, 5))
+    if len(mace) > max_points:
+        hb = ax_parity.hexbin(dft, mace, gridsize=100, mincnt=1, bins="log", cmap="viridis")
+        fig.colorbar(hb, ax=ax_parity, label="count")
+    else:
+        ax_parity.scatter(dft, mace, s=8, alpha=0.7)
+    lo, hi = min(dft.min(), mace.min()), max(dft.max(), mace.max())
+    ax_parity.plot([lo, hi], [lo, hi], "k--", lw=1)
+    ax_parity.set_xlabel("DFT Energy (eV)")
+    ax_parity.set_ylabel("MACE Energy (eV)")
+    ax_parity.set_title(f"RMSE={rmse:.3f} eV, MAE={mae:.3f} eV")
+
+    counts, edges = np.histogram(diffs, bins=bins)
+    ax_hist.stairs(counts, edges, fill=True)
+    ax_hist.set_xlabel("MACE - DFT (eV)")
+    ax_hist.set_ylabel("Configurations")
+    ax_hist.set_title("Error distribution")
+
+    fig.suptitle(f"MACE vs DFT Adsorption Energies ({len(mace)} configurations)")
+    fig.tight_layout()
+    fig.savefig(out_file)
+    plt.close(fig)
+    print(f"✅ Saved plot to {out_file}")
+
+
+def compare_energies(mace_energies, dft_energies, out_file, natoms=None, max_points=20000, bins=50, plot=True):
+    """
+    Compare MACE and DFT energies matched by configuration index.
+
+    mace_energies and dft_energies map configuration index to energy; only
+    indices present in both are compared, and the rest are reported. natoms
+    (index -> atom count) enables per-atom errors. Metrics are computed on
+    whole arrays at once. The parity plot switches to a hexbin density plot
+    above max_points structures so it stays readable and fast to render.
+    With plot=False only the CSV is written and matplotlib is never imported.
+    """
+    mace_ids = set(mace_energies)
+    dft_ids = set(dft_energies)
+    ids = np.array(sorted(mace_ids & dft_ids), dtype=int)
+    if len(mace_ids - dft_ids) or len(dft_ids - mace_ids):
+        print(f"⚠️  Warning: {len(mace_ids - dft_ids)} MACE-only and {len(dft_ids - mace_ids)} DFT-only configurations skipped")
+    if len(ids) == 0:
+        raise ValueError("No configuration present in both MACE and DFT energies")
+
+    mace = np.fromiter((mace_energies[i] for i in ids), dtype=float, count=len(ids))
+    dft = np.fromiter((dft_energies[i] for i in ids), dtype=float, count=len(ids))
 
     # Compute metrics
-    diffs = np.array(mace_energies) - np.array(dft_energies)
+    diffs = mace - dft
     rmse = np.sqrt(np.mean(diffs ** 2))
     mae = np.mean(np.abs(diffs))
+    max_err = np.max(np.abs(diffs))
+    bias = np.mean(diffs)
 
-    print(f"\n📊 Energy Comparison Metrics:")
+    print(f"\n📊 Energy Comparison Metrics ({len(ids)} configurations):")
     print(f"  RMSE: {rmse:.4f} eV")
     print(f"  MAE:  {mae:.4f} eV")
+    print(f"  Max:  {max_err:.4f} eV")
+    print(f"  Bias: {bias:.4f} eV")
 
-    # Plot
-    plt.figure(figsize=(8, 5))
-    plt.plot(mace_energies, label="MACE", marker='o')
-    plt.plot(dft_energies, label="DFT", marker='x')
-    plt.xlabel("Configuration (sorted)")
-    plt.ylabel("Adsorption Energy (eV)")
-    plt.title(f"MACE vs DFT Adsorption Energies\nRMSE={rmse:.3f} eV, MAE={mae:.3f} eV")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(out_file)
-    print(f"✅ Saved plot to {out_file}")
+    per_atom = None
+    if natoms:
+        counts = np.array([natoms.get(i) or 0 for i in ids], dtype=float)
+        if np.all(counts > 0):
+            per_atom = diffs / counts
+            print(f"  RMSE/atom: {1000 * np.sqrt(np.mean(per_atom ** 2)):.2f} meV")
+            print(f"  MAE/atom:  {1000 * np.mean(np.abs(per_atom)):.2f} meV")
 
-    # Save CSV side-by-side
-    csv_path = out_file.replace(".png", ".csv")
+    if plot:
+        plot_comparison(mace, dft, out_file, max_points=max_points, bins=bins)
+
+    # Save CSV keyed by configuration
+    csv_path = os.path.splitext(out_file)[0] + ".csv"
     with open(csv_path, "w", newline="") as f:
         writer = csv.writer(f)
-        writer.writerow(["index", "MACE_energy", "DFT_energy", "difference"])
-        for i, (m, d) in enumerate(zip(mace_energies, dft_energies)):
-            writer.writerow([i, f"{m:.6f}", f"{d:.6f}", f"{m - d:.6f}"])
+        header = ["conf", "MACE_energy", "DFT_energy", "difference"]
+        if per_atom is not None:
+            header.append("difference_per_atom")
+        writer.writerow(header)
+        for k, i in enumerate(ids):
+            row = [f"conf_{i:03d}", f"{mace[k]:.6f}", f"{dft[k]:.6f}", f"{diffs[k]:.6f}"]
+            if per_atom is not None:
+                row.append(f"{per_atom[k]:.6f}")
+            writer.writerow(row)
     print(f"📄 Saved comparison CSV to {csv_path}")
 
+    return {"n": int(len(ids)), "rmse": float(rmse), "mae": float(mae), "max": float(max_err), "bias": float(bias)}
+
 
 def main():
     parser = argparse.ArgumentParser(description="Compare MACE and DFT adsorption energies")
     parser.add_argument("--traj", type=str, help="Trajectory file (.traj) to extract MACE energies")
-    parser.add_argument("--mace", type=str, help="Text file with MACE energies (one per line)")
-    parser.add_argument("--dft", type=str, help="Text file with DFT energies (one per line)")
+    parser.add_argument("--mace", type=str, help="Text file with MACE energies (\"conf_XXX energy\" or one per line)")
+    parser.add_argument("--dft", type=str, help="Text file with DFT energies (\"conf_XXX energy\" or one per line)")
     parser.add_argument("--dft-dir", type=str, help="Directory containing VASP OUTCAR/OSZICAR files")
     parser.add_argument("--out", type=str, required=True, help="Path to save the output plot")
     parser.add_argument("--save-mace", type=str, default="mace_extracted_energies.txt", help="File to save extracted MACE energies")
+    parser.add_argument("--jobs", type=int, default=8, help="Parallel workers for parsing OUTCAR/OSZICAR files")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update the DFT energy cache")
     parser.add_argument("--save-dft", type=str, default="dft_extracted_energies.txt", help="File to save extracted DFT energies")
+    parser.add_argument("--no-plot", action="store_true", help="Only write the CSV (skips importing matplotlib)")
+    parser.add_argument("--max-points", type=int, default=20000, help="Above this many structures the parity plot is drawn as a hexbin")
 
     args = parser.parse_args()
 
-    # Load MACE energies
+    # Load MACE energies, keyed by trajectory frame index (= conf_XXX index)
+    natoms = None
     if args.traj:
-        mace_energies = load_energies_from_traj(args.traj)
-        save_energy_list_to_txt(mace_energies, args.save_mace)
+        mace_energies, natoms = load_energies_by_id_from_traj(args.traj)
+        save_energies_by_id(mace_energies, args.save_mace)
     elif args.mace:
-        mace_energies = load_energy_list_from_txt(args.mace)
+        mace_energies = load_energies_by_id_from_txt(args.mace)
     else:
         raise ValueError("You must provide either --traj or --mace")
 
-    # Load DFT energies
+    # Load DFT energies, keyed by conf_XXX folder index
     if args.dft:
-        dft_energies = load_energy_list_from_txt(args.dft)
+        dft_energies = load_energies_by_id_from_txt(args.dft)
     elif args.dft_dir:
-        dft_energies = extract_dft_energies_from_outcars(args.dft_dir)
-        save_energy_list_to_txt(dft_energies, args.save_dft)
+        by_conf = extract_dft_energies_by_conf(args.dft_dir, jobs=args.jobs, use_cache=not args.no_cache)
+        dft_energies = {conf_id(name): e for name, e in by_conf.items() if e is not None}
+        missing = len(by_conf) - len(dft_energies)
+        if missing:
+            print(f"⚠️  Warning: No energy found in {missing} folders under {args.dft_dir}")
+        save_energies_by_id(dft_energies, args.save_dft)
     else:
         raise ValueError("You must provide either --dft or --dft-dir")
 
-    compare_energies(mace_energies, dft_energies, args.out)
+    compare_energies(mace_energies, dft_energies, args.out, natoms=natoms, max_points=args.max_points,
+                     plot=not args.no_plot)
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,372 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import importlib.util
+import platform
+import tempfile
+import contextlib
+import subprocess
+from io import StringIO
+
+import numpy as np
+import ase
+from ase.build import fcc111, molecule
+from ase.calculators.emt import EMT
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io import read, write
+
+from adsgen.placement import PlacementEngine
+from adsgen.relaxation import relax_batch, relax_structure
+from adsgen.output import StructureWriter
+from adsgen.vasp_io import traj_to_vasp_inputs
+from adsgen.analysis import extract_dft_energies_by_conf, load_energies_by_id_from_traj
+
+BENCHMARKS = ["startup", "placement", "relaxation", "io", "vasp_staging", "analysis", "bo"]
+
+# Console scripts (see setup.py) and the modules holding their main()
+CONSOLE_SCRIPTS = {
+    "adsgen-generate": "adsgen.generator",
+    "adsgen-campaign": "adsgen.campaign",
+    "adsgen-vaspgen": "adsgen.structure_io",
+    "adsgen-compare": "adsgen.analysis",
+    "adsgen-select": "adsgen.selection",
+    "adsgen-uncertainty": "adsgen.uncertainty",
+    "adsgen-benchmark": "adsgen.benchmark",
+}
+HEAVY_MODULES = ["torch", "mace", "boss", "matplotlib", "scipy"]
+
+
+class CalculatorEvaluator:
+    """relax_batch evaluator that runs any ASE calculator one structure at a time."""
+
+    def __init__(self, calc):
+        self.calc = calc
+
+    def __call__(self, atoms_list):
+        energies, forces = [], []
+        for atoms in atoms_list:
+            probe = atoms.copy()
+            probe.calc = self.calc
+            energies.append(probe.get_potential_energy())
+            forces.append(probe.get_forces(apply_constraint=False))
+        return np.array(energies), forces
+
+
+def make_synthetic_system(workdir, size=(4, 4, 3), metal="Cu", adsorbate="CO"):
+    """Write a small EMT-compatible slab (surface.inp) and molecule (molecule.xyz) into workdir."""
+    os.makedirs(workdir, exist_ok=True)
+    slab = fcc111(metal, size=size, vacuum=10.0, orthogonal=True)
+    slab.center(axis=2)
+    write(os.path.join(workdir, "surface.inp"), slab, format="vasp")
+    write(os.path.join(workdir, "molecule.xyz"), molecule(adsorbate))
+    return slab.cell.lengths()[:2]
+
+
+def timed(fn, repeat=3):
+    """Best and mean wall time of fn() over repeat calls; the last return value is kept."""
+    times = []
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        times.append(time.perf_counter() - start)
+    return {"best_s": min(times), "mean_s": float(np.mean(times)), "repeat": repeat}, value
+
+
+def _random_points(engine, bounds, n, seed=0):
+    rng = np.random.default_rng(seed)
+    lo = np.array([bounds[dim][0] for dim in engine.opt_dims])
+    hi = np.array([bounds[dim][1] for dim in engine.opt_dims])
+    return lo + rng.random((n, len(lo))) * (hi - lo)
+
+
+def _bounds(cell_xy):
+    return {"x": (0, cell_xy[0]), "y": (0, cell_xy[1]), "z": (0, 2.0),
+            "alpha": (0, 359), "beta": (0, 359), "gamma": (0, 359)}
+
+
+def bench_startup(repeat=3):
+    """
+    Wall time of `<script> --help` in a fresh interpreter for every console script.
+
+    Also records which heavy dependencies each script's module imports, so
+    a regression that pulls torch or matplotlib back into a light command
+    shows up even where those packages are not installed.
+    """
+    results = {}
+    probe = ("import sys, json, importlib; importlib.import_module(sys.argv[1]); "
+             f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    baseline, _ = timed(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True), repeat)
+    results["python"] = baseline
+    for script, module in CONSOLE_SCRIPTS.items():
+        cmd = [sys.executable, "-m", module, "--help"]
+        stats, proc = timed(lambda: subprocess.run(cmd, capture_output=True, text=True), repeat)
+        stats["exit_code"] = proc.returncode
+        loaded = subprocess.run([sys.executable, "-c", probe, module], capture_output=True, text=True)
+        stats["heavy_imports"] = json.loads(loaded.stdout) if loaded.returncode == 0 else None
+        results[script] = stats
+    return results
+
+
+def bench_placement(workdir, cell_xy, n_poses=1000, repeat=3):
+    engine = PlacementEngine(os.path.join(workdir, "surface.inp"), os.path.join(workdir, "molecule.xyz"))
+    X = _random_points(engine, _bounds(cell_xy), n_poses)
+    stats, _ = timed(lambda: engine.build_batch(X), repeat)
+    stats["n_structures"] = n_poses
+    stats["per_structure_us"] = 1e6 * stats["best_s"] / n_poses
+    return stats
+
+
+def bench_relaxation(workdir, cell_xy, n_structures=4, fmax=0.05, steps=200, repeat=1):
+    engine = PlacementEngine(os.path.join(workdir, "surface.inp"), os.path.join(workdir, "molecule.xyz"),
+                             opt_dims=["x", "y", "alpha"])
+    X = _random_points(engine, _bounds(cell_xy), n_structures, seed=1)
+    calc = EMT()
+
+    def serial():
+        # Keep the optimizer's per-step log out of the benchmark output
+        with contextlib.redirect_stdout(StringIO()):
+            return [relax_structure(atoms, calc, fmax=fmax, steps=steps)[0] for atoms in engine.build_batch(X)]
+
+    def batched():
+        return relax_batch(engine.build_batch(X), CalculatorEvaluator(calc), fmax=fmax, steps=steps)
+
+    serial_stats, _ = timed(serial, repeat)
+    batch_stats, outcome = timed(batched, repeat)
+    batch_stats["total_steps"] = int(sum(nsteps for _, nsteps, _ in outcome))
+    return {"n_structures": n_structures, "fmax": fmax, "serial_lbfgs": serial_stats, "batched_fire": batch_stats}
+
+
+def _relaxed_frames(workdir, cell_xy, n_frames):
+    """Placed structures carrying a cheap single-point EMT energy, for the I/O benchmarks."""
+    engine = PlacementEngine(os.path.join(workdir, "surface.inp"), os.path.join(workdir, "molecule.xyz"))
+    frames = engine.build_batch(_random_points(engine, _bounds(cell_xy), n_frames, seed=2))
+    energies, forces = CalculatorEvaluator(EMT())(frames)
+    for atoms, energy, f in zip(frames, energies, forces):
+        atoms.calc = SinglePointCalculator(atoms, energy=float(energy), forces=f)
+    return frames
+
+
+def bench_io(workdir, frames, repeat=3):
+    out = os.path.join(workdir, "io")
+    os.makedirs(out, exist_ok=True)
+    traj = os.path.join(out, "bench.traj")
+    combined = os.path.join(out, "combined.xyz")
+
+    def stream():
+        writer = StructureWriter(os.path.join(out, "initial.xyz"), traj, combined)
+        for atoms in frames:
+            writer.write_initial(atoms)
+            writer.write_relaxed(atoms)
+        writer.close()
+
+    write_stats, _ = timed(stream, repeat)
+    read_traj, _ = timed(lambda: read(traj, index=":"), repeat)
+    read_xyz, _ = timed(lambda: read(combined, index=":"), repeat)
+    return {"n_frames": len(frames), "write_stream": write_stats, "read_traj": read_traj, "read_xyz": read_xyz,
+            "traj_bytes": os.path.getsize(traj), "xyz_bytes": os.path.getsize(combined)}
+
+
+def bench_vasp_staging(workdir, traj, repeat=3):
+    stage_dir = os.path.join(workdir, "staging")
+    os.makedirs(stage_dir, exist_ok=True)
+    for name in ("INCAR", "KPOINTS", "POTCAR"):
+        with open(os.path.join(stage_dir, name), "w") as f:
+            # POTCARs are large; pad the stand-in so copying costs something realistic.
+            f.write(f"{name} placeholder\n" + ("x" * 79 + "\n") * (20000 if name == "POTCAR" else 1))
+
+    def stage():
+        target = os.path.join(stage_dir, "vasp_inputs")
+        shutil.rmtree(target, ignore_errors=True)
+        with contextlib.redirect_stdout(StringIO()):
+            return traj_to_vasp_inputs(traj, target, template_dir=stage_dir)
+
+    stats, summary = timed(stage, repeat)
+    stats["n_structures"] = summary["folders"]
+    stats["placed"] = summary["placed"]
+    stats["mb_avoided"] = round(summary["bytes_avoided"] / 1e6, 1)
+    return stats
+
+
+def _fake_outcars(base_dir, energies, filler_lines=20000):
+    """conf_XXX/OUTCAR files of realistic size whose final TOTEN line holds the given energies."""
+    filler = " " * 4 + "POSITION" + " " * 40 + "TOTAL-FORCE (eV/Angst)\n"
+    body = filler * filler_lines
+    for i, energy in enumerate(energies):
+        conf = os.path.join(base_dir, f"conf_{i:03d}")
+        os.makedirs(conf, exist_ok=True)
+        with open(os.path.join(conf, "OUTCAR"), "w") as f:
+            f.write(body)
+            f.write(f"  free  energy   TOTEN  =      {energy:.8f} eV\n")
+            f.write(body[:len(filler) * 200])
+            f.write(" General timing and accounting informations for this job:\n")
+
+
+def bench_analysis(workdir, traj, energies, jobs=8, repeat=3):
+    base_dir = os.path.join(workdir, "analysis", "vasp_inputs")
+    _fake_outcars(base_dir, energies)
+
+    def cold():
+        return extract_dft_energies_by_conf(base_dir, jobs=jobs, use_cache=False)
+
+    def warm():
+        return extract_dft_energies_by_conf(base_dir, jobs=jobs, use_cache=True)
+
+    cold_stats, _ = timed(cold, repeat)
+    warm()  # populate the cache
+    warm_stats, _ = timed(warm, repeat)
+    traj_stats, _ = timed(lambda: load_energies_by_id_from_traj(traj), repeat)
+    return {"n_runs": len(energies), "outcar_cold": cold_stats, "outcar_cached": warm_stats, "traj_energies": traj_stats}
+
+
+def bench_bo(workdir, nstruct=12):
+    """
+    End-to-end run_adsorption_optimization with EMT in place of MACE.
+
+    Relaxation time is measured inside the run, so the remainder is the
+    BO, placement and bookkeeping overhead per evaluation.
+    """
+    # surface.py imports BOSS lazily, so check for it before starting a run
+    if importlib.util.find_spec("boss") is None:
+        return {"skipped": "BOSS is not installed"}
+    import adsgen.surface as surface
+
+    relax_time = [0.0]
+    original_relax = surface.relax_structure
+    original_calc = surface.get_mace_calculator
+
+    def timed_relax(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original_relax(*args, **kwargs)
+        finally:
+            relax_time[0] += time.perf_counter() - start
+
+    surface.relax_structure = timed_relax
+    surface.get_mace_calculator = lambda user_model_path=None, dtype="float64": EMT()
+    out = os.path.join(workdir, "bo")
+    os.makedirs(out, exist_ok=True)
+    for name in ("surface.inp", "molecule.xyz"):
+        shutil.copy(os.path.join(workdir, name), os.path.join(out, name))
+
+    try:
+        def run():
+            surface.run_adsorption_optimization(
+                output_dir=out, opt_dims=["x", "y", "alpha"], nstruct=nstruct,
+                initpts=min(5, nstruct), iterpts=max(nstruct - 5, 0),
+                relax_options={"fmax": 0.05, "max_steps": 200},
+            )
+        stats, _ = timed(run, 1)
+    finally:
+        surface.relax_structure = original_relax
+        surface.get_mace_calculator = original_calc
+
+    stats["n_evaluations"] = nstruct
+    stats["relaxation_s"] = relax_time[0]
+    stats["overhead_s"] = stats["best_s"] - relax_time[0]
+    stats["overhead_per_evaluation_s"] = stats["overhead_s"] / nstruct
+    return stats
+
+
+def run_benchmarks(only=None, workdir=None, size=(4, 4, 3), n_poses=1000, n_frames=200,
+                   n_relax=4, nstruct=12, repeat=3, jobs=8):
+    """
+    Time each pipeline stage on a synthetic Cu(111)/CO system with EMT.
+
+    Everything runs on the CPU without network access or a MACE model.
+    Returns a JSON-serializable dict with environment metadata and one
+    entry per benchmark.
+    """
+    only = only or BENCHMARKS
+    workdir = workdir or tempfile.mkdtemp(prefix="adsgen_bench_")
+    cell_xy = make_synthetic_system(workdir, size=size)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "ase": ase.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "slab_size": list(size),
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+    results = report["results"]
+
+    frames = None
+    traj = os.path.join(workdir, "io", "bench.traj")
+    if {"io", "vasp_staging", "analysis"} & set(only):
+        frames = _relaxed_frames(workdir, cell_xy, n_frames)
+        if "io" not in only:
+            bench_io(workdir, frames, repeat=1)
+
+    for name in only:
+        print(f"⏱️ Running benchmark: {name}")
+        if name == "startup":
+            results[name] = bench_startup(repeat=repeat)
+        elif name == "placement":
+            results[name] = bench_placement(workdir, cell_xy, n_poses=n_poses, repeat=repeat)
+        elif name == "relaxation":
+            results[name] = bench_relaxation(workdir, cell_xy, n_structures=n_relax)
+        elif name == "io":
+            results[name] = bench_io(workdir, frames, repeat=repeat)
+        elif name == "vasp_staging":
+            results[name] = bench_vasp_staging(workdir, traj, repeat=repeat)
+        elif name == "analysis":
+            energies = [atoms.get_potential_energy() for atoms in frames]
+            results[name] = bench_analysis(workdir, traj, energies, jobs=jobs, repeat=repeat)
+        elif name == "bo":
+            results[name] = bench_bo(workdir, nstruct=nstruct)
+    return report
+
+
+def print_summary(report):
+    print("\n📊 Benchmark summary")
+    for name, result in report["results"].items():
+        if "skipped" in result:
+            print(f"  {name:<14} skipped: {result['skipped']}")
+            continue
+        timings = {k: v["best_s"] for k, v in result.items() if isinstance(v, dict) and "best_s" in v}
+        if "best_s" in result:
+            timings = {"total": result["best_s"], **timings}
+        print(f"  {name:<14} " + ", ".join(f"{k}={v:.4f}s" for k, v in timings.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline adsgen benchmarks with an EMT stand-in for MACE")
+    parser.add_argument("--out", type=str, default="adsgen_benchmark.json", help="JSON file to write the results to")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Run only these benchmarks")
+    parser.add_argument("--workdir", type=str, help="Scratch directory (default: a new temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory")
+    parser.add_argument("--slab-size", type=int, nargs=3, default=[4, 4, 3], help="Synthetic Cu(111) slab repetitions (second must be even)")
+    parser.add_argument("--poses", type=int, default=1000, help="Poses built in the placement benchmark")
+    parser.add_argument("--frames", type=int, default=200, help="Frames written in the I/O, staging and analysis benchmarks")
+    parser.add_argument("--relax", type=int, default=4, help="Structures relaxed in the relaxation benchmark")
+    parser.add_argument("--nstruct", type=int, default=12, help="Evaluations in the end-to-end BO benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per timing (best is reported)")
+    parser.add_argument("--jobs", type=int, default=8, help="Parallel workers for OUTCAR parsing")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="adsgen_bench_")
+    try:
+        report = run_benchmarks(only=args.only, workdir=workdir, size=tuple(args.slab_size),
+                                n_poses=args.poses, n_frames=args.frames, n_relax=args.relax,
+                                nstruct=args.nstruct, repeat=args.repeat, jobs=args.jobs)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print_summary(report)
+    print(f"\n💾 Saved benchmark results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
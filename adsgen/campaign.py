@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import time
+import inspect
+import argparse
+import multiprocessing
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+STATUS_FILE = "campaign_status.json"
+
+
+def load_manifest(path):
+    """
+    Read a campaign manifest (JSON) into a list of per-system settings.
+
+    The manifest has optional "defaults" applied to every system and a list
+    of "systems", each with a unique "name", a "mol" and a "surf" path
+    (relative to the manifest) and any run_generation keyword, e.g.
+    nstruct, opt_dims, bounds, relax_options or skip_vasp. "model" at the
+    top level selects the MACE model for the whole campaign.
+    """
+    from adsgen.generator import run_generation
+
+    with open(path) as f:
+        manifest = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(path))
+    allowed = set(inspect.signature(run_generation).parameters) - {"mol_path", "surf_path", "output_dir"}
+    defaults = manifest.get("defaults", {})
+    systems = []
+    names = set()
+    for entry in manifest["systems"]:
+        system = {**defaults, **entry}
+        name = system.pop("name")
+        if name in names:
+            raise ValueError(f"❌ Duplicate system name in manifest: {name}")
+        names.add(name)
+
+        kwargs = {"mol_path": os.path.join(base, system.pop("mol")),
+                  "surf_path": os.path.join(base, system.pop("surf"))}
+        if "bounds" in system:
+            system["bounds_dict"] = {dim: tuple(v) for dim, v in system.pop("bounds").items()}
+        unknown = set(system) - allowed
+        if unknown:
+            raise ValueError(f"❌ Unknown settings for system '{name}': {', '.join(sorted(unknown))}")
+        kwargs.update(system)
+        systems.append((name, kwargs))
+    model = manifest.get("model")
+    return (os.path.join(base, model) if model else None), systems
+
+
+def estimated_cost(kwargs):
+    """Relative cost of a system: evaluations times atoms in the surface."""
+    from ase.io import read
+
+    return kwargs.get("nstruct", 100) * len(read(kwargs["surf_path"], format="vasp"))
+
+
+def _run_system(task):
+    """Run one system with its output captured to run.log; returns (name, status, seconds, error)."""
+    from adsgen.generator import run_generation
+
+    name, kwargs, output_dir, model_path = task
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    with open(os.path.join(output_dir, "run.log"), "a") as log, redirect_stdout(log), redirect_stderr(log):
+        try:
+            run_generation(output_dir=output_dir, model_path=model_path, **kwargs)
+            return name, "done", time.perf_counter() - start, None
+        except Exception as e:
+            traceback.print_exc()
+            return name, "failed", time.perf_counter() - start, str(e)
+
+
+def campaign_dtypes(systems):
+    """
+    Model precisions the systems use, float64 first.
+
+    Every dtype and screen_dtype of the systems' execution profiles is
+    included, and float64 as well for systems that validate a lower
+    precision, since the check compares against it and may fall back to it.
+    """
+    from adsgen.execution import execution_profile
+
+    dtypes = set()
+    for _, kwargs in systems:
+        profile = execution_profile(kwargs.get("execution"))
+        dtypes.update({profile["dtype"], profile["screen_dtype"] or profile["dtype"]})
+        if kwargs.get("validate_samples"):
+            dtypes.add("float64")
+    return sorted(dtypes, reverse=True)
+
+
+def _init_campaign_worker(model_path, torch_threads, dtypes=("float64",)):
+    """Load the MACE model once per precision in each campaign worker before any system runs."""
+    from adsgen.workers import _init_worker
+    _init_worker(model_path, torch_threads, *dtypes)
+
+
+class Campaign:
+    """
+    Runs many molecule/surface systems through run_generation.
+
+    Systems run in this process or in a pool of worker processes, each of
+    which loads torch and the MACE model once and then runs one system
+    after another. Systems are scheduled largest first so the pool stays
+    busy at the end, every system writes to its own output directory, and
+    campaign_status.json records per-system progress so a rerun skips the
+    systems that already finished.
+    """
+
+    def __init__(self, systems, output_dir, model_path=None, n_workers=1, torch_threads=1):
+        self.systems = dict(systems)
+        self.output_dir = output_dir
+        self.model_path = model_path
+        self.n_workers = n_workers
+        self.torch_threads = torch_threads
+        self.status_path = os.path.join(output_dir, STATUS_FILE)
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.status = {}
+        if os.path.exists(self.status_path):
+            with open(self.status_path) as f:
+                self.status = json.load(f)
+        for name in self.systems:
+            if self.status.get(name, {}).get("status") != "done":
+                self.status[name] = {"status": "pending", "output_dir": self.system_dir(name)}
+
+    def system_dir(self, name):
+        return os.path.join(self.output_dir, name)
+
+    def save_status(self):
+        tmp = self.status_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.status, f, indent=2)
+        os.replace(tmp, self.status_path)
+
+    def schedule(self, rerun=False):
+        """Names of the systems to run, most expensive first."""
+        todo = [name for name in self.systems if rerun or self.status[name]["status"] != "done"]
+        return sorted(todo, key=lambda name: estimated_cost(self.systems[name]), reverse=True)
+
+    def _finished(self, name, status, seconds, error, done, total, start):
+        self.status[name].update(status=status, seconds=round(seconds, 1), error=error)
+        self.save_status()
+        elapsed = time.perf_counter() - start
+        eta = elapsed / done * (total - done)
+        mark = "✅" if status == "done" else "❌"
+        print(f"{mark} [{done}/{total}] {name} {status} in {seconds:.1f} s "
+              f"(elapsed {elapsed:.0f} s, ETA {eta:.0f} s)" + (f": {error}" if error else ""))
+
+    def run(self, rerun=False):
+        order = self.schedule(rerun)
+        skipped = len(self.systems) - len(order)
+        print(f"🚀 Campaign: {len(order)} systems to run, {skipped} already done, {self.n_workers} worker(s)")
+        tasks = [(name, self.systems[name], self.system_dir(name), self.model_path) for name in order]
+        for name in order:
+            self.status[name].update(status="queued", error=None)
+        self.save_status()
+
+        start = time.perf_counter()
+        if self.n_workers == 1:
+            # A single long-lived process: the model is loaded by the first system and reused
+            for done, task in enumerate(tasks, 1):
+                print(f"▶️ Running {task[0]} → {task[2]}")
+                self.status[task[0]]["status"] = "running"
+                self.save_status()
+                self._finished(*_run_system(task), done, len(tasks), start)
+        else:
+            # Spawn rather than fork, as in RelaxationPool
+            with ProcessPoolExecutor(max_workers=self.n_workers,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_campaign_worker,
+                                     initargs=(self.model_path, self.torch_threads,
+                                               campaign_dtypes(self.systems.items()))) as executor:
+                futures = [executor.submit(_run_system, task) for task in tasks]
+                for done, future in enumerate(as_completed(futures), 1):
+                    self._finished(*future.result(), done, len(tasks), start)
+
+        self.print_summary()
+        return self.status
+
+    def print_summary(self):
+        counts = {}
+        for entry in self.status.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        total_time = sum(entry.get("seconds") or 0.0 for entry in self.status.values())
+        print("\n📊 Campaign summary: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+              + f", {total_time:.0f} s of system time")
+        for name, entry in self.status.items():
+            if entry["status"] == "failed":
+                print(f"  ❌ {name}: {entry.get('error')} (see {os.path.join(entry['output_dir'], 'run.log')})")
+        print(f"📄 Status written to {self.status_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run many molecule/surface systems from a JSON manifest with one model load per worker."
+    )
+    parser.add_argument("manifest", type=str, help="JSON manifest with 'systems' (and optional 'defaults', 'model')")
+    parser.add_argument("--out", type=str, default="campaign", help="Campaign output directory (one subdirectory per system)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes, each running whole systems with its own resident model")
+    parser.add_argument("--torch-threads", type=int, default=1, help="Torch threads per worker process")
+    parser.add_argument("--model", type=str, help="MACE model path (overrides the manifest)")
+    parser.add_argument("--rerun", action="store_true", help="Also rerun systems already marked done")
+    args = parser.parse_args()
+
+    model_path, systems = load_manifest(args.manifest)
+    campaign = Campaign(systems, args.out, model_path=args.model or model_path,
+                        n_workers=args.workers, torch_threads=args.torch_threads)
+    status = campaign.run(rerun=args.rerun)
+    if any(entry["status"] == "failed" for entry in status.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import numpy as np
+
+DEFAULT_STOP_OPTIONS = {
+    "patience": None,            # stop after this many evaluations without improving the best energy
+    "min_improvement": 0.01,     # improvement of the best energy that resets the patience counter (eV)
+    "incumbent_std": None,       # stop once the GP std at the predicted global minimum is below this (eV)
+    "discovery_window": None,    # evaluations over which the rate of new distinct minima is measured
+    "min_discovery_rate": 0.05,  # stop if fewer new distinct minima per evaluation than this in the window
+    "distinct_tol": 0.01,        # relaxed energies closer than this count as the same minimum (eV)
+    "min_evals": 0,              # never stop before this many evaluations
+}
+
+
+class ConvergenceMonitor:
+    """
+    Decides when the BO loop has stopped paying off.
+
+    The objective reports every value it returns to BOSS (observe) and, after
+    observing it, the relaxed energy of that evaluation (add_minimum). Three optional criteria are checked:
+    stagnation of the best energy for ``patience`` evaluations, the GP
+    posterior std at the predicted global minimum dropping below
+    ``incumbent_std``, and the rate of new distinct minima over the last
+    ``discovery_window`` evaluations falling below ``min_discovery_rate``.
+    An instance is installed as BOSS's convergence checker, which calls it
+    with the BO results after each iteration; the first criterion met is
+    kept in ``reason``.
+    """
+
+    def __init__(self, options=None):
+        self.options = dict(DEFAULT_STOP_OPTIONS, **(options or {}))
+        self.evaluations = 0
+        self.best = np.inf
+        self.best_at = 0
+        self.minima = []
+        self.discovered_at = []
+        self.reason = None
+
+    @property
+    def enabled(self):
+        o = self.options
+        return any(o[key] is not None for key in ("patience", "incumbent_std", "discovery_window"))
+
+    def observe(self, energy):
+        """Count one evaluation and its objective value."""
+        self.evaluations += 1
+        if np.isfinite(energy) and energy < self.best - self.options["min_improvement"]:
+            self.best_at = self.evaluations
+        if np.isfinite(energy) and energy < self.best:
+            self.best = float(energy)
+
+    def add_minimum(self, energy, at=None):
+        """
+        Record a relaxed energy; a new distinct minimum if no known one is within distinct_tol.
+
+        at is the 1-based evaluation that found it, by default the last one
+        observed.
+        """
+        if any(abs(energy - e) < self.options["distinct_tol"] for e in self.minima):
+            return
+        self.minima.append(float(energy))
+        self.discovered_at.append(self.evaluations if at is None else at)
+
+    def check(self, incumbent_std=None):
+        """Return the stop reason if a criterion is met, else None."""
+        o = self.options
+        if self.evaluations < o["min_evals"]:
+            return None
+        if o["patience"] is not None and self.evaluations - self.best_at >= o["patience"]:
+            return (f"stagnation: best energy {self.best:.6f} eV not improved by more than "
+                    f"{o['min_improvement']} eV in the last {self.evaluations - self.best_at} evaluations")
+        if o["incumbent_std"] is not None and incumbent_std is not None and incumbent_std < o["incumbent_std"]:
+            return f"incumbent uncertainty: GP std {incumbent_std:.4g} eV at the predicted minimum < {o['incumbent_std']} eV"
+        window = o["discovery_window"]
+        if window is not None and self.evaluations >= window:
+            recent = sum(1 for at in self.discovered_at if at > self.evaluations - window)
+            if recent / window < o["min_discovery_rate"]:
+                return (f"discovery rate: {recent} new distinct minima in the last {window} evaluations "
+                        f"({len(self.minima)} in total)")
+        return None
+
+    def __call__(self, results):
+        if self.reason is None:
+            self.reason = self.check(incumbent_std(results))
+        return self.reason is not None
+
+
+def incumbent_std(results):
+    """
+    GP posterior std (eV) at the predicted global minimum of the latest BOSS iteration, if available.
+
+    BOSS records the posterior variance there (nu_glmin), so this is its
+    square root.
+    """
+    try:
+        nu = float(np.ravel(results.select("nu_glmin", -1))[0])
+    except Exception:
+        return None
+    return float(np.sqrt(max(nu, 0.0)))
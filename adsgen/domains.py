@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import shutil
+import itertools
+import multiprocessing
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+DOMAINS_DIR = "domains"
+DOMAINS_FILE = "domains.json"
+
+# Share of a subdomain's budget spent on initial points when --initpts/--iterpts
+# are not given, and the smallest split that still leaves room for BO
+DOMAIN_INIT_FRACTION = 0.2
+MIN_DOMAIN_INITPTS = 2
+MIN_DOMAIN_ITERPTS = 3
+
+
+def default_split_dims(opt_dims):
+    """Surface site regions (x and y) if they are optimized, else angular sectors of alpha."""
+    dims = [dim for dim in ("x", "y") if dim in opt_dims]
+    if not dims:
+        dims = [dim for dim in ("alpha", "beta", "gamma") if dim in opt_dims][:1]
+    if not dims:
+        raise ValueError(f"❌ No dimension to split among {opt_dims}")
+    return dims
+
+
+def grid_shape(n_domains, n_dims):
+    """Number of intervals per split dimension, as even as the prime factors of n_domains allow."""
+    factors = []
+    m, p = n_domains, 2
+    while m > 1:
+        while m % p == 0:
+            factors.append(p)
+            m //= p
+        p += 1
+    shape = [1] * n_dims
+    for f in sorted(factors, reverse=True):
+        shape[int(np.argmin(shape))] *= f
+    return shape
+
+
+def split_bounds(bounds, n_domains, split_dims):
+    """Tile the bounds box into n_domains boxes by cutting each split dimension into equal intervals."""
+    shape = grid_shape(n_domains, len(split_dims))
+    edges = [np.linspace(*bounds[dim], count + 1) for dim, count in zip(split_dims, shape)]
+    domains = []
+    for cell in itertools.product(*[range(count) for count in shape]):
+        sub = dict(bounds)
+        for dim, e, k in zip(split_dims, edges, cell):
+            sub[dim] = (float(e[k]), float(e[k + 1]))
+        domains.append(sub)
+    return domains
+
+
+def split_budget(nstruct, n_domains):
+    """Per-domain structure counts summing to nstruct."""
+    base, extra = divmod(nstruct, n_domains)
+    return [base + (1 if i < extra else 0) for i in range(n_domains)]
+
+
+def domain_points(n, init_fraction=DOMAIN_INIT_FRACTION):
+    """
+    (initpts, iterpts) for a subdomain with a budget of n structures.
+
+    init_fraction of the budget, but at least MIN_DOMAIN_INITPTS, goes to
+    initial points and the rest to BO iterations; iterpts is 0 only when n
+    is too small for anything but initial points.
+    """
+    initpts = min(n, max(MIN_DOMAIN_INITPTS, int(round(n * init_fraction))))
+    return initpts, n - initpts
+
+
+def _run_domain(task):
+    """Run one subdomain inside its own directory; returns (index, status, seconds, error)."""
+    from adsgen.surface import run_adsorption_optimization
+
+    index, domain_dir, kwargs = task
+    start = time.perf_counter()
+    cwd = os.getcwd()
+    # BOSS writes boss.out/boss.rst and postprocessing/ to the working directory
+    os.chdir(domain_dir)
+    try:
+        with open("run.log", "a") as log, redirect_stdout(log), redirect_stderr(log):
+            try:
+                run_adsorption_optimization(output_dir=domain_dir, **kwargs)
+                return index, "done", time.perf_counter() - start, None
+            except Exception as e:
+                traceback.print_exc()
+                return index, "failed", time.perf_counter() - start, str(e)
+    finally:
+        os.chdir(cwd)
+
+
+def merge_domains(output_dir, domain_dirs, opt_dims):
+    """
+    Merge the outputs of finished subdomains into output_dir.
+
+    Writes the same files as a single run (initial configurations, trajectory,
+    combined training xyz, evaluations.db and optimization log), with steps
+    renumbered across subdomains. Returns per-domain (relaxed count, best
+    energy) pairs.
+    """
+    from ase.io import iread
+    from adsgen.output import StructureWriter
+    from adsgen.store import EvaluationStore
+    from adsgen.surface import log_step
+
+    log_file = os.path.join(output_dir, "optimization_log.txt")
+    writer = StructureWriter(os.path.join(output_dir, "initial_configurations.xyz"),
+                             os.path.join(output_dir, f"{len(opt_dims)}D_optimization_trajectory.traj"),
+                             os.path.join(output_dir, "training_data_mace_opt.xyz"))
+    store = EvaluationStore(os.path.join(output_dir, "evaluations.db"), fresh=True)
+    with open(log_file, 'w') as f:
+        f.write("Step-by-step Optimization Log (merged subdomains)\n" + "=" * 50 + "\n")
+
+    stats = []
+    step = 0
+    for i, domain_dir in enumerate(domain_dirs):
+        initial = os.path.join(domain_dir, "initial_configurations.xyz")
+        db_path = os.path.join(domain_dir, "evaluations.db")
+        if not os.path.exists(db_path):
+            stats.append((0, None))
+            continue
+        if os.path.exists(initial) and os.path.getsize(initial) > 0:
+            for atoms in iread(initial, index=":"):
+                writer.write_initial(atoms)
+                store.add_initial(atoms)
+
+        energies = []
+        with open(log_file, 'a', encoding='utf-8') as log:
+            log.write(f"Subdomain {i}: {domain_dir}\n" + "-" * 50 + "\n")
+        for _, pose, atoms, energy in EvaluationStore(db_path).load():
+            step += 1
+            writer.write_relaxed(atoms)
+            store.add(step, pose, atoms)
+            log_step(step, energy, *pose, log_file)
+            energies.append(energy)
+        stats.append((len(energies), min(energies) if energies else None))
+    writer.close()
+    return stats
+
+
+def run_decomposed_optimization(output_dir="results", n_domains=2, split_dims=None, domain_workers=1,
+                                nstruct=100, opt_dims=None, bounds=None, model_paths=None,
+                                torch_threads=1, resume=False, symmetry_reduce=False, symmetry_tol=0.1, **kwargs):
+    """
+    Run independent BO loops on subdomains of the search space and merge them.
+
+    The bounds box is cut into n_domains boxes along split_dims (default:
+    x and y, i.e. surface site regions, else alpha sectors) and nstruct
+    (initpts + iterpts if both are given) is divided evenly between them.
+    Each subdomain splits its share into initial points and BO iterations
+    in the same proportion as initpts:iterpts, else with domain_points'
+    default, and a warning is printed if a share leaves fewer than
+    MIN_DOMAIN_ITERPTS iterations. Each subdomain runs
+    run_adsorption_optimization in output_dir/domains/domain_XX with its own
+    smaller GP, so surrogate cost grows with nstruct / n_domains rather than
+    nstruct. With domain_workers > 1 subdomains run in parallel, one per
+    worker process with a resident MACE model. The merged outputs have the
+    usual file names in output_dir, and domains.json records each
+    subdomain's bounds, budget, status and best energy. Other keywords
+    apply to every subdomain. With
+    symmetry_reduce=True the irreducible domain is split, not the given
+    bounds.
+    """
+    from adsgen.surface import DEFAULT_BOUNDS, DEFAULT_OPT_DIMS
+
+    if domain_workers > 1 and kwargs.get("n_workers", 1) > 1:
+        raise ValueError("❌ Use either parallel subdomains or relaxation workers, not both")
+    opt_dims = list(opt_dims) if opt_dims is not None else list(DEFAULT_OPT_DIMS)
+    bounds = dict(DEFAULT_BOUNDS, **(bounds or {}))
+    split_dims = list(split_dims) if split_dims else default_split_dims(opt_dims)
+    missing = [dim for dim in split_dims if dim not in opt_dims]
+    if missing:
+        raise ValueError(f"❌ Cannot split along dimensions that are not optimized: {missing}")
+
+    output_dir = os.path.abspath(output_dir)
+    domain = None
+    if symmetry_reduce:
+        from adsgen.placement import PlacementEngine
+        from adsgen.symmetry import SearchDomain
+        engine = PlacementEngine(os.path.join(output_dir, "surface.inp"), os.path.join(output_dir, "molecule.xyz"),
+                                 opt_dims=opt_dims)
+        domain = SearchDomain(engine, opt_dims, bounds, tol=symmetry_tol)
+        bounds = domain.bounds
+        print(domain.describe())
+        with open(os.path.join(output_dir, "symmetry_domain.json"), "w") as f:
+            json.dump(domain.to_dict(), f, indent=2)
+    sub_bounds = split_bounds(bounds, n_domains, split_dims)
+    initpts, iterpts = kwargs.pop("initpts", None), kwargs.pop("iterpts", None)
+    init_fraction = DOMAIN_INIT_FRACTION
+    if initpts is not None and iterpts is not None:
+        nstruct = initpts + iterpts
+        init_fraction = initpts / nstruct if nstruct else 1.0
+    budgets = split_budget(nstruct, len(sub_bounds))
+    if min(budgets) == 0:
+        raise ValueError(f"❌ {len(sub_bounds)} subdomains for only {nstruct} structures; use fewer --domains")
+    points = [domain_points(n, init_fraction) for n in budgets]
+    small = [i for i, (_, iters) in enumerate(points) if iters < MIN_DOMAIN_ITERPTS]
+    if small:
+        print(f"⚠️ {len(small)} subdomain(s) get fewer than {MIN_DOMAIN_ITERPTS} BO iterations "
+              f"(budget {min(budgets)}: {points[small[-1]][0]} initial points, {points[small[-1]][1]} iterations), "
+              f"so they are close to random sampling; use fewer --domains or a larger --nstruct")
+
+    tasks = []
+    for i, (sub, n, (init, iters)) in enumerate(zip(sub_bounds, budgets, points)):
+        domain_dir = os.path.join(output_dir, DOMAINS_DIR, f"domain_{i:02d}")
+        os.makedirs(domain_dir, exist_ok=True)
+        for name in ("surface.inp", "molecule.xyz"):
+            shutil.copyfile(os.path.join(output_dir, name), os.path.join(domain_dir, name))
+        task_kwargs = dict(kwargs, nstruct=n, initpts=init, iterpts=iters, opt_dims=opt_dims, bounds=sub, model_paths=model_paths,
+                           torch_threads=torch_threads, resume=resume and os.path.exists(
+                               os.path.join(domain_dir, "evaluations.db")))
+        tasks.append((i, domain_dir, task_kwargs))
+
+    shape = "x".join(str(c) for c in grid_shape(n_domains, len(split_dims)))
+    print(f"🧩 Domain decomposition: {len(tasks)} subdomains ({shape} over {', '.join(split_dims)}), "
+          f"~{budgets[0]} structures each ({points[0][0]} initial + {points[0][1]} BO), {domain_workers} worker(s)")
+
+    status = [None] * len(tasks)
+    start = time.perf_counter()
+
+    def finished(index, state, seconds, error, done):
+        status[index] = (state, seconds, error)
+        mark = "✅" if state == "done" else "❌"
+        print(f"{mark} [{done}/{len(tasks)}] domain_{index:02d} {state} in {seconds:.1f} s"
+              + (f": {error}" if error else ""))
+
+    if domain_workers == 1:
+        for done, task in enumerate(tasks, 1):
+            finished(*_run_domain(task), done)
+    else:
+        # Spawn rather than fork, as in RelaxationPool; each worker loads the model once
+        from adsgen.execution import execution_profile
+        from adsgen.workers import _init_worker
+        from adsgen.workers import worker_slots
+        profile = execution_profile(kwargs.get("execution"))
+        dtypes = (profile["dtype"], profile["screen_dtype"] if profile["screen_dtype"] != profile["dtype"] else None)
+        if profile["cores"] is not None:
+            # Each worker is pinned to its own block of cores; subdomains must not re-pin to all of them
+            for task in tasks:
+                task[2]["execution"] = dict(profile, cores=None)
+        with ProcessPoolExecutor(max_workers=domain_workers,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(model_paths, torch_threads, *dtypes, profile,
+                                           worker_slots(domain_workers))) as executor:
+            futures = [executor.submit(_run_domain, task) for task in tasks]
+            for done, future in enumerate(as_completed(futures), 1):
+                finished(*future.result(), done)
+    elapsed = time.perf_counter() - start
+
+    domain_dirs = [task[1] for task in tasks]
+    merged = merge_domains(output_dir, domain_dirs, opt_dims)
+    if domain is not None:
+        from adsgen.store import EvaluationStore
+        rows = EvaluationStore(os.path.join(output_dir, "evaluations.db")).load()
+        domain.write_expanded([pose for _, pose, _, _ in rows], [energy for _, _, _, energy in rows],
+                              os.path.join(output_dir, "full_space_poses.csv"))
+
+    report = []
+    for i, (sub, n, (init, iters), (state, seconds, error), (relaxed, best)) in enumerate(
+            zip(sub_bounds, budgets, points, status, merged)):
+        report.append({"domain": i, "output_dir": domain_dirs[i], "bounds": {dim: sub[dim] for dim in opt_dims},
+                       "nstruct": n, "initpts": init, "iterpts": iters, "status": state, "seconds": round(seconds, 1), "error": error,
+                       "relaxed": relaxed, "best_energy": best})
+    with open(os.path.join(output_dir, DOMAINS_FILE), "w") as f:
+        json.dump({"split_dims": split_dims, "n_domains": len(tasks), "seconds": round(elapsed, 1),
+                   "domains": report}, f, indent=2)
+
+    best = [(entry["best_energy"], entry["domain"]) for entry in report if entry["best_energy"] is not None]
+    print(f"📊 Merged {sum(entry['relaxed'] for entry in report)} relaxed structures from {len(tasks)} subdomains "
+          f"in {elapsed:.1f} s" + (f"; lowest energy {min(best)[0]:.6f} eV in domain_{min(best)[1]:02d}" if best else ""))
+    failed = [entry["domain"] for entry in report if entry["status"] != "done"]
+    if failed:
+        print(f"⚠️ Subdomains failed: {failed} (see run.log in each; rerun with --resume to complete them)")
+    print(f"📄 Subdomain report written to {os.path.join(output_dir, DOMAINS_FILE)}")
+    return report
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+
+import numpy as np
+
+DEFAULT_EXECUTION = {
+    "dtype": "float64",        # precision of the final (tight) relaxations
+    "screen_dtype": None,      # precision of the single-point screen and loose stage (default: dtype)
+    "intra_threads": None,     # torch intra-op threads (default: torch's choice)
+    "interop_threads": None,   # torch inter-op threads (default: torch's choice)
+    "cores": None,             # CPU cores to pin this process to, e.g. "0-7,16"
+}
+
+
+def execution_profile(execution=None):
+    """DEFAULT_EXECUTION updated with the given settings."""
+    return dict(DEFAULT_EXECUTION, **(execution or {}))
+
+
+def parse_cores(spec):
+    """Core list from a spec like "0-3,8,10-11"."""
+    cores = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cores.update(range(int(lo), int(hi or lo) + 1))
+    return sorted(cores)
+
+
+def apply_execution(execution):
+    """Pin this process to the profile's cores and set the torch thread pools."""
+    profile = execution_profile(execution)
+    if profile["cores"] is not None:
+        cores = parse_cores(profile["cores"])
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)
+            print(f"📌 Pinned to cores {cores}")
+        else:
+            print("⚠️ Core pinning is not supported on this platform; ignoring --pin-cores")
+
+    if profile["intra_threads"] is None and profile["interop_threads"] is None:
+        return profile
+    import torch
+    if profile["intra_threads"] is not None:
+        torch.set_num_threads(profile["intra_threads"])
+    if profile["interop_threads"] is not None and profile["interop_threads"] != torch.get_num_interop_threads():
+        try:
+            torch.set_num_interop_threads(profile["interop_threads"])
+        except RuntimeError as e:
+            # Only possible before torch has started any parallel work
+            print(f"⚠️ Could not set inter-op threads: {e}")
+    print(f"🧵 Torch threads: intra-op {torch.get_num_threads()}, inter-op {torch.get_num_interop_threads()}")
+    return profile
+
+
+def fastest_dtype(execution):
+    """Lowest precision used anywhere in the profile."""
+    profile = execution_profile(execution)
+    dtypes = {profile["dtype"], profile["screen_dtype"] or profile["dtype"]}
+    return "float32" if "float32" in dtypes else "float64"
+
+
+def _single_points(frames, calc):
+    energies, forces = [], []
+    start = time.perf_counter()
+    for atoms in frames:
+        probe = atoms.copy()
+        probe.calc = calc
+        energies.append(probe.get_potential_energy())
+        forces.append(probe.get_forces(apply_constraint=False))
+    return np.array(energies), forces, (time.perf_counter() - start) / max(len(frames), 1)
+
+
+def _relax_copy(atoms, calc, fmax, steps):
+    from adsgen.relaxation import relax_structure
+
+    relaxed = atoms.copy()
+    energy, _ = relax_structure(relaxed, calc, fmax=fmax, steps=steps)
+    return relaxed, energy
+
+
+def compare_precisions(frames, reference_calc, fast_calc, n_relax=2, fmax=0.05, steps=200):
+    """
+    Energy and force deviation of fast_calc from reference_calc on frames.
+
+    Single points run on every frame; the first n_relax frames are also
+    relaxed with each calculator to check that they end in the same
+    minimum. Returns a report dict (energies in eV/atom, forces and
+    displacements in eV/Å and Å).
+    """
+    from contextlib import redirect_stdout
+    from io import StringIO
+
+    e_ref, f_ref, t_ref = _single_points(frames, reference_calc)
+    e_fast, f_fast, t_fast = _single_points(frames, fast_calc)
+    natoms = np.array([len(atoms) for atoms in frames])
+    de = np.abs(e_fast - e_ref) / natoms
+    df = np.concatenate([np.linalg.norm(a - b, axis=1) for a, b in zip(f_fast, f_ref)])
+
+    minima = []
+    with redirect_stdout(StringIO()):
+        for atoms in frames[:n_relax]:
+            ref, energy_ref = _relax_copy(atoms, reference_calc, fmax, steps)
+            fast, energy_fast = _relax_copy(atoms, fast_calc, fmax, steps)
+            minima.append({"energy_diff": float(abs(energy_fast - energy_ref) / len(atoms)),
+                           "max_displacement": float(np.linalg.norm(fast.positions - ref.positions, axis=1).max())})
+
+    return {
+        "structures": len(frames),
+        "energy_mae": float(de.mean()),
+        "energy_max": float(de.max()),
+        "force_rmse": float(np.sqrt((df ** 2).mean())),
+        "force_max": float(df.max()),
+        "seconds_per_structure": {"reference": t_ref, "fast": t_fast},
+        "speedup": t_ref / t_fast if t_fast > 0 else None,
+        "minima": minima,
+    }
+
+
+def validate_execution(engine, bounds, reference_calc, fast_calc, n_samples=8, energy_tol=1e-3,
+                       force_tol=0.01, displacement_tol=0.05, clash_dist=1.0, seed=0, out_file=None):
+    """
+    Check a lower-precision profile against float64 on random poses before a run uses it.
+
+    Poses are drawn uniformly within bounds (clashing ones are skipped),
+    compared with compare_precisions and judged against the tolerances
+    (eV/atom for energies, eV/Å for forces, Å for relaxed positions).
+    Prints the report, writes it to out_file if given and returns it with
+    "passed" set.
+    """
+    from adsgen.relaxation import screen_contacts
+
+    rng = np.random.default_rng(seed)
+    lo = np.array([bounds[dim][0] for dim in engine.opt_dims], dtype=float)
+    hi = np.array([bounds[dim][1] for dim in engine.opt_dims], dtype=float)
+    frames = []
+    for _ in range(20 * n_samples):
+        atoms = engine.build(lo + rng.random(len(lo)) * (hi - lo))
+        if screen_contacts(atoms, engine.n_slab, clash_dist=clash_dist) is None:
+            frames.append(atoms)
+        if len(frames) == n_samples:
+            break
+
+    report = compare_precisions(frames, reference_calc, fast_calc, n_relax=max(1, n_samples // 4))
+    failures = []
+    if report["energy_max"] > energy_tol:
+        failures.append(f"energy deviation {report['energy_max']:.2e} eV/atom > {energy_tol}")
+    if report["force_max"] > force_tol:
+        failures.append(f"force deviation {report['force_max']:.2e} eV/Å > {force_tol}")
+    for m in report["minima"]:
+        if m["energy_diff"] > energy_tol or m["max_displacement"] > displacement_tol:
+            failures.append(f"relaxed minimum moved by {m['max_displacement']:.3f} Å ({m['energy_diff']:.2e} eV/atom)")
+    report["passed"] = not failures
+    report["failures"] = failures
+
+    speedup = f"{report['speedup']:.2f}x" if report["speedup"] else "n/a"
+    print(f"🔬 Precision check on {report['structures']} structures: energy MAE {report['energy_mae']:.2e} "
+          f"(max {report['energy_max']:.2e}) eV/atom, force RMSE {report['force_rmse']:.2e} "
+          f"(max {report['force_max']:.2e}) eV/Å, single-point speedup {speedup}")
+    for m in report["minima"]:
+        print(f"   relaxed minimum: Δ{m['energy_diff']:.2e} eV/atom, max displacement {m['max_displacement']:.4f} Å")
+    print("✅ Precision check passed" if report["passed"] else "❌ Precision check failed: " + "; ".join(failures))
+    if out_file:
+        with open(out_file, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
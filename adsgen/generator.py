@@ -1,8 +1,39 @@
-import os
+import time
+import shutil
 import argparse
 from pathlib import Path
-from adsgen.surface import run_adsorption_optimization
-from adsgen.vasp_single_step_opt import run_single_step_optimization
+from adsgen.instrumentation import EventLog
+
+
+def check_precision(output_dir, model_path, opt_dims, bounds_dict, execution, n_samples,
+                    energy_tol=1e-3, force_tol=0.01):
+    """
+    Compare the execution profile's lowest precision with float64 before the run.
+
+    Returns the execution settings to use: unchanged if the check passes or
+    nothing runs below float64, else with every stage at float64.
+    """
+    from adsgen.execution import apply_execution, fastest_dtype, validate_execution
+    from adsgen.placement import PlacementEngine
+    from adsgen.surface import DEFAULT_BOUNDS, DEFAULT_OPT_DIMS, get_mace_calculator
+
+    fast = fastest_dtype(execution)
+    if fast == "float64":
+        print("🔬 Execution profile runs in float64 throughout; no precision check needed.")
+        return execution
+
+    apply_execution(execution)
+    engine = PlacementEngine(str(output_dir / "surface.inp"), str(output_dir / "molecule.xyz"),
+                             opt_dims=opt_dims or DEFAULT_OPT_DIMS)
+    report = validate_execution(engine, dict(DEFAULT_BOUNDS, **(bounds_dict or {})),
+                                get_mace_calculator(user_model_path=model_path, dtype="float64"),
+                                get_mace_calculator(user_model_path=model_path, dtype=fast),
+                                n_samples=n_samples, energy_tol=energy_tol, force_tol=force_tol,
+                                out_file=str(output_dir / "precision_check.json"))
+    if report["passed"]:
+        return execution
+    print("⚠️ Falling back to float64 for all stages.")
+    return dict(execution, dtype="float64", screen_dtype=None)
 
 
 def run_generation(
@@ -16,38 +47,124 @@ def run_generation(
     iterpts=None,
     opt_dims=None,
     bounds_dict=None,
+    batch_size=1,
+    n_workers=1,
+    torch_threads=1,
+    cache_tol=None,
+    resume=False,
+    relax_options=None,
+    vasp_jobs=1,
+    profile_steps=None,
+    model_path=None,
+    select_n=None,
+    select_method="fps",
+    committee_models=None,
+    uncertain_n=None,
+    uncertainty_metric="force_dev_max",
+    uncertainty_frames="relaxed",
+    domains=None,
+    domain_dims=None,
+    domain_workers=1,
+    stop_options=None,
+    execution=None,
+    validate_samples=None,
+    validate_energy_tol=1e-3,
+    validate_force_tol=0.01,
+    symmetry_reduce=False,
+    symmetry_tol=0.1,
+    warm_start_radius=None,
 ):
+    # Heavy dependencies (torch, MACE, BOSS) load here rather than at import,
+    # so `adsgen-generate --help` and importing this module stay fast.
+    from adsgen.surface import run_adsorption_optimization
+    from adsgen.vasp_single_step_opt import run_single_step_optimization
+
     output_dir = Path(output_dir)
-    output_dir.mkdir(exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     mol_dst = output_dir / "molecule.xyz"
     surf_dst = output_dir / "surface.inp"
 
     if Path(mol_path).resolve() != mol_dst.resolve():
-        os.system(f"cp {mol_path} {mol_dst}")
+        shutil.copyfile(mol_path, mol_dst)
         print(f"Copied molecule: {mol_path} → {mol_dst}")
     else:
         print(f"⚠️ Source and destination are the same: {mol_path}")
 
     if Path(surf_path).resolve() != surf_dst.resolve():
-        os.system(f"cp {surf_path} {surf_dst}")
+        shutil.copyfile(surf_path, surf_dst)
         print(f"Copied surface: {surf_path} → {surf_dst}")
     else:
         print(f"⚠️ Source and destination are the same: {surf_path}")
 
+    if validate_samples:
+        execution = check_precision(output_dir, model_path, opt_dims, bounds_dict, execution or {},
+                                    validate_samples, energy_tol=validate_energy_tol, force_tol=validate_force_tol)
+
     print("Running BOSS + MACE training structure generation...")
 
-    run_adsorption_optimization(
+    bo_kwargs = dict(
         output_dir=str(output_dir),
-        model_paths=None,
+        model_paths=model_path,
         opt_dims=opt_dims,
         bounds=bounds_dict,
         nstruct=nstruct,
         initpts=initpts,
         iterpts=iterpts,
+        batch_size=batch_size,
+        n_workers=n_workers,
+        torch_threads=torch_threads,
+        cache_tol=cache_tol,
+        resume=resume,
+        relax_options=relax_options,
+        profile_steps=profile_steps,
+        stop_options=stop_options,
+        execution=execution,
+        symmetry_reduce=symmetry_reduce,
+        symmetry_tol=symmetry_tol,
+        warm_start_radius=warm_start_radius,
+    )
+    start = time.perf_counter()
+    if domains and domains > 1:
+        from adsgen.domains import run_decomposed_optimization
+        run_decomposed_optimization(n_domains=domains, split_dims=domain_dims,
+                                    domain_workers=domain_workers, **bo_kwargs)
+    else:
+        run_adsorption_optimization(**bo_kwargs)
+    generation_time = time.perf_counter() - start
+
+    # Optionally keep only the most diverse structures for DFT
+    vasp_input = "training_data_mace_opt.xyz"
+    if select_n:
+        from adsgen.selection import select_structures
+        select_structures(str(output_dir / vasp_input), str(output_dir / "training_data_mace_selected.xyz"),
+                          select_n, method=select_method)
+        vasp_input = "training_data_mace_selected.xyz"
+
+    # Optionally keep only the structures the model committee disagrees on most
+    if committee_models and uncertain_n:
+        from adsgen.uncertainty import load_committee, select_uncertain
+        select_uncertain(str(output_dir / vasp_input), str(output_dir / "training_data_mace_uncertain.xyz"),
+                         uncertain_n, load_committee(committee_models), metric=uncertainty_metric,
+                         frames=uncertainty_frames)
+        vasp_input = "training_data_mace_uncertain.xyz"
+
+    event_log = str(output_dir / "events.jsonl")
+    start = time.perf_counter()
+    run_single_step_optimization(
+        skip_vasp=skip_vasp,
+        vasp_command=vasp_command,
+        output_dir=str(output_dir),
+        max_jobs=vasp_jobs,
+        event_log=event_log,
+        input_file=vasp_input,
     )
+    vasp_time = time.perf_counter() - start
 
-    run_single_step_optimization(skip_vasp=skip_vasp, vasp_command=vasp_command)
+    events = EventLog(event_log, append=True)
+    events.emit("stages", phases={"generation": generation_time, "vasp": vasp_time})
+    events.close()
+    print(f"⏱️ Generation stage: {generation_time:.1f} s, VASP stage: {vasp_time:.1f} s (events in {event_log})")
 
 
 def main():
@@ -57,12 +174,93 @@ def main():
     parser.add_argument("--mol", type=str, required=True, help="Path to molecule.xyz")
     parser.add_argument("--surf", type=str, required=True, help="Path to surface.inp")
     parser.add_argument("--out", type=str, default="results", help="Output directory")
+    parser.add_argument("--model", type=str, help="Path to a MACE model (default: cached or bundled model)")
     parser.add_argument("--skip-vasp", action="store_true", help="Skip VASP optimization")
-    parser.add_argument("--vasp_command", type=str, default="mpirun -np 4 vasp_std", help="VASP command")
+    parser.add_argument("--vasp_command", type=str, default="mpirun -np 4 vasp_std",
+                        help="VASP command template; may use {index} and {workdir}")
+    parser.add_argument("--vasp-jobs", type=int, default=1, help="Number of VASP jobs to run concurrently")
+
+    parser.add_argument("--dtype", choices=["float32", "float64"], default="float64",
+                        help="Model precision of the final relaxations")
+    parser.add_argument("--screen-dtype", choices=["float32", "float64"],
+                        help="Model precision of the single-point screen and loose stage (default: --dtype)")
+    parser.add_argument("--intra-threads", type=int, help="Torch intra-op threads of the main process and each worker")
+    parser.add_argument("--interop-threads", type=int, help="Torch inter-op threads of the main process and each worker")
+    parser.add_argument("--pin-cores", type=str, metavar="CORES",
+                        help="Pin the run to these CPU cores, e.g. 0-7 or 0,2,4; workers get disjoint blocks (Linux only)")
+    parser.add_argument("--validate-profile", type=int, metavar="N",
+                        help="Before the run, compare float32 with float64 on N random poses; fall back to float64 if out of tolerance")
+    parser.add_argument("--validate-energy-tol", type=float, default=1e-3,
+                        help="Energy tolerance of --validate-profile (eV/atom)")
+    parser.add_argument("--validate-force-tol", type=float, default=0.01,
+                        help="Force tolerance of --validate-profile (eV/Å)")
+
+    parser.add_argument("--profile-steps", nargs=2, type=int, metavar=("FIRST", "LAST"),
+                        help="Run evaluations FIRST..LAST under cProfile (.prof files in <out>/profiles)")
+
+    parser.add_argument("--select", type=int, metavar="N",
+                        help="Send only the N most diverse structures to VASP (written to training_data_mace_selected.xyz)")
+    parser.add_argument("--select-method", choices=["fps", "kmedoids"], default="fps",
+                        help="Diversity selection method: farthest-point sampling or k-medoids")
+
+    parser.add_argument("--committee", nargs="+", metavar="MODEL",
+                        help="MACE models of a committee used to score structures by disagreement")
+    parser.add_argument("--uncertain", type=int, metavar="N",
+                        help="Send only the N structures with the largest committee disagreement to VASP")
+    parser.add_argument("--uncertainty-metric", choices=["force_dev_max", "force_dev_mean", "energy_std"],
+                        default="force_dev_max", help="Committee score used to rank structures")
+    parser.add_argument("--uncertainty-frames", choices=["relaxed", "all"], default="relaxed",
+                        help="Score only relaxed structures (default) or also the unrelaxed initial poses")
+
+    parser.add_argument("--domains", type=int, metavar="N",
+                        help="Split the search space into N subdomains with independent BO loops and merge the results")
+    parser.add_argument("--domain-dims", nargs="+", choices=["x", "y", "z", "alpha", "beta", "gamma"],
+                        help="Dimensions to split for --domains (default: x and y site regions, else alpha sectors)")
+    parser.add_argument("--domain-workers", type=int, default=1,
+                        help="Subdomains run in parallel, one per worker process with its own MACE model")
+
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from the evaluations stored in the output directory")
 
     parser.add_argument("--nstruct", type=int, default=100, help="Total number of structures to generate")
     parser.add_argument("--initpts", type=int, help="Number of initial points (overrides default logic)")
     parser.add_argument("--iterpts", type=int, help="Number of BO iterations (overrides default logic)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Candidate poses proposed per BO iteration and relaxed together in one batched MACE evaluation")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for parallel MACE relaxations (one resident model per worker)")
+    parser.add_argument("--torch-threads", type=int, default=1, help="Torch threads per worker process")
+    parser.add_argument("--cache-tol", type=float,
+                        help="Reuse energies of symmetry-equivalent poses within this tolerance (Å) instead of relaxing again")
+
+    parser.add_argument("--warm-start-radius", type=float,
+                        help="Start relaxations from the relaxed geometry of the nearest earlier pose within this distance (Å)")
+
+    parser.add_argument("--fmax", type=float, default=0.01, help="Force criterion of the final relaxation (eV/Å)")
+    parser.add_argument("--max-steps", type=int, help="Step budget of the final relaxation")
+    parser.add_argument("--clash-dist", type=float, help="Reject poses with a molecule-slab distance below this (Å)")
+    parser.add_argument("--max-contact-dist", type=float,
+                        help="Reject poses with no molecule-slab distance below this (Å)")
+    parser.add_argument("--screen-margin", type=float,
+                        help="Skip relaxation if the single-point energy exceeds the best energy by this margin (eV)")
+    parser.add_argument("--loose-fmax", type=float, help="Force criterion of a loose relaxation stage (eV/Å)")
+    parser.add_argument("--loose-steps", type=int, help="Step budget of the loose relaxation stage")
+    parser.add_argument("--tight-margin", type=float,
+                        help="Run the final relaxation only if the loose energy is within this margin of the best (eV)")
+    parser.add_argument("--cluster-radius", type=float,
+                        help="Relax against slab atoms within this radius of the molecule (Å); full-slab energy is recomputed")
+
+    parser.add_argument("--stop-patience", type=int,
+                        help="Stop BO after this many evaluations without improving the best energy")
+    parser.add_argument("--stop-improvement", type=float, default=0.01,
+                        help="Improvement of the best energy that counts for --stop-patience (eV)")
+    parser.add_argument("--stop-std", type=float,
+                        help="Stop BO once the GP std at the predicted global minimum is below this (eV)")
+    parser.add_argument("--stop-discovery-window", type=int,
+                        help="Stop BO if too few new distinct minima were found in this many recent evaluations")
+    parser.add_argument("--stop-discovery-rate", type=float, default=0.05,
+                        help="Minimum new distinct minima per evaluation for --stop-discovery-window")
+    parser.add_argument("--stop-min-evals", type=int, default=0, help="Never stop before this many evaluations")
 
     parser.add_argument(
         "--opt-dims",
@@ -71,6 +269,9 @@ def main():
         default=["x", "y", "alpha", "beta", "gamma"],
         help="Degrees of freedom to optimize (translation/rotation)"
     )
+    parser.add_argument("--symmetry-reduce", action="store_true",
+                        help="Search only the irreducible x/y/alpha domain derived from the slab and molecule symmetry")
+    parser.add_argument("--symmetry-tol", type=float, default=0.1, help="Tolerance of the symmetry detection (Å)")
     parser.add_argument("--bounds-x", nargs=2, type=float, help="Bounds for x shift")
     parser.add_argument("--bounds-y", nargs=2, type=float, help="Bounds for y shift")
     parser.add_argument("--bounds-z", nargs=2, type=float, help="Bounds for z shift")
@@ -87,6 +288,35 @@ def main():
         if val:
             bounds_dict[dim] = tuple(val)
 
+    relax_options = {
+        "fmax": args.fmax,
+        "max_steps": args.max_steps,
+        "clash_dist": args.clash_dist,
+        "max_contact_dist": args.max_contact_dist,
+        "screen_margin": args.screen_margin,
+        "loose_fmax": args.loose_fmax,
+        "loose_steps": args.loose_steps,
+        "tight_margin": args.tight_margin,
+        "cluster_radius": args.cluster_radius,
+    }
+
+    stop_options = {
+        "patience": args.stop_patience,
+        "min_improvement": args.stop_improvement,
+        "incumbent_std": args.stop_std,
+        "discovery_window": args.stop_discovery_window,
+        "min_discovery_rate": args.stop_discovery_rate,
+        "min_evals": args.stop_min_evals,
+    }
+
+    execution = {
+        "dtype": args.dtype,
+        "screen_dtype": args.screen_dtype,
+        "intra_threads": args.intra_threads,
+        "interop_threads": args.interop_threads,
+        "cores": args.pin_cores,
+    }
+
     run_generation(
         mol_path=args.mol,
         surf_path=args.surf,
@@ -98,6 +328,32 @@ def main():
         iterpts=args.iterpts,
         opt_dims=args.opt_dims,
         bounds_dict=bounds_dict,
+        batch_size=args.batch_size,
+        n_workers=args.workers,
+        torch_threads=args.torch_threads,
+        cache_tol=args.cache_tol,
+        resume=args.resume,
+        relax_options=relax_options,
+        vasp_jobs=args.vasp_jobs,
+        profile_steps=tuple(args.profile_steps) if args.profile_steps else None,
+        model_path=args.model,
+        select_n=args.select,
+        select_method=args.select_method,
+        committee_models=args.committee,
+        uncertain_n=args.uncertain,
+        uncertainty_metric=args.uncertainty_metric,
+        uncertainty_frames=args.uncertainty_frames,
+        domains=args.domains,
+        domain_dims=args.domain_dims,
+        domain_workers=args.domain_workers,
+        stop_options=stop_options,
+        execution=execution,
+        validate_samples=args.validate_profile,
+        validate_energy_tol=args.validate_energy_tol,
+        validate_force_tol=args.validate_force_tol,
+        symmetry_reduce=args.symmetry_reduce,
+        symmetry_tol=args.symmetry_tol,
+        warm_start_radius=args.warm_start_radius,
     )
 
 
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import resource
+import cProfile
+from contextlib import contextmanager
+
+import numpy as np
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size in MB: the larger of this process and its largest child.
+
+    Children (relaxation or domain workers) only count once they have exited
+    and been waited for, so during a pooled run this is the parent's peak
+    until the pool closes.
+    """
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024.0
+
+
+def relaxed_opt_steps(path):
+    """{step: opt_steps} of the relaxed evaluations logged in an events.jsonl file, if it exists."""
+    steps = {}
+    if not os.path.exists(path):
+        return steps
+    with open(path) as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run
+            if event.get("outcome") == "relaxed" and event.get("opt_steps") is not None:
+                steps[event["step"]] = event["opt_steps"]
+    return steps
+
+
+class EventLog:
+    """
+    Structured JSONL log of evaluation events with per-phase wall times.
+
+    Time spent inside ``phase(name)`` blocks accumulates until the next
+    ``emit``, which writes one JSON object per line (event kind, phases,
+    peak RSS (see peak_rss_mb) and any extra fields) and folds it into the
+    end-of-run summary.
+    Evaluations numbered within ``profile_steps`` (first, last) are run
+    under cProfile, one .prof file per evaluation in ``profile_dir``; the
+    profiling window is also logged with the process id, so an external
+    ``py-spy record --pid`` capture can be cut to the same range.
+    """
+
+    def __init__(self, path, append=False, profile_steps=None, profile_dir=None):
+        self.path = path
+        self._file = open(path, 'a' if append else 'w')
+        self.profile_steps = profile_steps
+        self.profile_dir = profile_dir or os.path.join(os.path.dirname(path) or ".", "profiles")
+        self._pending = {}
+        self._totals = {}
+        self._counts = {}
+        self._steps = []
+        self._warm_steps = []
+        self._cold_steps = []
+        self._saved = []
+        self._worker_rss = 0.0
+        self.evaluations = 0
+        self._profiling = False
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._pending[name] = self._pending.get(name, 0.0) + time.perf_counter() - start
+
+    def add_time(self, name, seconds):
+        self._pending[name] = self._pending.get(name, 0.0) + seconds
+
+    def take_phases(self):
+        """Return and clear the phase times accumulated since the last emit."""
+        phases, self._pending = self._pending, {}
+        return phases
+
+    def emit(self, kind, phases=None, **fields):
+        if phases is None:
+            phases = self.take_phases()
+        event = {"event": kind, "time": time.time(), **fields,
+                 "phases": {k: round(v, 6) for k, v in phases.items()},
+                 "peak_rss_mb": round(peak_rss_mb(), 1)}
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+
+        outcome = fields.get("outcome")
+        if outcome is not None:
+            self._counts[outcome] = self._counts.get(outcome, 0) + 1
+        for name, seconds in phases.items():
+            self._totals[name] = self._totals.get(name, 0.0) + seconds
+        if fields.get("opt_steps") is not None:
+            self._steps.append((fields["opt_steps"], fields.get("force_calls") or 0))
+        if outcome == "relaxed" and fields.get("opt_steps") is not None:
+            steps = self._warm_steps if fields.get("warm_start") is not None else self._cold_steps
+            steps.append(fields["opt_steps"])
+        if fields.get("worker_rss_mb") is not None:
+            self._worker_rss = max(self._worker_rss, fields["worker_rss_mb"])
+        if fields.get("steps_saved") is not None:
+            self._saved.append(fields["steps_saved"])
+        return event
+
+    @contextmanager
+    def evaluation(self, count=1):
+        """Number the next count evaluations (one batch) and profile them if they overlap profile_steps."""
+        first = self.evaluations + 1
+        self.evaluations += count
+        last = self.evaluations
+        if self.profile_steps is None or last < self.profile_steps[0] or first > self.profile_steps[1]:
+            yield first
+            return
+
+        if not self._profiling:
+            self._profiling = True
+            os.makedirs(self.profile_dir, exist_ok=True)
+            self.emit("profile_start", phases={}, evaluation=first, pid=os.getpid())
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield first
+        finally:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(self.profile_dir, f"evaluation_{first:05d}.prof"))
+            if last >= self.profile_steps[1]:
+                self.emit("profile_end", phases={}, evaluation=last, pid=os.getpid())
+
+    def summary(self, title="Run summary"):
+        """End-of-run table of phase totals, outcome counts and optimizer effort."""
+        lines = [title, "=" * 50]
+        total = sum(self._totals.values())
+        lines.append(f"{'phase':<20}{'total (s)':>12}{'share':>10}")
+        for name, seconds in sorted(self._totals.items(), key=lambda kv: -kv[1]):
+            share = 100 * seconds / total if total > 0 else 0.0
+            lines.append(f"{name:<20}{seconds:>12.3f}{share:>9.1f}%")
+        lines.append("-" * 50)
+        for outcome, count in sorted(self._counts.items()):
+            lines.append(f"{outcome:<20}{count:>12d}")
+        if self._steps:
+            steps = np.array(self._steps)
+            lines.append("-" * 50)
+            lines.append(f"{'optimizer steps':<20}{steps[:, 0].mean():>12.1f} mean, {int(steps[:, 0].max())} max")
+            lines.append(f"{'force calls':<20}{steps[:, 1].mean():>12.1f} mean, {int(steps[:, 1].sum())} total")
+        if self._warm_steps:
+            cold = f"{np.mean(self._cold_steps):.1f}" if self._cold_steps else "n/a"
+            lines.append(f"{'warm starts':<20}{len(self._warm_steps):>12d}, "
+                         f"{np.mean(self._warm_steps):.1f} mean optimizer steps ({cold} for "
+                         f"{len(self._cold_steps)} cold starts)")
+        if self._saved:
+            # Against each neighbour's own relaxation; negative where the warm start took longer
+            saved = np.array(self._saved)
+            lines.append(f"{'steps saved':<20}{saved.sum():>12.0f} total, {saved.mean():.1f} mean, "
+                         f"{int((saved < 0).sum())} of {len(saved)} warm starts took more steps")
+        lines.append(f"{'peak RSS (MB)':<20}{peak_rss_mb():>12.1f}")
+        if self._worker_rss:
+            lines.append(f"{'worker peak RSS (MB)':<20}{self._worker_rss:>12.1f}")
+        return "\n".join(lines)
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,68 @@
+import os
+import shutil
+
+from ase.io import write, Trajectory
+from ase.calculators.singlepoint import SinglePointCalculator
+
+# Results kept on relaxed frames in the xyz outputs.
+FRAME_PROPERTIES = ("energy", "free_energy", "forces", "stress")
+
+
+class StructureWriter:
+    """
+    Streams unrelaxed and relaxed frames to the run outputs.
+
+    Every output file is opened once and frames are appended as they are
+    produced, flushing every ``flush_every`` frames. Relaxed frames go to the
+    trajectory and to a staging xyz file; on close, the combined training
+    file is assembled by concatenating the raw xyz bytes, so nothing has to
+    be parsed again at the end of the run.
+    """
+
+    def __init__(self, initial_xyz_file, traj_file, combined_xyz_file, flush_every=10):
+        self.initial_xyz_file = initial_xyz_file
+        self.combined_xyz_file = combined_xyz_file
+        self.relaxed_xyz_file = combined_xyz_file + ".relaxed.part"
+        self.flush_every = flush_every
+
+        self._initial = open(initial_xyz_file, 'w')
+        self._relaxed = open(self.relaxed_xyz_file, 'w')
+        self.trajectory = Trajectory(traj_file, 'w')
+        self._pending = 0
+
+    def write_initial(self, atoms):
+        write(self._initial, atoms, format="extxyz")
+        self._tick()
+
+    def write_relaxed(self, atoms):
+        self.trajectory.write(atoms)
+
+        frame = atoms.copy()
+        if atoms.calc is not None:
+            results = {k: v for k, v in atoms.calc.results.items() if k in FRAME_PROPERTIES}
+            frame.calc = SinglePointCalculator(frame, **results)
+        write(self._relaxed, frame, format="extxyz")
+        self._tick()
+
+    def _tick(self):
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self._initial.flush()
+        self._relaxed.flush()
+        self._pending = 0
+
+    def close(self):
+        """Close all streams and assemble the combined file (unrelaxed frames, then relaxed)."""
+        self.trajectory.close()
+        self._initial.close()
+        self._relaxed.close()
+
+        with open(self.combined_xyz_file, 'wb') as out:
+            for path in (self.initial_xyz_file, self.relaxed_xyz_file):
+                with open(path, 'rb') as f:
+                    shutil.copyfileobj(f, out, length=1 << 20)
+        os.remove(self.relaxed_xyz_file)
+        return self.combined_xyz_file
@@ -0,0 +1,108 @@
+import numpy as np
+from ase import Atoms
+from ase.io import read
+from ase.constraints import FixAtoms
+
+POSE_DIMS = ["x", "y", "z", "alpha", "beta", "gamma"]
+
+
+def rotation_matrices(alpha, beta, gamma):
+    """
+    Composed rotation matrices (n, 3, 3) for angles in degrees.
+
+    Equivalent to rotating by alpha about z, then beta about y, then gamma
+    about x, i.e. R = Rx(gamma) @ Ry(beta) @ Rz(alpha), matching ase's
+    Atoms.rotate conventions.
+    """
+    a, b, g = (np.radians(np.atleast_1d(np.asarray(v, dtype=float))) for v in (alpha, beta, gamma))
+    ca, sa = np.cos(a), np.sin(a)
+    cb, sb = np.cos(b), np.sin(b)
+    cg, sg = np.cos(g), np.sin(g)
+
+    R = np.empty((len(a), 3, 3))
+    R[:, 0, 0] = cb * ca
+    R[:, 0, 1] = -cb * sa
+    R[:, 0, 2] = sb
+    R[:, 1, 0] = sg * sb * ca + cg * sa
+    R[:, 1, 1] = -sg * sb * sa + cg * ca
+    R[:, 1, 2] = -sg * cb
+    R[:, 2, 0] = -cg * sb * ca + sg * sa
+    R[:, 2, 1] = cg * sb * sa + sg * ca
+    R[:, 2, 2] = cg * cb
+    return R
+
+
+class PlacementEngine:
+    """
+    Builds molecule-on-slab candidates from rigid-body poses.
+
+    The slab and molecule are parsed once and kept as NumPy arrays, so each
+    candidate costs one composed rotation and a vectorized translate instead
+    of re-reading the input files.
+    """
+
+    def __init__(self, surface_path, molecule_path, opt_dims=None, z_offset=2.5):
+        self.opt_dims = list(opt_dims) if opt_dims is not None else ["x", "y", "alpha", "beta", "gamma"]
+        self.z_offset = z_offset
+
+        slab = read(surface_path, format="vasp")
+        mol = read(molecule_path)
+
+        self.cell = slab.get_cell()
+        self.pbc = slab.get_pbc()
+        self.slab_numbers = slab.get_atomic_numbers()
+        self.slab_positions = slab.get_positions()
+        self.slab_indices = np.arange(len(slab))
+        self.slab_top = float(self.slab_positions[:, 2].max())
+
+        self.mol_numbers = mol.get_atomic_numbers()
+        self.mol_center = mol.get_center_of_mass()
+        self.mol_local = mol.get_positions() - self.mol_center
+
+        self.numbers = np.concatenate([self.slab_numbers, self.mol_numbers])
+        self._dim_index = [POSE_DIMS.index(dim) for dim in self.opt_dims]
+
+    @property
+    def n_slab(self):
+        return len(self.slab_numbers)
+
+    def poses(self, X):
+        """Expand BO points (n, len(opt_dims)) to full poses (n, 6) ordered as POSE_DIMS."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        poses = np.zeros((X.shape[0], len(POSE_DIMS)))
+        poses[:, self._dim_index] = X
+        return poses
+
+    def points(self, poses):
+        """Inverse of poses(): project full poses (n, 6) onto the optimized dimensions."""
+        return np.atleast_2d(poses)[:, self._dim_index]
+
+    def molecule_positions(self, poses):
+        """Placed molecule positions (n, n_mol, 3) for full poses (n, 6)."""
+        poses = np.atleast_2d(poses)
+        R = rotation_matrices(poses[:, 3], poses[:, 4], poses[:, 5])
+        local = np.einsum("nij,aj->nai", R, self.mol_local)
+
+        shift = poses[:, :3].copy()
+        shift[:, 2] += self.slab_top + self.z_offset - (local[:, :, 2].min(axis=1) + self.mol_center[2])
+        return local + self.mol_center + shift[:, None, :]
+
+    def make_atoms(self, mol_positions):
+        """Slab plus molecule at the given positions, with the slab fixed."""
+        atoms = Atoms(
+            numbers=self.numbers,
+            positions=np.vstack([self.slab_positions, mol_positions]),
+            cell=self.cell,
+            pbc=self.pbc,
+        )
+        atoms.set_constraint(FixAtoms(indices=self.slab_indices))
+        return atoms
+
+    def build(self, X):
+        """Build the candidate structure for a single BO point."""
+        return self.build_batch(X)[0]
+
+    def build_batch(self, X):
+        """Build candidate structures for every row of X in one vectorized pass."""
+        positions = self.molecule_positions(self.poses(X))
+        return [self.make_atoms(p) for p in positions]
@@ -0,0 +1,81 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+from adsgen.placement import rotation_matrices
+from adsgen.symmetry import molecule_rotations
+
+
+class PoseCache:
+    """
+    Memoizes relaxed energies of rigid-body poses up to symmetry.
+
+    Poses are canonicalized by wrapping the x/y shift into the slab cell and
+    representing the orientation by its rotation matrix, so angles such as
+    0 and 359 degrees end up next to each other. Every stored pose is indexed
+    together with its images under the molecule's point group. Distances mix
+    the shift (Å) with the orientation difference scaled by the molecule's
+    radius of gyration, so ``tol`` is roughly an atomic displacement in Å.
+    """
+
+    def __init__(self, engine, tol=0.05):
+        self.engine = engine
+        self.tol = tol
+
+        self.inplane_cell = np.asarray(engine.cell)[:2, :2]
+        self.rotations = molecule_rotations(engine.mol_local, engine.mol_numbers)
+        self.weight = float(np.sqrt((engine.mol_local ** 2).sum(axis=1).mean()))
+
+        # Neighbouring lattice translations, used to query across cell edges.
+        n = np.array([(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1)], dtype=float)
+        self._images = n @ self.inplane_cell
+
+        self._points = []
+        self._energies = []
+        self._steps = []
+        self._tree = None
+        self.hits = 0
+        self.lookups = 0
+
+    def canonicalize(self, X):
+        """Return (shift (n, 3) with x/y wrapped into the cell, rotation matrices (n, 3, 3))."""
+        poses = self.engine.poses(X)
+        shift = poses[:, :3].copy()
+        frac = np.linalg.solve(self.inplane_cell.T, shift[:, :2].T).T % 1.0
+        shift[:, :2] = frac @ self.inplane_cell
+        return shift, rotation_matrices(poses[:, 3], poses[:, 4], poses[:, 5])
+
+    def _features(self, shift, R):
+        return np.hstack([shift, self.weight * R.reshape(len(R), 9)])
+
+    def lookup(self, X):
+        """Return (energy, step) of a cached equivalent pose, or None."""
+        self.lookups += 1
+        if not self._points:
+            return None
+        if self._tree is None:
+            self._tree = cKDTree(np.vstack(self._points))
+
+        shift, R = self.canonicalize(X)
+        queries = np.repeat(self._features(shift, R), len(self._images), axis=0)
+        queries[:, :2] += self._images
+        dist, idx = self._tree.query(queries)
+
+        best = int(np.argmin(dist))
+        if dist[best] > self.tol:
+            return None
+        self.hits += 1
+        entry = idx[best] // len(self.rotations)
+        return self._energies[entry], self._steps[entry]
+
+    def add(self, X, energy, step=None):
+        """Store a relaxed energy for pose X and all its symmetry images."""
+        shift, R = self.canonicalize(X)
+        images = np.einsum("ij,kjl->kil", R[0], self.rotations)
+        self._points.append(self._features(np.repeat(shift, len(images), axis=0), images))
+        self._energies.append(float(energy))
+        self._steps.append(step)
+        self._tree = None
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
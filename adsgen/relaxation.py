@@ -0,0 +1,354 @@
+from contextlib import contextmanager
+
+import numpy as np
+from ase import Atoms
+from ase.constraints import FixAtoms
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.neighborlist import neighbor_list
+from ase.optimize.precon import PreconLBFGS
+
+
+class MACEBatchEvaluator:
+    """
+    Evaluates many structures in a single MACE forward pass.
+
+    Wraps an already loaded MACECalculator and reuses its model, atomic number
+    table and cutoff, so batched and one-at-a-time results are identical.
+    """
+
+    def __init__(self, calc):
+        self.calc = calc
+
+    def __call__(self, atoms_list):
+        """Return (energies, forces) for a list of Atoms; forces is a list of (n_i, 3) arrays."""
+        import torch
+        from mace.tools import torch_geometric
+
+        calc = self.calc
+        # Graph tensors take torch's default dtype, which must match this model
+        torch.set_default_dtype(next(calc.models[0].parameters()).dtype)
+        graphs = [calc._atoms_to_batch(atoms).get_example(0) for atoms in atoms_list]
+        batch = torch_geometric.Batch.from_data_list(graphs).to(calc.device)
+
+        out = calc.models[0](batch.to_dict(), compute_stress=False, training=False)
+        energies = out["energy"].detach().cpu().numpy() * calc.energy_units_to_eV
+        forces = out["forces"].detach().cpu().numpy() * (calc.energy_units_to_eV / calc.length_units_to_A)
+
+        ptr = batch.ptr.cpu().numpy()
+        return energies, [forces[ptr[i]:ptr[i + 1]] for i in range(len(atoms_list))]
+
+
+def screen_contacts(atoms, n_slab, clash_dist=None, max_contact_dist=None):
+    """
+    Cheap geometric pre-screen of a placed candidate.
+
+    Returns "clash" if any molecule atom is closer than clash_dist to a slab
+    atom, "too far" if no molecule atom is within max_contact_dist of the
+    slab, and None otherwise. Uses one periodic neighbor list.
+    """
+    cutoff = max(d for d in (clash_dist, max_contact_dist, 0.0) if d is not None)
+    if cutoff <= 0.0:
+        return None
+
+    i, j, d = neighbor_list("ijd", atoms, cutoff)
+    contacts = d[(i >= n_slab) & (j < n_slab)]
+    if clash_dist is not None and np.any(contacts < clash_dist):
+        return "clash"
+    if max_contact_dist is not None and not np.any(contacts < max_contact_dist):
+        return "too far"
+    return None
+
+
+def cut_cluster(atoms, radius):
+    """
+    Non-periodic cut-out for relaxing the mobile atoms against a frozen slab.
+
+    Contains every atom not held by FixAtoms, followed by each fixed atom
+    (including periodic images) within radius of any mobile atom. The cut
+    slab atoms stay fixed. Returns (cluster, mobile_indices).
+    """
+    mobile = np.where(~fixed_mask(atoms))[0]
+    i, j, S = neighbor_list("ijS", atoms, radius)
+    sel = np.isin(i, mobile) & ~np.isin(j, mobile)
+    images = np.unique(np.column_stack([j[sel], S[sel]]), axis=0)
+
+    image_positions = atoms.positions[images[:, 0]] + images[:, 1:] @ atoms.cell
+    cluster = Atoms(
+        numbers=np.concatenate([atoms.numbers[mobile], atoms.numbers[images[:, 0]]]),
+        positions=np.vstack([atoms.positions[mobile], image_positions]),
+    )
+    cluster.set_constraint(FixAtoms(indices=np.arange(len(mobile), len(cluster))))
+    return cluster, mobile
+
+
+@contextmanager
+def count_calls(calc, stats):
+    """Count calculations of calc into stats["force_calls"] while the block runs."""
+    if stats is None:
+        yield
+        return
+    calculate = calc.calculate
+    wrapped = "calculate" in vars(calc)
+
+    def counted(*args, **kwargs):
+        stats["force_calls"] = stats.get("force_calls", 0) + 1
+        return calculate(*args, **kwargs)
+
+    calc.calculate = counted
+    try:
+        yield
+    finally:
+        if wrapped:
+            calc.calculate = calculate
+        else:
+            del calc.calculate
+
+
+def _run_lbfgs(atoms, fmax, steps, cluster_radius=None):
+    """Relax atoms in place; returns the number of optimizer iterations (opt.nsteps)."""
+    if cluster_radius is not None:
+        cluster, mobile = cut_cluster(atoms, cluster_radius)
+        cluster.calc = atoms.calc
+        nsteps = _run_lbfgs(cluster, fmax, steps)
+        positions = atoms.get_positions()
+        positions[mobile] = cluster.positions[:len(mobile)]
+        atoms.set_positions(positions)
+        return nsteps
+
+    opt = PreconLBFGS(atoms, use_armijo=True, precon=None, variable_cell=False)
+    if steps is None:
+        opt.run(fmax=fmax)
+    else:
+        opt.run(fmax=fmax, steps=steps)
+    return opt.nsteps
+
+
+def _finite_energy(atoms):
+    energy = atoms.get_potential_energy()
+    if not np.isfinite(energy):
+        raise ValueError("Non-finite energy")
+    return energy
+
+
+def relax_structure(atoms, calc, fmax=0.01, steps=None, screen_cutoff=None,
+                    loose_fmax=None, loose_steps=None, tight_cutoff=None, cluster_radius=None, stats=None,
+                    screen_calc=None):
+    """
+    Relax a single candidate in place with PreconLBFGS; returns (energy, stage).
+
+    Optional stages run before the tight relaxation to fmax: a single-point
+    screen that stops if the energy is above screen_cutoff, and a loose
+    relaxation to loose_fmax that stops if the energy is above tight_cutoff.
+    stage is "single-point", "loose" or "tight", the last stage that ran.
+
+    With cluster_radius set, relaxations run on cut_cluster(atoms,
+    cluster_radius) and only the energies used as results and stage gates
+    are computed on the full structure.
+
+    If a stats dict is given, the optimizer steps and calculator calls of
+    all stages are accumulated into stats["opt_steps"] and
+    stats["force_calls"]. opt_steps counts PreconLBFGS iterations,
+    including those where a failed Armijo line search only resets the
+    Hessian and no new calculation runs. force_calls counts actual
+    calculator calculations: the first evaluation of each stage (unless
+    the energy and forces are already cached for those positions) and
+    every line-search trial point. The two therefore differ in both
+    directions and neither is derived from the other.
+
+    With screen_calc given (e.g. a float32 model), the single-point screen
+    and the loose stage use it and only the tight stage uses calc.
+    """
+    if screen_calc is calc:
+        screen_calc = None
+    atoms.calc = screen_calc or calc
+    if stats is not None:
+        stats.setdefault("opt_steps", 0)
+        stats.setdefault("force_calls", 0)
+    with count_calls(calc, stats), count_calls(screen_calc, stats if screen_calc is not None else None):
+        return _relax_stages(atoms, calc, fmax, steps, screen_cutoff, loose_fmax, loose_steps,
+                             tight_cutoff, cluster_radius, stats if stats is not None else {})
+
+
+def _relax_stages(atoms, calc, fmax, steps, screen_cutoff, loose_fmax, loose_steps, tight_cutoff, cluster_radius,
+                  stats):
+    if screen_cutoff is not None:
+        energy = _finite_energy(atoms)
+        if energy > screen_cutoff:
+            return energy, "single-point"
+
+    if loose_fmax is not None:
+        stats["opt_steps"] = stats.get("opt_steps", 0) + _run_lbfgs(atoms, loose_fmax, loose_steps, cluster_radius)
+        energy = _finite_energy(atoms)
+        if tight_cutoff is not None and energy > tight_cutoff:
+            return energy, "loose"
+
+    atoms.calc = calc
+    stats["opt_steps"] = stats.get("opt_steps", 0) + _run_lbfgs(atoms, fmax, steps, cluster_radius)
+    return _finite_energy(atoms), "tight"
+
+
+def fixed_mask(atoms):
+    """Boolean mask of atoms held fixed by FixAtoms constraints."""
+    mask = np.zeros(len(atoms), dtype=bool)
+    for constraint in atoms.constraints:
+        if isinstance(constraint, FixAtoms):
+            mask[constraint.index] = True
+    return mask
+
+
+def relax_batch(atoms_list, evaluator, fmax=0.01, steps=None, dt=0.1, maxstep=0.2, dtmax=1.0,
+                nmin=5, finc=1.1, fdec=0.5, astart=0.1, fa=0.99):
+    """
+    Relax a batch of structures together with a lockstep FIRE optimizer.
+
+    Every iteration evaluates all still-active structures in one call to
+    ``evaluator``; structures drop out of the batch once their largest force
+    falls below ``fmax`` (or their energy becomes non-finite). FIRE is used
+    instead of PreconLBFGS because it needs no line search, so every step
+    costs exactly one batched model call.
+
+    The relaxed energies and forces are attached to each Atoms object through
+    a SinglePointCalculator. Returns a list of (energy, nsteps, converged).
+    """
+    n = len(atoms_list)
+    masks = [fixed_mask(atoms) for atoms in atoms_list]
+    velocities = [np.zeros((len(atoms), 3)) for atoms in atoms_list]
+    dts = np.full(n, dt)
+    alphas = np.full(n, astart)
+    downhill = np.zeros(n, dtype=int)
+    nsteps = np.zeros(n, dtype=int)
+    outcome = [(np.inf, 0, False)] * n
+
+    active = list(range(n))
+    while active:
+        energies, forces = evaluator([atoms_list[i] for i in active])
+
+        still_active = []
+        for i, energy, f in zip(active, energies, forces):
+            atoms = atoms_list[i]
+            f = np.array(f)
+            f[masks[i]] = 0.0
+            atoms.calc = SinglePointCalculator(atoms, energy=float(energy), forces=f)
+
+            if not np.isfinite(energy) or not np.all(np.isfinite(f)):
+                outcome[i] = (np.inf, int(nsteps[i]), False)
+                continue
+            if np.sqrt((f ** 2).sum(axis=1).max()) < fmax:
+                outcome[i] = (float(energy), int(nsteps[i]), True)
+                continue
+            if steps is not None and nsteps[i] >= steps:
+                outcome[i] = (float(energy), int(nsteps[i]), False)
+                continue
+
+            v = velocities[i]
+            vf = np.vdot(f, v)
+            if vf > 0.0:
+                v = (1.0 - alphas[i]) * v + alphas[i] * f / np.linalg.norm(f) * np.linalg.norm(v)
+                if downhill[i] > nmin:
+                    dts[i] = min(dts[i] * finc, dtmax)
+                    alphas[i] *= fa
+                downhill[i] += 1
+            else:
+                v = np.zeros_like(v)
+                alphas[i] = astart
+                dts[i] *= fdec
+                downhill[i] = 0
+
+            v = v + dts[i] * f
+            dr = dts[i] * v
+            norm_dr = np.linalg.norm(dr)
+            if norm_dr > maxstep:
+                dr *= maxstep / norm_dr
+            velocities[i] = v
+
+            atoms.set_positions(atoms.get_positions() + dr, apply_constraint=False)
+            nsteps[i] += 1
+            still_active.append(i)
+
+        active = still_active
+
+    return outcome
+
+
+def _count_batch(stats, nsteps, extra_calls=0):
+    if stats is not None:
+        for s, n in zip(stats, nsteps):
+            s["opt_steps"] = s.get("opt_steps", 0) + n
+            s["force_calls"] = s.get("force_calls", 0) + n + 1 + extra_calls
+
+
+def _relax_batch_full(atoms_list, evaluator, fmax, steps, cluster_radius=None, stats=None):
+    """relax_batch, optionally on cut clusters; energies always refer to the full structures."""
+    if cluster_radius is None:
+        outcome = relax_batch(atoms_list, evaluator, fmax=fmax, steps=steps)
+        _count_batch(stats, [nsteps for _, nsteps, _ in outcome])
+        return [energy for energy, _, _ in outcome]
+
+    cuts = [cut_cluster(atoms, cluster_radius) for atoms in atoms_list]
+    outcome = relax_batch([cluster for cluster, _ in cuts], evaluator, fmax=fmax, steps=steps)
+    _count_batch(stats, [nsteps for _, nsteps, _ in outcome], extra_calls=1)
+    for atoms, (cluster, mobile) in zip(atoms_list, cuts):
+        positions = atoms.get_positions()
+        positions[mobile] = cluster.positions[:len(mobile)]
+        atoms.set_positions(positions)
+
+    energies, forces = evaluator(atoms_list)
+    for atoms, energy, f in zip(atoms_list, energies, forces):
+        atoms.calc = SinglePointCalculator(atoms, energy=float(energy), forces=f)
+    return [float(e) if np.isfinite(e) else np.inf for e in energies]
+
+
+def relax_batch_staged(atoms_list, evaluator, fmax=0.01, steps=None, screen_cutoff=None,
+                       loose_fmax=None, loose_steps=None, tight_cutoff=None, cluster_radius=None, stats=None,
+                       screen_evaluator=None):
+    """
+    Batched counterpart of relax_structure; returns a list of (energy, stage).
+
+    The single-point screen is one batched evaluation, and the loose and
+    tight stages are relax_batch runs over the candidates that remain.
+    screen_evaluator, if given, runs the screen and loose stages.
+    stats, if given, is a list of dicts (one per structure) that receive
+    "opt_steps" and "force_calls". FIRE makes exactly one evaluation per
+    step, so force_calls is opt_steps plus one initial evaluation per
+    stage (and the screen and cluster re-evaluations).
+    """
+    screen_evaluator = screen_evaluator or evaluator
+    outcome = [(np.inf, "single-point")] * len(atoms_list)
+    active = list(range(len(atoms_list)))
+    if stats is not None:
+        for s in stats:
+            s.setdefault("opt_steps", 0)
+            s.setdefault("force_calls", 0)
+
+    def sub(indices):
+        return None if stats is None else [stats[i] for i in indices]
+
+    if screen_cutoff is not None:
+        energies, forces = screen_evaluator(atoms_list)
+        _count_batch(stats, [0] * len(atoms_list))
+        keep = []
+        for i, energy, f in zip(active, energies, forces):
+            atoms_list[i].calc = SinglePointCalculator(atoms_list[i], energy=float(energy), forces=f)
+            if np.isfinite(energy) and energy <= screen_cutoff:
+                keep.append(i)
+            else:
+                outcome[i] = (float(energy) if np.isfinite(energy) else np.inf, "single-point")
+        active = keep
+
+    if loose_fmax is not None and active:
+        loose = _relax_batch_full([atoms_list[i] for i in active], screen_evaluator, loose_fmax, loose_steps,
+                                  cluster_radius, stats=sub(active))
+        keep = []
+        for i, energy in zip(active, loose):
+            if np.isfinite(energy) and (tight_cutoff is None or energy <= tight_cutoff):
+                keep.append(i)
+            else:
+                outcome[i] = (energy, "loose")
+        active = keep
+
+    if active:
+        tight = _relax_batch_full([atoms_list[i] for i in active], evaluator, fmax, steps, cluster_radius,
+                                  stats=sub(active))
+        for i, energy in zip(active, tight):
+            outcome[i] = (energy, "tight")
+    return outcome
@@ -0,0 +1,213 @@
+import os
+import argparse
+
+import numpy as np
+
+
+def _centers(atoms, n_slab=None):
+    """Indices of the atoms a descriptor is built around: the adsorbate, i.e. the unconstrained atoms."""
+    from adsgen.relaxation import fixed_mask
+
+    if n_slab is not None:
+        return np.arange(n_slab, len(atoms))
+    mask = ~fixed_mask(atoms)
+    return np.where(mask)[0] if mask.any() and not mask.all() else np.arange(len(atoms))
+
+
+class DistanceHistogram:
+    """
+    Fixed-length structural descriptor built from interatomic distances.
+
+    For every pair of species (adsorbate atom species, any atom species), the
+    minimum-image distances from adsorbate atoms to all other atoms within
+    r_max are accumulated into a smooth histogram (linear interpolation
+    between bin centers, weighted by a cosine cutoff) and normalized by the
+    number of adsorbate atoms. The slab's internal geometry is ignored, so
+    the descriptor tracks where and how the adsorbate sits.
+    """
+
+    def __init__(self, species, r_max=6.0, bins=32, n_slab=None):
+        self.species = np.array(sorted(set(int(z) for z in species)))
+        self.r_max = r_max
+        self.bins = bins
+        self.n_slab = n_slab
+        self._index = np.full(self.species.max() + 1, -1)
+        self._index[self.species] = np.arange(len(self.species))
+
+    @property
+    def size(self):
+        return len(self.species) ** 2 * self.bins
+
+    def __call__(self, atoms):
+        from ase.geometry import get_distances
+
+        centers = _centers(atoms, self.n_slab)
+        _, d = get_distances(atoms.positions[centers], atoms.positions, cell=atoms.cell, pbc=atoms.pbc)
+        d[np.arange(len(centers)), centers] = np.inf
+
+        numbers = atoms.numbers
+        zi = np.broadcast_to(self._index[numbers[centers]][:, None], d.shape)
+        zj = np.broadcast_to(self._index[numbers][None, :], d.shape)
+        keep = (d < self.r_max) & (zi >= 0) & (zj >= 0)
+        d, zi, zj = d[keep], zi[keep], zj[keep]
+
+        pos = d / self.r_max * (self.bins - 1)
+        lo = np.floor(pos).astype(int)
+        frac = pos - lo
+        hi = np.minimum(lo + 1, self.bins - 1)
+        weight = 0.5 * (np.cos(np.pi * d / self.r_max) + 1.0)
+        pair = (zi * len(self.species) + zj) * self.bins
+
+        out = np.bincount(pair + lo, weight * (1.0 - frac), minlength=self.size)
+        out += np.bincount(pair + hi, weight * frac, minlength=self.size)
+        return out / max(len(centers), 1)
+
+
+class MACEDescriptor:
+    """Mean MACE node features of the adsorbate atoms (uses MACECalculator.get_descriptors)."""
+
+    def __init__(self, calc, n_slab=None):
+        self.calc = calc
+        self.n_slab = n_slab
+
+    def __call__(self, atoms):
+        features = self.calc.get_descriptors(atoms)
+        return features[_centers(atoms, self.n_slab)].mean(axis=0)
+
+
+def compute_descriptors(frames, descriptor):
+    """Stack descriptor(atoms) for an iterable of frames into an (n, d) array."""
+    return np.array([descriptor(atoms) for atoms in frames])
+
+
+def farthest_point_sampling(X, n_select, start=None):
+    """
+    Indices of n_select rows of X chosen by greedy farthest-point sampling.
+
+    Starts from the row farthest from the mean (or start) and repeatedly adds
+    the row with the largest distance to the already selected set. Keeps one
+    distance per row, so memory is O(n) and time O(n * n_select).
+    """
+    X = np.asarray(X, dtype=float)
+    n_select = min(n_select, len(X))
+    if start is None:
+        start = int(np.argmax(((X - X.mean(axis=0)) ** 2).sum(axis=1)))
+
+    # |a - b|^2 = |a|^2 - 2 a.b + |b|^2 turns every update into one matrix-vector product
+    sq = (X ** 2).sum(axis=1)
+    selected = [start]
+    min_dist = sq - 2.0 * X @ X[start] + sq[start]
+    for _ in range(n_select - 1):
+        nxt = int(np.argmax(min_dist))
+        if min_dist[nxt] <= 1e-12 * (1.0 + sq[nxt]):
+            break  # only duplicates remain
+        selected.append(nxt)
+        np.minimum(min_dist, sq - 2.0 * X @ X[nxt] + sq[nxt], out=min_dist)
+    return np.array(selected)
+
+
+def k_medoids(X, n_select, max_iter=20, chunk=4096):
+    """
+    Indices of n_select medoids of X, refined by alternating assignment.
+
+    Initialized with farthest-point sampling; each iteration assigns rows
+    to their nearest medoid and moves every medoid to the cluster member
+    closest to the cluster mean. Distances are only ever computed between
+    all rows and the current medoids, in chunks, so it scales to tens of
+    thousands of rows.
+    """
+    X = np.asarray(X, dtype=float)
+    medoids = farthest_point_sampling(X, n_select)
+    sq = (X ** 2).sum(axis=1)
+
+    for _ in range(max_iter):
+        M = X[medoids]
+        labels = np.empty(len(X), dtype=int)
+        for i in range(0, len(X), chunk):
+            d = sq[i:i + chunk, None] - 2.0 * X[i:i + chunk] @ M.T + (M ** 2).sum(axis=1)[None, :]
+            labels[i:i + chunk] = np.argmin(d, axis=1)
+
+        new = medoids.copy()
+        for k in range(len(medoids)):
+            members = np.where(labels == k)[0]
+            if len(members) == 0:
+                continue
+            centroid = X[members].mean(axis=0)
+            new[k] = members[np.argmin(((X[members] - centroid) ** 2).sum(axis=1))]
+        if np.array_equal(new, medoids):
+            break
+        medoids = new
+    return np.unique(medoids)
+
+
+SELECTION_METHODS = {"fps": farthest_point_sampling, "kmedoids": k_medoids}
+
+
+def select_diverse(descriptors, n_select, method="fps"):
+    """Indices (ascending) of the n_select most diverse rows of a descriptor matrix."""
+    if n_select >= len(descriptors):
+        return np.arange(len(descriptors))
+    X = np.asarray(descriptors, dtype=float)
+    scale = X.std(axis=0)
+    X = X / np.where(scale > 0, scale, 1.0)
+    return np.sort(SELECTION_METHODS[method](X, n_select))
+
+
+def select_structures(input_file, output_file, n_select, method="fps", descriptor="histogram",
+                      r_max=6.0, bins=32, n_slab=None, calc=None):
+    """
+    Write the n_select most diverse frames of input_file to output_file.
+
+    Frames are streamed twice (descriptors, then writing the selection), so
+    only the descriptor matrix is held in memory. The indices of the
+    selected frames in input_file are written next to output_file as
+    <output>.indices.txt. Returns the selected indices.
+    """
+    from ase.io import iread, read, write
+
+    if descriptor == "mace":
+        if calc is None:
+            raise ValueError("❌ The MACE descriptor needs a calculator")
+        describe = MACEDescriptor(calc, n_slab=n_slab)
+    else:
+        first = read(input_file, index=0)
+        describe = DistanceHistogram(first.numbers, r_max=r_max, bins=bins, n_slab=n_slab)
+
+    X = compute_descriptors(iread(input_file, index=":"), describe)
+    selected = select_diverse(X, n_select, method=method)
+
+    keep = set(selected.tolist())
+    write(output_file, [atoms for i, atoms in enumerate(iread(input_file, index=":")) if i in keep])
+    np.savetxt(os.path.splitext(output_file)[0] + ".indices.txt", selected, fmt="%d")
+    print(f"🎯 Selected {len(selected)} of {len(X)} frames ({method}, {descriptor} descriptor) → {output_file}")
+    return selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Select the most diverse structures before sending them to DFT")
+    parser.add_argument("--in", dest="input", type=str, default="results/training_data_mace_opt.xyz",
+                        help="Input structures (any ASE-readable file, e.g. .xyz or .traj)")
+    parser.add_argument("--out", type=str, required=True, help="Output file for the selected structures (.xyz or .traj)")
+    parser.add_argument("--n", type=int, required=True, help="Number of structures to select")
+    parser.add_argument("--method", choices=sorted(SELECTION_METHODS), default="fps",
+                        help="Farthest-point sampling or k-medoids")
+    parser.add_argument("--descriptor", choices=["histogram", "mace"], default="histogram",
+                        help="Distance histograms, or MACE node features (needs torch and a model)")
+    parser.add_argument("--model", type=str, help="MACE model for --descriptor mace")
+    parser.add_argument("--r-max", type=float, default=6.0, help="Histogram cutoff radius (Å)")
+    parser.add_argument("--bins", type=int, default=32, help="Histogram bins per species pair")
+    parser.add_argument("--n-slab", type=int,
+                        help="Number of slab atoms (default: adsorbate = atoms not fixed by constraints)")
+    args = parser.parse_args()
+
+    calc = None
+    if args.descriptor == "mace":
+        from adsgen.surface import get_mace_calculator
+        calc = get_mace_calculator(user_model_path=args.model)
+
+    select_structures(args.input, args.out, args.n, method=args.method, descriptor=args.descriptor,
+                      r_max=args.r_max, bins=args.bins, n_slab=args.n_slab, calc=calc)
+
+
+if __name__ == "__main__":
+    main()
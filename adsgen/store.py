@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+from ase.db import connect
+
+from adsgen.placement import POSE_DIMS
+
+
+class EvaluationStore:
+    """
+    Persistent record of finished evaluations, backed by an ASE SQLite database.
+
+    Each evaluation is committed as soon as it finishes, with its pose, step
+    number and relaxed structure (energy and forces attached), so an
+    interrupted run can be resumed and inspected with ``ase db``. The
+    unrelaxed structures written to initial_configurations.xyz are kept as
+    rows marked ``initial``, including those of poses that were screened or
+    failed and so never get a relaxed row.
+    """
+
+    def __init__(self, path, fresh=False):
+        self.path = path
+        if fresh and os.path.exists(path):
+            os.remove(path)
+        self.db = connect(path, type="db")
+
+    def __len__(self):
+        return self.db.count("step")
+
+    def add(self, step, pose, atoms):
+        """Commit one relaxed structure with its full pose (ordered as POSE_DIMS)."""
+        pose_keys = {f"pose_{dim}": float(v) for dim, v in zip(POSE_DIMS, pose)}
+        self.db.write(atoms, step=int(step), **pose_keys)
+
+    def add_initial(self, atoms):
+        """Commit one unrelaxed structure, in the order it was written to the initial configurations."""
+        self.db.write(atoms, initial=True)
+
+    def load(self):
+        """Return stored evaluations ordered by step as (step, pose, atoms, energy)."""
+        rows = []
+        for row in self.db.select("step", sort="step"):
+            pose = np.array([row.key_value_pairs[f"pose_{dim}"] for dim in POSE_DIMS])
+            rows.append((row.step, pose, row.toatoms(), row.energy))
+        return rows
+
+    def load_initial(self):
+        """Return the stored unrelaxed structures in the order they were written."""
+        return [row.toatoms() for row in self.db.select("initial")]
@@ -1,12 +1,12 @@
 import os
-from ase.io import read
 import argparse
-from adsgen.vasp_io import traj_to_vasp_inputs
 
 def load_structure(path):
     """
     Load molecule or surface from file. Supports .xyz and .vasp/.inp formats.
     """
+    from ase.io import read
+
     try:
         return read(path)
     except Exception as e:
@@ -17,11 +17,18 @@ def main():
     parser = argparse.ArgumentParser(description="Convert .traj file to VASP input folders")
     parser.add_argument("--traj", type=str, required=True, help="Path to .traj file")
     parser.add_argument("--out", type=str, default="vasp_inputs", help="Output directory for VASP folders")
-    parser.add_argument("--incar", type=str, help="Path to INCAR file")
-    parser.add_argument("--vsub", type=str, help="Path to submission script")
+    parser.add_argument("--incar", type=str, help="Path to INCAR file (default: INCAR in --templates)")
+    parser.add_argument("--vsub", type=str, help="Path to submission script, placed in every folder like the inputs")
+    parser.add_argument("--templates", type=str, default=".", help="Directory holding INCAR, KPOINTS and POTCAR")
+    parser.add_argument("--link", choices=["hardlink", "symlink", "copy", "shared"], default="hardlink",
+                        help="How shared inputs reach each folder; 'shared' leaves them only in <out>/shared")
+    parser.add_argument("--jobs", type=int, default=4, help="Threads writing POSCAR files")
     args = parser.parse_args()
 
-    traj_to_vasp_inputs(args.traj, args.out, args.incar, args.vsub)
+    # Imported after argument parsing so --help and usage errors stay fast
+    from adsgen.vasp_io import traj_to_vasp_inputs
+    traj_to_vasp_inputs(args.traj, args.out, incar=args.incar, vsub=args.vsub, link=args.link,
+                        jobs=args.jobs, template_dir=args.templates)
 
 if __name__ == "__main__":
     main()
@@ -1,15 +1,20 @@
 import numpy as np
-from boss.bo.bo_main import BOMain
-from boss.pp.pp_main import PPMain
-from ase.io import read, write, Trajectory
-from ase.constraints import FixAtoms
 from ase.parallel import parprint
-from ase.optimize.precon import PreconLBFGS
-from mace.calculators import MACECalculator
-import matplotlib.pyplot as plt
 import os
-import torch
+import json
+import time
 import warnings
+from adsgen.output import StructureWriter
+from adsgen.convergence import ConvergenceMonitor
+from adsgen.execution import apply_execution
+from adsgen.instrumentation import EventLog, relaxed_opt_steps
+from adsgen.placement import PlacementEngine
+from adsgen.pose_cache import PoseCache
+from adsgen.store import EvaluationStore
+from adsgen.symmetry import SearchDomain
+from adsgen.warm_start import WarmStartIndex
+from adsgen.relaxation import MACEBatchEvaluator, relax_batch_staged, relax_structure, screen_contacts
+from adsgen.workers import RelaxationPool, worker_threads
 
 warnings.filterwarnings("ignore", category=FutureWarning, module="torch")
 
@@ -29,7 +34,60 @@ def log_step(step, energy, x_shift, y_shift, z_shift, alpha, beta, gamma, log_fi
         log.write(f"Energy: {energy:.6f} eV\n")
         log.write("-" * 50 + "\n")
 
-def get_mace_calculator(user_model_path=None):
+def batch_user_func(func, dim):
+    """BOSS user function wrapper that evaluates a whole batch of points in one call."""
+    from boss.bo.userfunc import UserFunc, UserFuncOutput
+
+    class BatchUserFunc(UserFunc):
+        def evaluate(self, X_in):
+            X_in = np.atleast_2d(X_in)
+            Y = np.asarray(self.func(X_in), dtype=float).reshape(-1, 1)
+            return UserFuncOutput(X_in, Y)
+
+    return BatchUserFunc(func, dim)
+
+# Calculators already loaded in this process, keyed by model path and dtype
+_calculators = {}
+
+
+def _pin_dtype(calc, dtype):
+    """
+    Make calc set torch's default dtype before every calculation.
+
+    MACECalculator builds its input tensors in the default dtype, which the
+    last loaded calculator sets globally, so float32 and float64 models can
+    only share a process if each restores its own dtype.
+    """
+    import torch
+
+    torch_dtype = getattr(torch, dtype)
+    calculate = calc.calculate
+
+    def calculate_in_dtype(*args, **kwargs):
+        torch.set_default_dtype(torch_dtype)
+        return calculate(*args, **kwargs)
+
+    calc.calculate = calculate_in_dtype
+    return calc
+
+
+def _load_mace(model_path, device, dtype="float64"):
+    """MACECalculator for model_path in the given precision."""
+    from mace.calculators import MACECalculator
+
+    return _pin_dtype(MACECalculator(model_paths=model_path, device=device, default_dtype=dtype), dtype)
+
+
+def get_mace_calculator(user_model_path=None, dtype="float64"):
+    """
+    MACE calculator for the user model, else the cached or bundled one.
+
+    The model is loaded once per process and precision; later calls with
+    the same model and dtype return the same calculator, so a long-lived
+    process running many systems pays for loading only once.
+    """
+    import torch
+
     device = "cuda" if torch.cuda.is_available() else "cpu"
     print(f"Running on {device.upper()}.")
 
@@ -48,22 +106,103 @@ def get_mace_calculator(user_model_path=None):
     else:
         raise FileNotFoundError("❌ No MACE model found in cache, fallback, or user path.")
 
-    return MACECalculator(model_paths=model_paths, device=device, default_dtype="float64")
+    if (model_paths, dtype) not in _calculators:
+        _calculators[model_paths, dtype] = _load_mace(model_paths, device, dtype)
+    return _calculators[model_paths, dtype]
+
+DEFAULT_OPT_DIMS = ["x", "y", "alpha", "beta", "gamma"]
+
+DEFAULT_BOUNDS = {
+    "x": (0, 4.07),
+    "y": (0, 4.07),
+    "z": (0, 5.0),
+    "alpha": (0, 359),
+    "beta": (0, 359),
+    "gamma": (0, 359),
+}
+
+DEFAULT_RELAX_OPTIONS = {
+    "fmax": 0.01,               # tight relaxation force criterion (eV/Å)
+    "max_steps": None,          # step budget of the tight relaxation
+    "clash_dist": None,         # reject poses with molecule-slab distances below this (Å)
+    "max_contact_dist": None,   # reject poses with no molecule-slab distance below this (Å)
+    "screen_margin": None,      # skip relaxation if single-point E > best + margin (eV)
+    "loose_fmax": None,         # force criterion of the loose relaxation stage (eV/Å)
+    "loose_steps": None,        # step budget of the loose relaxation stage
+    "tight_margin": None,       # tight relaxation only if loose E <= best + margin (eV)
+    "cluster_radius": None,     # relax against slab atoms within this radius of the molecule (Å)
+}
 
 def run_adsorption_optimization(output_dir="results", model_paths=None, opt_dims=None, bounds=None,
-                                 nstruct=100, initpts=None, iterpts=None):
+                                 nstruct=100, initpts=None, iterpts=None, batch_size=1,
+                                 n_workers=1, torch_threads=1, cache_tol=None, resume=False,
+                                 relax_options=None, profile_steps=None, stop_options=None, execution=None,
+                                 symmetry_reduce=False, symmetry_tol=0.1, warm_start_radius=None):
+    """
+    Run BOSS over rigid-body poses of the molecule with MACE relaxations.
+
+    With batch_size > 1, BOSS proposes batch_size points per iteration
+    (Kriging believer) and the whole batch is relaxed together, with one
+    batched MACE forward pass per optimizer step.
+
+    With n_workers > 1, relaxations run in a pool of worker processes that
+    each hold one resident MACE model limited to torch_threads threads. BOSS
+    then proposes at least n_workers points per iteration; the main process
+    builds the poses and remains the only writer of the log and outputs.
+
+    With cache_tol set, poses equivalent to an already relaxed one (within
+    cache_tol, up to lattice translations and the molecule's point group)
+    reuse the cached energy instead of being relaxed again.
+
+    Every finished evaluation is committed to evaluations.db in output_dir.
+    With resume=True the stored evaluations seed BOSS, the trajectory and
+    configuration files are rebuilt from the store, and only the remaining
+    part of the initpts + iterpts budget is evaluated.
+
+    relax_options (see DEFAULT_RELAX_OPTIONS) configures a staged evaluation:
+    a neighbor-list clash/too-far check, a single-point screen, a loose
+    relaxation, and the tight relaxation, which only runs for candidates
+    within the configured margins of the best energy found so far. Screened
+    poses return their partial energy to BOSS and are not written as
+    relaxed structures. With cluster_radius set, the molecule is relaxed
+    against a cut-out of the frozen slab (periodic images included) and the
+    full-slab energy is recomputed afterwards, so energies stay comparable.
+
+    Every evaluation is also logged as one JSON line in events.jsonl with
+    its outcome, wall time per phase (bo, placement, relax, write), optimizer
+    steps, calculator calls and peak RSS; a summary table is printed and
+    appended to the log at the end. With profile_steps=(first, last), those
+    evaluations run under cProfile (see EventLog).
+
+    stop_options (see DEFAULT_STOP_OPTIONS in adsgen.convergence) enables
+    early stopping of the BO iterations on stagnation of the best energy,
+    low GP uncertainty at the predicted minimum, or a low rate of new
+    distinct minima; the reason the run ended is printed, logged and
+    recorded in the run_end event.
+
+    execution (see DEFAULT_EXECUTION in adsgen.execution) sets the model
+    precision of the final relaxations (dtype) and of the screen and loose
+    stages (screen_dtype), the torch intra-/inter-op thread counts and the
+    CPU cores this process is pinned to.
+
+    With symmetry_reduce=True, the x, y and alpha bounds are replaced by the
+    irreducible domain of the slab and molecule (see SearchDomain), written
+    to symmetry_domain.json, and every relaxed pose is expanded to all its
+    equivalents in the full space in full_space_poses.csv.
+
+    With warm_start_radius set, each candidate starts its relaxation from the
+    relaxed internal geometry of the nearest earlier pose within that radius
+    (same metric as cache_tol), keeping its own rigid-body placement (see
+    WarmStartIndex). Warm-started evaluations log the neighbour's step and
+    steps_saved, the neighbour's own optimizer steps minus this
+    relaxation's (negative if the warm start took longer), which the run
+    summary totals.
+    """
     if opt_dims is None:
-        opt_dims = ["x", "y", "alpha", "beta", "gamma"]
-
-    if bounds is None:
-        bounds = {
-            "x": (0, 4.07),
-            "y": (0, 4.07),
-            "z": (0, 5.0),
-            "alpha": (0, 359),
-            "beta": (0, 359),
-            "gamma": (0, 359),
-        }
+        opt_dims = list(DEFAULT_OPT_DIMS)
+
+    # Dimensions without explicit bounds keep the defaults
+    bounds = dict(DEFAULT_BOUNDS, **(bounds or {}))
 
     # Compute init/iter points if not explicitly specified
     if initpts is None or iterpts is None:
@@ -80,78 +219,407 @@ def run_adsorption_optimization(output_dir="results", model_paths=None, opt_dims
     log_file = os.path.join(output_dir, "optimization_log.txt")
     initial_xyz_file = os.path.join(output_dir, "initial_configurations.xyz")
     traj_file = os.path.join(output_dir, f"{len(opt_dims)}D_optimization_trajectory.traj")
-    output_graph_file = os.path.join(output_dir, "adsorption_energy_vs_steps.png")
-    trajectory = Trajectory(traj_file, 'w')
+    combined_xyz = os.path.join(output_dir, "training_data_mace_opt.xyz")
+    store = EvaluationStore(os.path.join(output_dir, "evaluations.db"), fresh=not resume)
+    stored = store.load() if resume else []
 
-    # Clear previous logs and files
-    with open(log_file, 'w') as f:
-        f.write("Step-by-step Optimization Log\n" + "=" * 50 + "\n")
-    open(initial_xyz_file, 'w').close()
+    engine = PlacementEngine(
+        os.path.join(output_dir, "surface.inp"),
+        os.path.join(output_dir, "molecule.xyz"),
+        opt_dims=opt_dims,
+    )
 
-    calc = get_mace_calculator(user_model_path=model_paths)
+    domain = None
+    if symmetry_reduce:
+        domain = SearchDomain(engine, opt_dims, bounds, tol=symmetry_tol)
+        bounds = domain.bounds
+        print(domain.describe())
+        with open(os.path.join(output_dir, "symmetry_domain.json"), "w") as f:
+            json.dump(domain.to_dict(), f, indent=2)
 
-    def func(X):
-        var_dict = dict(zip(opt_dims, map(float, X.ravel())))
-        x_shift = var_dict.get("x", 0.0)
-        y_shift = var_dict.get("y", 0.0)
-        z_shift = var_dict.get("z", 0.0)
-        alpha = var_dict.get("alpha", 0.0)
-        beta = var_dict.get("beta", 0.0)
-        gamma = var_dict.get("gamma", 0.0)
+    # Clear previous logs and files; a resumed run rebuilds them from the store
+    if resume:
+        with open(log_file, 'a') as f:
+            f.write(f"Resumed with {len(stored)} stored evaluations\n" + "=" * 50 + "\n")
+    else:
+        with open(log_file, 'w') as f:
+            f.write("Step-by-step Optimization Log\n" + "=" * 50 + "\n")
+    writer = StructureWriter(initial_xyz_file, traj_file, combined_xyz)
+    events = EventLog(os.path.join(output_dir, "events.jsonl"), append=resume, profile_steps=profile_steps)
 
-        try:
-            atoms = read(os.path.join(output_dir, "surface.inp"), format='vasp')
-            atoms.set_constraint(FixAtoms(indices=[atom.index for atom in atoms]))
+    results.clear()
+    initial = store.load_initial() if resume else []
+    for atoms in initial:
+        writer.write_initial(atoms)
+    for step, pose, atoms, energy in stored:
+        if not initial:
+            # Stores of older runs hold no initial structures; rebuild those of the relaxed poses
+            writer.write_initial(engine.make_atoms(engine.molecule_positions(pose)[0]))
+        writer.write_relaxed(atoms)
+        results.append((*pose, energy))
+    if stored:
+        print(f"Resuming from {len(stored)} stored evaluations in {store.path}")
+
+    cache = PoseCache(engine, tol=cache_tol) if cache_tol else None
+    if cache is not None:
+        print(f"Pose cache enabled: tol={cache_tol} Å, {len(cache.rotations)} molecular symmetry operation(s).")
+        for step, pose, _, energy in stored:
+            cache.add(engine.points(pose), energy, step)
+
+    warm = WarmStartIndex(engine, radius=warm_start_radius) if warm_start_radius else None
+    if warm is not None:
+        print(f"Warm starts enabled: radius={warm_start_radius} Å.")
+        stored_steps = relaxed_opt_steps(os.path.join(output_dir, "events.jsonl")) if stored else {}
+        for step, pose, atoms, _ in stored:
+            warm.add(engine.points(pose), atoms, step, stored_steps.get(step))
 
-            mol = read(os.path.join(output_dir, "molecule.xyz"))
-            center = mol.get_center_of_mass()
+    options = dict(DEFAULT_RELAX_OPTIONS, **(relax_options or {}))
+    monitor = ConvergenceMonitor(stop_options)
+    for _, _, _, energy in stored:
+        monitor.observe(energy)
+        monitor.add_minimum(energy)
+    screened_counts = {}
+    screened_energies = []
+
+    def stage_kwargs():
+        kwargs = {
+            "fmax": options["fmax"],
+            "steps": options["max_steps"],
+            "loose_fmax": options["loose_fmax"],
+            "loose_steps": options["loose_steps"],
+            "cluster_radius": options["cluster_radius"],
+        }
+        best = min((r[-1] for r in results), default=np.inf)
+        if np.isfinite(best):
+            if options["screen_margin"] is not None:
+                kwargs["screen_cutoff"] = best + options["screen_margin"]
+            if options["tight_margin"] is not None:
+                kwargs["tight_cutoff"] = best + options["tight_margin"]
+        return kwargs
 
-            if "alpha" in opt_dims: mol.rotate(alpha, 'z', center=center)
-            if "beta" in opt_dims: mol.rotate(beta, 'y', center=center)
-            if "gamma" in opt_dims: mol.rotate(gamma, 'x', center=center)
+    def warm_start(x, atoms):
+        """Apply a warm start to a placed candidate; returns the event fields it adds."""
+        if warm is None:
+            return {}
+        neighbor = warm.apply(x, atoms)
+        if neighbor is None:
+            return {}
+        step, opt_steps = neighbor
+        return {"warm_start": step, "neighbor_steps": opt_steps}
 
-            min_z = min(atom.position[2] for atom in mol)
-            max_z = max(atom.position[2] for atom in atoms)
+    def learn(x, atoms, warm_fields, stats):
+        """Index a relaxed structure for later warm starts; returns warm_fields with steps_saved added."""
+        if warm is None:
+            return warm_fields
+        warm.add(x, atoms, len(results), stats.get("opt_steps"))
+        if warm_fields.get("neighbor_steps") is None or stats.get("opt_steps") is None:
+            return warm_fields
+        return dict(warm_fields, steps_saved=warm_fields["neighbor_steps"] - stats["opt_steps"])
 
-            mol.translate([x_shift, y_shift, z_shift + max_z + 2.5 - min_z])
-            atoms.extend(mol)
+    def contact_reason(atoms):
+        return screen_contacts(atoms, engine.n_slab, options["clash_dist"], options["max_contact_dist"])
 
-            write(initial_xyz_file, atoms, append=True)
+    def emit(x, outcome, phases=None, **fields):
+        events.emit("evaluation", phases=phases, outcome=outcome,
+                    pose=dict(zip(opt_dims, np.ravel(x).round(4).tolist())), **fields)
 
-            atoms.calc = calc
-            opt = PreconLBFGS(atoms, use_armijo=True, precon=None, variable_cell=False)
-            opt.run(fmax=0.01)
+    # Time between two evaluations is spent in BOSS (GP fit and acquisition)
+    clock = {"last": None}
 
-            energy = atoms.get_potential_energy()
-            if not np.isfinite(energy):
-                raise ValueError("Non-finite energy")
+    def bo_time():
+        if clock["last"] is not None:
+            events.add_time("bo", time.perf_counter() - clock["last"])
 
-            step = len(results) + 1
-            results.append((x_shift, y_shift, z_shift, alpha, beta, gamma, energy))
-            log_step(step, energy, x_shift, y_shift, z_shift, alpha, beta, gamma, log_file)
-            trajectory.write(atoms)
+    def screen(x, stage, energy=None):
+        # Geometry rejects get the worst energy seen so far as a penalty.
+        if energy is None:
+            energy = max([r[-1] for r in results] + screened_energies, default=np.inf)
+        else:
+            screened_energies.append(energy)
+        screened_counts[stage] = screened_counts.get(stage, 0) + 1
+        with open(log_file, 'a', encoding='utf-8') as log:
+            log.write(f"Screened ({stage}): {dict(zip(opt_dims, np.ravel(x).round(2)))}, Energy: {energy:.6f} eV\n")
+            log.write("-" * 50 + "\n")
+        return energy
+
+    profile = apply_execution(execution)
+    screen_dtype = profile["screen_dtype"] if profile["screen_dtype"] != profile["dtype"] else None
+    if screen_dtype:
+        print(f"Precision: {screen_dtype} for screening and loose relaxations, {profile['dtype']} for final relaxations.")
+
+    pool = None
+    screen_calc = None
+    if n_workers > 1:
+        pool = RelaxationPool(n_workers, model_path=model_paths, torch_threads=torch_threads,
+                              dtype=profile["dtype"], screen_dtype=screen_dtype, execution=profile)
+        batch_size = max(batch_size, n_workers)
+        intra, interop = worker_threads(torch_threads, profile)
+        print(f"Relaxing with {n_workers} worker processes, {intra} intra-op and {interop} inter-op torch thread(s) each.")
+    else:
+        calc = get_mace_calculator(user_model_path=model_paths, dtype=profile["dtype"])
+        if screen_dtype:
+            screen_calc = get_mace_calculator(user_model_path=model_paths, dtype=screen_dtype)
+
+    def record(x, atoms, energy):
+        pose = engine.poses(x)[0]
+        step = len(results) + 1
+        results.append((*pose, energy))
+        log_step(step, energy, *pose, log_file)
+        writer.write_relaxed(atoms)
+        store.add(step, pose, atoms)
+        if cache is not None:
+            cache.add(x, energy, step)
+
+    def write_initial(atoms):
+        writer.write_initial(atoms)
+        store.add_initial(atoms)
+
+    def cached(x):
+        if cache is None:
+            return None
+        hit = cache.lookup(x)
+        if hit is not None:
+            energy, step = hit
+            with open(log_file, 'a', encoding='utf-8') as log:
+                log.write(f"Cache hit: {dict(zip(opt_dims, np.ravel(x).round(2)))} -> Step {step}, Energy: {energy:.6f} eV\n")
+                log.write("-" * 50 + "\n")
+            return energy
+        return None
+
+    def func(X):
+        bo_time()
+        relaxed = len(results)
+        with events.evaluation():
+            energy = evaluate(X)
+        monitor.observe(energy)
+        if len(results) > relaxed:
+            monitor.add_minimum(results[-1][-1])
+        clock["last"] = time.perf_counter()
+        return energy
+
+    def evaluate(X):
+        var_dict = dict(zip(opt_dims, map(float, X.ravel())))
+
+        energy = cached(X)
+        if energy is not None:
+            emit(X, "cached", energy=energy)
+            return energy
+
+        stats = {}
+        try:
+            with events.phase("placement"):
+                atoms = engine.build(X)
+                reason = contact_reason(atoms)
+            if reason is not None:
+                energy = screen(X, reason)
+                emit(X, "screened", reason=reason, energy=energy)
+                return energy
+
+            with events.phase("write"):
+                write_initial(atoms)
+            warm_fields = warm_start(X, atoms)
+
+            with events.phase("relax"):
+                energy, stage = relax_structure(atoms, calc, stats=stats, screen_calc=screen_calc, **stage_kwargs())
+            if stage != "tight":
+                energy = screen(X, stage, energy)
+                emit(X, "screened", reason=stage, energy=energy, **warm_fields, **stats)
+                return energy
+
+            with events.phase("write"):
+                record(X, atoms, energy)
+            warm_fields = learn(X, atoms, warm_fields, stats)
+            emit(X, "relaxed", step=len(results), energy=float(energy), **warm_fields, **stats)
             return float(energy)
 
         except Exception as e:
             safe_parprint(f"Optimization failed at {var_dict}: {e}")
+            emit(X, "failed", reason=str(e), **stats)
             return np.inf
 
+    def relax_candidates(candidates):
+        if pool is not None:
+            return pool.relax(candidates, **stage_kwargs())
+        stats = [{} for _ in candidates]
+        outcome = relax_batch_staged(candidates, batch_evaluator, stats=stats, screen_evaluator=screen_evaluator,
+                                     **stage_kwargs())
+        return [(atoms, energy, stage, None if np.isfinite(energy) else "Non-finite energy", s)
+                for atoms, (energy, stage), s in zip(candidates, outcome, stats)]
+
+    def func_batch(X):
+        bo_time()
+        X = np.atleast_2d(X)
+        with events.evaluation(len(X)):
+            outcomes = {}
+            energies = evaluate_batch(X, outcomes)
+        # Batch phases are shared, so each evaluation is charged an equal part
+        phases = {k: v / len(X) for k, v in events.take_phases().items()}
+        for i, x in enumerate(X):
+            outcome, fields = outcomes.get(i, ("failed", {}))
+            emit(x, outcome, phases=phases, batch_size=len(X), **fields)
+            monitor.observe(energies[i])
+            if outcome == "relaxed":
+                monitor.add_minimum(fields["energy"])
+        clock["last"] = time.perf_counter()
+        return energies
+
+    def evaluate_batch(X, outcomes):
+        energies = np.full(len(X), np.inf)
+        todo = []
+        for i, x in enumerate(X):
+            energy = cached(x)
+            if energy is None:
+                todo.append(i)
+            else:
+                energies[i] = energy
+                outcomes[i] = ("cached", {"energy": energy})
+        if not todo:
+            return energies
+
+        warm_fields = {}
+        try:
+            candidates = []
+            with events.phase("placement"):
+                built = engine.build_batch(X[todo])
+            for i, atoms in zip(list(todo), built):
+                with events.phase("placement"):
+                    reason = contact_reason(atoms)
+                if reason is not None:
+                    energies[i] = screen(X[i], reason)
+                    outcomes[i] = ("screened", {"reason": reason, "energy": energies[i]})
+                    todo.remove(i)
+                else:
+                    with events.phase("write"):
+                        write_initial(atoms)
+                    warm_fields[i] = warm_start(X[i], atoms)
+                    candidates.append(atoms)
+            if not todo:
+                return energies
+
+            with events.phase("relax"):
+                relaxed = relax_candidates(candidates)
+        except Exception as e:
+            safe_parprint(f"Batch optimization failed for {len(todo)} points: {e}")
+            for i in todo:
+                outcomes[i] = ("failed", {"reason": str(e)})
+            return energies
+
+        for i, (x, (atoms, energy, stage, error, stats)) in zip(todo, zip(X[todo], relaxed)):
+            if error is None and stage != "tight":
+                energies[i] = screen(x, stage, energy)
+                outcomes[i] = ("screened", {"reason": stage, "energy": energies[i], **warm_fields[i], **stats})
+            elif error is None:
+                with events.phase("write"):
+                    record(x, atoms, energy)
+                energies[i] = energy
+                fields = learn(x, atoms, warm_fields[i], stats)
+                outcomes[i] = ("relaxed", {"step": len(results), "energy": float(energy), **fields, **stats})
+            else:
+                safe_parprint(f"Optimization failed at {dict(zip(opt_dims, x))}: {error}")
+                outcomes[i] = ("failed", {"reason": error, **stats})
+        return energies
+
     bounds_array = np.array([bounds[dim] for dim in opt_dims])
     kernel = ["rbf"] * len(opt_dims)
 
     print(f"Using {initpts} initial points and {iterpts} iterations for BO.")
-    bo = BOMain(func, bounds_array, kernel=kernel, initpts=initpts, iterpts=iterpts, parallel_optims=16)
-    res = bo.run()
+    budget = initpts + iterpts
+    iter_left = max(budget - max(initpts, len(stored)), 0)
+    bo_iters = -(-iter_left // batch_size)
+    # BOSS proposes whole batches, so the last one can run past the budget
+    planned = max(initpts, len(stored)) + bo_iters * batch_size
+    bo_keywords = {}
+    if batch_size > 1:
+        if pool is None:
+            batch_evaluator = MACEBatchEvaluator(calc)
+            screen_evaluator = MACEBatchEvaluator(screen_calc) if screen_calc is not None else None
+        bo_keywords = dict(batchtype="kb", batchpts=batch_size)
+        print(f"Batched mode: {batch_size} structures per BO iteration ({bo_iters} iterations).")
+        if planned > budget:
+            print(f"⚠️ {iter_left} BO evaluations are not a multiple of the batch size {batch_size}; "
+                  f"the last batch runs {planned - budget} past the budget of {budget}.")
+
+    from boss.bo.bo_main import BOMain
+    from boss.pp.pp_main import PPMain
+
+    bo = BOMain(func, bounds_array, kernel=kernel, initpts=initpts, iterpts=bo_iters,
+                parallel_optims=16, **bo_keywords)
+    if batch_size > 1:
+        bo.user_func = batch_user_func(func_batch, len(opt_dims))
+    if monitor.enabled:
+        # BOSS calls the checker with its results after every iteration
+        bo.conv_checker = monitor
+
+    # Stored evaluations take the place of the first initial points
+    X_init, Y_init = bo.get_initpts()
+    if stored:
+        X_stored = engine.points(np.array([pose for _, pose, _, _ in stored]))
+        Y_stored = np.array([[energy] for _, _, _, energy in stored])
+        X_init = np.vstack([X_stored, X_init[len(stored):]])
+        Y_init = np.vstack([Y_stored, Y_init[len(stored):]])
 
     try:
-        PPMain(res, pp_models=True, pp_acq_funcs=True).run()
+        clock["last"] = time.perf_counter()
+        if batch_size > 1:
+            missing = np.where(np.isnan(Y_init[:, 0]))[0]
+            for i in range(0, len(missing), batch_size):
+                chunk = missing[i:i + batch_size]
+                Y_init[chunk, 0] = func_batch(X_init[chunk])
+        res = bo.run(X_init=X_init, Y_init=Y_init)
+    finally:
+        if pool is not None:
+            pool.close()
+    bo_time()
+
+    evaluated = monitor.evaluations
+    if monitor.reason is not None:
+        stop_reason = monitor.reason
+        summary = (f"🛑 Stopped early after {evaluated} of {planned} planned evaluations "
+                   f"({max(planned - evaluated, 0)} saved): {stop_reason}")
+    else:
+        stop_reason = "budget exhausted"
+        summary = f"Completed {evaluated} evaluations (budget {budget})"
+        if evaluated > budget:
+            summary += f", {evaluated - budget} past the budget to fill the last batch of {batch_size}"
+    print(summary)
+    with open(log_file, 'a', encoding='utf-8') as log:
+        log.write(summary + "\n")
+
+    if cache is not None:
+        summary = f"Pose cache: {cache.hits}/{cache.lookups} hits ({100 * cache.hit_rate:.1f}%), relaxations skipped: {cache.hits}"
+        print(summary)
+        with open(log_file, 'a', encoding='utf-8') as log:
+            log.write(summary + "\n")
+
+    if warm is not None:
+        summary = f"Warm starts: {warm.hits} of {warm.poses.lookups} relaxations started from a relaxed neighbour"
+        print(summary)
+        with open(log_file, 'a', encoding='utf-8') as log:
+            log.write(summary + "\n")
+
+    if screened_counts:
+        summary = "Screened poses: " + ", ".join(f"{k}={v}" for k, v in screened_counts.items())
+        print(summary)
+        with open(log_file, 'a', encoding='utf-8') as log:
+            log.write(summary + "\n")
+
+    try:
+        with events.phase("postprocess"):
+            PPMain(res, pp_models=True, pp_acq_funcs=True).run()
     except Exception as e:
         safe_parprint(f"⚠️ Postprocessing failed: {e}")
 
-    trajectory.close()
-
-    # Combine structures
-    all_structures = read(initial_xyz_file, ":") + read(traj_file, ":")
-    combined_xyz = os.path.join(output_dir, "training_data_mace_opt.xyz")
-    write(combined_xyz, all_structures)
+    with events.phase("write"):
+        writer.close()
+        if domain is not None:
+            expanded = domain.write_expanded([r[:6] for r in results], [r[-1] for r in results],
+                                             os.path.join(output_dir, "full_space_poses.csv"))
+            print(f"Full-space images of {len(results)} relaxed poses written to {expanded}")
+    events.emit("run_end", evaluations=events.evaluations, stop_reason=stop_reason,
+                distinct_minima=len(monitor.minima))
+    summary = events.summary("BOSS + MACE run summary")
+    print(summary)
+    with open(log_file, 'a', encoding='utf-8') as log:
+        log.write(summary + "\n")
+    events.close()
     print(f"Combined structures saved to {combined_xyz}")
@@ -0,0 +1,249 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def _kabsch(P, Q):
+    """Proper rotation R minimising |R @ P.T - Q.T| for row-vector sets P, Q."""
+    H = P.T @ Q
+    U, _, Vt = np.linalg.svd(H)
+    d = np.sign(np.linalg.det(Vt.T @ U.T))
+    D = np.diag([1.0, 1.0, d])
+    return Vt.T @ D @ U.T
+
+
+def maps_onto_itself(R, positions, numbers, tree=None, tol=0.1):
+    """True if rotating positions by R reproduces the same structure (species-aware)."""
+    if tree is None:
+        tree = cKDTree(positions)
+    rotated = positions @ R.T
+    dist, idx = tree.query(rotated)
+    return bool(np.all(dist < tol) and np.all(numbers[idx] == numbers))
+
+
+def molecule_rotations(positions, numbers, tol=0.1):
+    """
+    Proper rotations of the molecule's point group.
+
+    Positions must be centred on the rotation centre (e.g. the centre of mass).
+    Candidate rotations map two non-collinear anchor atoms of the rarest
+    species onto symmetry-compatible partners and are kept if they map the
+    whole molecule onto itself. Returns an array (n_ops, 3, 3) that always
+    starts with the identity.
+    """
+    positions = np.asarray(positions, dtype=float)
+    numbers = np.asarray(numbers)
+    norms = np.linalg.norm(positions, axis=1)
+    ops = [np.eye(3)]
+
+    # Anchors: farthest atom of the rarest species, then the atom most
+    # perpendicular to it, both away from the centre.
+    species, counts = np.unique(numbers, return_counts=True)
+    candidates = np.where(norms > tol)[0]
+    if len(candidates) < 2:
+        return np.array(ops)
+    rare = [z for _, z in sorted(zip(counts, species)) if np.any(numbers[candidates] == z)][0]
+    pool_a = candidates[numbers[candidates] == rare]
+    a = pool_a[np.argmax(norms[pool_a])]
+
+    cross = np.linalg.norm(np.cross(positions[a], positions[candidates]), axis=1)
+    if cross.max() < tol:
+        # Linear molecule: only the identity is representable as a discrete op set.
+        return np.array(ops)
+    b = candidates[np.argmax(cross)]
+
+    ref = np.array([positions[a], positions[b], np.cross(positions[a], positions[b])])
+    dot_ab = positions[a] @ positions[b]
+    tree = cKDTree(positions)
+
+    partners_a = np.where((numbers == numbers[a]) & (np.abs(norms - norms[a]) < tol))[0]
+    partners_b = np.where((numbers == numbers[b]) & (np.abs(norms - norms[b]) < tol))[0]
+    for i in partners_a:
+        for j in partners_b:
+            if i == j or abs(positions[i] @ positions[j] - dot_ab) > tol * (norms[a] + norms[b]):
+                continue
+            target = np.array([positions[i], positions[j], np.cross(positions[i], positions[j])])
+            R = _kabsch(ref, target)
+            if any(np.allclose(R, op, atol=1e-3) for op in ops):
+                continue
+            if maps_onto_itself(R, positions, numbers, tree=tree, tol=tol):
+                ops.append(R)
+
+    return np.array(ops)
+
+
+def _wrap(frac, eps=1e-6):
+    """Reduce fractional coordinates into [0, 1), sending values within eps below 1 to 0."""
+    frac = frac - np.floor(frac + eps)
+    return np.where(frac < 0.0, 0.0, frac)
+
+
+def _maps_periodic(moved, positions, numbers, cell, tol):
+    """True if moved positions (in-plane periodic) coincide with positions, species included."""
+    frac = np.linalg.solve(cell.T, (moved[:, None, :] - positions[None, :, :]).reshape(-1, 3).T).T
+    frac[:, :2] -= np.round(frac[:, :2])
+    dist = np.linalg.norm(frac @ cell, axis=1).reshape(len(moved), len(positions))
+    nearest = np.argmin(dist, axis=1)
+    return bool(np.all(dist[np.arange(len(moved)), nearest] < tol) and np.all(numbers[nearest] == numbers))
+
+
+def lattice_translations(positions, numbers, cell, tol=0.1):
+    """
+    In-plane translations (k, 2) that map the slab onto itself, reduced into the cell.
+
+    Candidates connect one atom of the rarest species to every atom of the
+    same species at the same height. Always starts with the zero vector; the
+    number of translations is the number of primitive surface cells in the
+    slab cell.
+    """
+    positions = np.asarray(positions, dtype=float)
+    numbers = np.asarray(numbers)
+    cell = np.asarray(cell, dtype=float)
+    species, counts = np.unique(numbers, return_counts=True)
+    rare = species[np.argmin(counts)]
+    ref = np.where(numbers == rare)[0][0]
+    same = np.where((numbers == rare) & (np.abs(positions[:, 2] - positions[ref, 2]) < tol))[0]
+
+    translations = [np.zeros(2)]
+    for j in same:
+        t = positions[j] - positions[ref]
+        t[2] = 0.0
+        if np.linalg.norm(t) < tol:
+            continue
+        if _maps_periodic(positions + t, positions, numbers, cell, tol):
+            frac = _wrap(np.linalg.solve(cell[:2, :2].T, t[:2]))
+            translations.append(frac @ cell[:2, :2])
+    return np.array(translations)
+
+
+def surface_rotation(positions, numbers, cell, tol=0.1, orders=(6, 4, 3, 2)):
+    """
+    Highest-order rotation about a z axis that maps the slab onto itself.
+
+    Axes through the in-plane positions of the slab atoms are tried, from
+    the top layer down. Returns (order, axis_xy); order 1 if none is found.
+    """
+    positions = np.asarray(positions, dtype=float)
+    numbers = np.asarray(numbers)
+    cell = np.asarray(cell, dtype=float)
+    axes = positions[np.argsort(-positions[:, 2]), :2]
+    for m in orders:
+        theta = 2.0 * np.pi / m
+        R = np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+        for p in axes:
+            moved = positions.copy()
+            moved[:, :2] = (positions[:, :2] - p) @ R.T + p
+            if _maps_periodic(moved, positions, numbers, cell, tol):
+                return m, p
+    return 1, np.zeros(2)
+
+
+def z_rotation_order(rotations, tol=1e-3):
+    """Order n of the molecule's rotations about its z axis (C_n) among point-group operations."""
+    return sum(1 for R in rotations if abs(R[2, 2] - 1.0) < tol)
+
+
+class SearchDomain:
+    """
+    Irreducible part of the rigid-body search space of a molecule on a slab.
+
+    The x/y shift is restricted to one primitive surface cell, written as the
+    box [0, a1) x [0, A / a1) for a primitive vector a1 along x and cell area
+    A, which tiles the plane under the slab's lattice translations. alpha is
+    restricted to [0, 360 / k), where k combines the molecule's C_n about its
+    z axis with the slab's C_m about z; the slab rotation only acts on alpha
+    alone when beta and gamma are not optimized, so C_m is dropped otherwise.
+    expand() maps poses back to all their equivalents in the full space
+    (whole slab cell, alpha in [0, 360)).
+    """
+
+    def __init__(self, engine, opt_dims, bounds, tol=0.1):
+        self.engine = engine
+        self.opt_dims = list(opt_dims)
+        self.full_bounds = dict(bounds)
+        self.tol = tol
+        self.cell = np.asarray(engine.cell, dtype=float)
+        positions, numbers = engine.slab_positions, engine.slab_numbers
+
+        self.translations = lattice_translations(positions, numbers, self.cell, tol=tol)
+        along_x = [t for t in self.translations if abs(t[1]) < tol and t[0] > tol]
+        area = abs(np.linalg.det(self.cell[:2, :2])) / len(self.translations)
+        if along_x:
+            self.a1 = min(t[0] for t in along_x)
+        elif abs(self.cell[0, 1]) < tol:
+            self.a1 = self.cell[0, 0]
+        else:
+            self.a1 = None
+        self.height = area / self.a1 if self.a1 else None
+
+        self.n = z_rotation_order(molecule_rotations(engine.mol_local, engine.mol_numbers, tol=tol))
+        self.m, self.axis = surface_rotation(positions, numbers, self.cell, tol=tol)
+        if "beta" in self.opt_dims or "gamma" in self.opt_dims:
+            self.m = 1
+        self.k = int(np.lcm(self.n, self.m))
+
+        self.bounds = dict(bounds)
+        if self.a1 is not None:
+            if "x" in self.opt_dims:
+                self.bounds["x"] = (0.0, float(self.a1))
+            if "y" in self.opt_dims:
+                self.bounds["y"] = (0.0, float(self.height))
+        if "alpha" in self.opt_dims:
+            self.bounds["alpha"] = (0.0, 360.0 / self.k)
+
+    def volume(self, bounds):
+        return float(np.prod([bounds[dim][1] - bounds[dim][0] for dim in self.opt_dims]))
+
+    @property
+    def reduction(self):
+        """Volume of the given bounds over the volume of the irreducible bounds."""
+        return self.volume(self.full_bounds) / self.volume(self.bounds)
+
+    def describe(self):
+        cells = f"{len(self.translations)} primitive cell(s) in the slab"
+        if self.a1 is None:
+            cells += " (no lattice vector along x; x/y bounds unchanged)"
+        return (f"Symmetry-reduced domain: {cells}, molecule C{self.n} about z, slab C{self.m} about z "
+                f"→ " + ", ".join(f"{dim} {self.bounds[dim][0]:.3f}–{self.bounds[dim][1]:.3f}" for dim in self.opt_dims)
+                + f" ({self.reduction:.1f}x smaller than the given bounds)")
+
+    def to_dict(self):
+        return {"bounds": {dim: list(map(float, self.bounds[dim])) for dim in self.opt_dims},
+                "full_bounds": {dim: list(map(float, self.full_bounds[dim])) for dim in self.opt_dims},
+                "translations": self.translations.tolist(), "primitive_a1": self.a1, "primitive_height": self.height,
+                "molecule_cn": self.n, "slab_cm": self.m, "slab_axis": self.axis.tolist(),
+                "reduction": self.reduction}
+
+    def expand(self, pose, atol=1e-5):
+        """
+        All poses (k, 6) equivalent to a full pose (ordered as POSE_DIMS) in the full search space.
+
+        x/y are wrapped into the slab cell and alpha into [0, 360), both with
+        a small tolerance so images on a cell edge are not counted twice;
+        images closer than atol (Å, degrees) are merged.
+        """
+        pose = np.asarray(pose, dtype=float)
+        center = self.engine.mol_center[:2]
+        inplane = self.cell[:2, :2]
+        images = []
+        for i in range(self.m):
+            theta = 2.0 * np.pi * i / self.m
+            R = np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+            shift = R @ (center + pose[:2] - self.axis) + self.axis - center
+            for j in range(self.n):
+                alpha = 360.0 * _wrap((pose[3] + 360.0 * i / self.m + 360.0 * j / self.n) / 360.0)
+                for t in self.translations:
+                    frac = _wrap(np.linalg.solve(inplane.T, shift + t))
+                    image = np.array([*(frac @ inplane), pose[2], alpha, pose[4], pose[5]])
+                    if not any(np.allclose(image, other, atol=atol) for other in images):
+                        images.append(image)
+        images = np.array(images)
+        return images[np.lexsort(images.T[::-1])]
+
+    def write_expanded(self, poses, energies, path):
+        """Write every full-space image of each (pose, energy) as CSV rows: step, image, pose..., energy."""
+        with open(path, "w") as f:
+            f.write("step,image,x,y,z,alpha,beta,gamma,energy\n")
+            for step, (pose, energy) in enumerate(zip(poses, energies), 1):
+                for i, image in enumerate(self.expand(pose)):
+                    f.write(f"{step},{i}," + ",".join(f"{v:.6f}" for v in image) + f",{energy:.6f}\n")
+        return path
@@ -0,0 +1,193 @@
+import os
+import csv
+import argparse
+
+import numpy as np
+
+SCORE_METRICS = ["force_dev_max", "force_dev_mean", "energy_std"]
+# Which frames of the input are scored: relaxed ones carry an energy, unrelaxed initial poses do not
+FRAME_CHOICES = ["relaxed", "all"]
+
+
+class MACECommitteeEvaluator:
+    """
+    Evaluates a MACE committee on many structures at once.
+
+    The atomic graphs are built once per batch of structures and every
+    committee member runs on the same batched graph, so scoring costs one
+    graph construction and one forward pass per model instead of one
+    calculator call per model and structure.
+    """
+
+    def __init__(self, calc):
+        self.calc = calc
+
+    def __call__(self, atoms_list):
+        """Return (energies (n_models, n), forces list of (n_models, n_i, 3) arrays)."""
+        import torch
+        from mace.tools import torch_geometric
+
+        calc = self.calc
+        # Graph tensors take torch's default dtype, which must match the committee
+        torch.set_default_dtype(next(calc.models[0].parameters()).dtype)
+        graphs = [calc._atoms_to_batch(atoms).get_example(0) for atoms in atoms_list]
+        batch = torch_geometric.Batch.from_data_list(graphs).to(calc.device)
+        ptr = batch.ptr.cpu().numpy()
+
+        energies, forces = [], []
+        for model in calc.models:
+            out = model(batch.to_dict(), compute_stress=False, training=False)
+            energies.append(out["energy"].detach().cpu().numpy() * calc.energy_units_to_eV)
+            forces.append(out["forces"].detach().cpu().numpy() * (calc.energy_units_to_eV / calc.length_units_to_A))
+        forces = np.stack(forces)
+        return np.stack(energies), [forces[:, ptr[i]:ptr[i + 1]] for i in range(len(atoms_list))]
+
+
+class CalculatorCommittee:
+    """Committee of plain ASE calculators with the same interface as MACECommitteeEvaluator."""
+
+    def __init__(self, calcs):
+        self.calcs = calcs
+
+    def __call__(self, atoms_list):
+        energies = np.zeros((len(self.calcs), len(atoms_list)))
+        forces = []
+        for j, atoms in enumerate(atoms_list):
+            probe = atoms.copy()
+            f = []
+            for m, calc in enumerate(self.calcs):
+                probe.calc = calc
+                energies[m, j] = probe.get_potential_energy()
+                f.append(probe.get_forces(apply_constraint=False))
+            forces.append(np.stack(f))
+        return energies, forces
+
+
+def load_committee(model_paths, device=None, dtype="float64"):
+    """MACECalculator holding every model in model_paths, wrapped for batched committee evaluation."""
+    import torch
+    from mace.calculators import MACECalculator
+    from adsgen.surface import _pin_dtype
+
+    if len(model_paths) < 2:
+        raise ValueError("❌ A committee needs at least two models")
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    calc = _pin_dtype(MACECalculator(model_paths=list(model_paths), device=device, default_dtype=dtype), dtype)
+    return MACECommitteeEvaluator(calc)
+
+
+def committee_scores(energies, forces, natoms):
+    """
+    Disagreement scores of a committee, one row per structure.
+
+    energy_std is the standard deviation of the committee energies per atom
+    (eV/atom). force_dev_max and force_dev_mean are the largest and mean
+    per-atom force deviation sqrt(<|F_m - <F>|^2>) over the committee
+    (eV/Å). Returns a dict of (n,) arrays.
+    """
+    natoms = np.asarray(natoms, dtype=float)
+    scores = {"energy_std": np.std(energies, axis=0) / natoms,
+              "force_dev_max": np.empty(len(forces)), "force_dev_mean": np.empty(len(forces))}
+    for i, f in enumerate(forces):
+        dev = np.sqrt(((f - f.mean(axis=0)) ** 2).sum(axis=2).mean(axis=0))
+        scores["force_dev_max"][i] = dev.max()
+        scores["force_dev_mean"][i] = dev.mean()
+    return scores
+
+
+def score_frames(frames, evaluator, batch_size=32):
+    """Committee scores for an iterable of frames, evaluated batch_size structures at a time."""
+    chunks = {metric: [] for metric in SCORE_METRICS}
+    batch = []
+
+    def flush():
+        energies, forces = evaluator(batch)
+        for metric, values in committee_scores(energies, forces, [len(a) for a in batch]).items():
+            chunks[metric].append(values)
+        batch.clear()
+
+    for atoms in frames:
+        batch.append(atoms)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return {metric: np.concatenate(values) if values else np.empty(0) for metric, values in chunks.items()}
+
+
+def is_relaxed(atoms):
+    """True for frames written with a computed energy, i.e. relaxed structures."""
+    return atoms.calc is not None and "energy" in atoms.calc.results
+
+
+def write_scores(scores, path, indices=None):
+    """Write scores to CSV; indices are the input frame indices of the rows (default 0..n-1)."""
+    n = len(scores[SCORE_METRICS[0]])
+    indices = range(n) if indices is None else indices
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["index"] + SCORE_METRICS)
+        for row, i in enumerate(indices):
+            writer.writerow([i] + [f"{scores[m][row]:.6g}" for m in SCORE_METRICS])
+    print(f"📄 Saved committee scores to {path}")
+
+
+def select_uncertain(input_file, output_file, n_select, evaluator, metric="force_dev_max", batch_size=32,
+                     frames="relaxed"):
+    """
+    Score the frames of input_file with a committee and write the n_select most uncertain.
+
+    frames="relaxed" scores only relaxed frames (those with an energy),
+    skipping the unrelaxed initial poses; frames="all" scores every frame.
+    Scores go to <output>.scores.csv, indexed by input frame; the selected
+    frames keep input order and carry their scores in atoms.info. Returns
+    the selected input indices.
+    """
+    from ase.io import iread, write
+
+    if frames not in FRAME_CHOICES:
+        raise ValueError(f"❌ frames must be one of {FRAME_CHOICES}, got {frames!r}")
+
+    candidates = []
+
+    def scored_frames():
+        for i, atoms in enumerate(iread(input_file, index=":")):
+            if frames == "all" or is_relaxed(atoms):
+                candidates.append(i)
+                yield atoms
+
+    scores = score_frames(scored_frames(), evaluator, batch_size=batch_size)
+    write_scores(scores, os.path.splitext(output_file)[0] + ".scores.csv", candidates)
+
+    rows = np.sort(np.argsort(-scores[metric], kind="stable")[:n_select])
+    keep = {candidates[row]: row for row in rows.tolist()}
+    selected = []
+    for i, atoms in enumerate(iread(input_file, index=":")):
+        if i in keep:
+            atoms.info.update({m: float(scores[m][keep[i]]) for m in SCORE_METRICS})
+            selected.append(atoms)
+    write(output_file, selected)
+    print(f"🎯 Selected the {len(selected)} most uncertain of {len(candidates)} {frames} frames by {metric} → {output_file}")
+    return np.array(sorted(keep), dtype=int)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score structures by MACE committee disagreement and keep the most uncertain")
+    parser.add_argument("--in", dest="input", type=str, default="results/training_data_mace_opt.xyz",
+                        help="Input structures (any ASE-readable file)")
+    parser.add_argument("--models", nargs="+", required=True, help="Paths of the committee's MACE models (two or more)")
+    parser.add_argument("--out", type=str, required=True, help="Output file for the selected structures")
+    parser.add_argument("--n", type=int, required=True, help="Number of structures to keep")
+    parser.add_argument("--metric", choices=SCORE_METRICS, default="force_dev_max", help="Score to rank structures by")
+    parser.add_argument("--batch-size", type=int, default=32, help="Structures per batched committee evaluation")
+    parser.add_argument("--frames", choices=FRAME_CHOICES, default="relaxed",
+                        help="Score only relaxed frames (default) or every frame, including unrelaxed initial poses")
+    args = parser.parse_args()
+
+    evaluator = load_committee(args.models)
+    select_uncertain(args.input, args.out, args.n, evaluator, metric=args.metric, batch_size=args.batch_size,
+                     frames=args.frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,116 @@
-from ase.io import read, write
+from ase.io import iread, write
 import os
+import errno
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
-def traj_to_vasp_inputs(traj_path, output_dir="vasp_inputs"):
+LINK_MODES = ["hardlink", "symlink", "copy", "shared"]
+
+
+def _place(src, dst, mode):
+    """Put src at dst by hardlink, symlink or copy; returns the method actually used."""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if mode == "hardlink":
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError as e:
+            # Different filesystem or no hardlink support: fall back to a symlink
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            mode = "symlink"
+    if mode == "symlink":
+        os.symlink(os.path.relpath(src, os.path.dirname(dst)), dst)
+        return "symlink"
+    shutil.copy(src, dst)
+    return "copy"
+
+
+def traj_to_vasp_inputs(traj_path, output_dir="vasp_inputs", incar=None, vsub=None, link="hardlink",
+                        jobs=4, template_dir="."):
     """
     Converts MACE optimized trajectory to VASP input folders.
 
     Requires:
-        - INCAR, KPOINTS, and POTCAR present in the current working directory.
+        - KPOINTS and POTCAR in template_dir (default: the current working
+          directory), and INCAR there too unless ``incar`` gives its path.
+
+    The trajectory is streamed frame by frame and the POSCARs are written by
+    ``jobs`` threads. INCAR, KPOINTS, POTCAR (and the submission script
+    ``vsub``, if given) are copied once into ``output_dir/shared`` and each
+    conf_XXX folder gets them according to ``link``: "hardlink" (falls back
+    to symlinks across filesystems), "symlink", "copy", or "shared", where
+    the folders only hold POSCAR and jobs use the shared directory.
+    Returns a summary dict of what was created.
     """
+    if link not in LINK_MODES:
+        raise ValueError(f"❌ Unknown link mode '{link}', expected one of {LINK_MODES}")
 
-    required_files = ["INCAR", "KPOINTS", "POTCAR"]
-    for f in required_files:
-        if not os.path.exists(f):
-            raise FileNotFoundError(f"❌ Required file '{f}' not found in current directory.")
+    sources = {
+        "INCAR": incar or os.path.join(template_dir, "INCAR"),
+        "KPOINTS": os.path.join(template_dir, "KPOINTS"),
+        "POTCAR": os.path.join(template_dir, "POTCAR"),
+    }
+    if vsub:
+        sources[os.path.basename(vsub)] = vsub
+    for name, path in sources.items():
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"❌ Required file '{name}' not found at '{path}'.")
 
     os.makedirs(output_dir, exist_ok=True)
-    images = read(traj_path, index=":")
+    shared_dir = os.path.join(output_dir, "shared")
+    os.makedirs(shared_dir, exist_ok=True)
+    shared = {}
+    for name, path in sources.items():
+        shared[name] = os.path.join(shared_dir, name)
+        shutil.copy(path, shared[name])
+    sizes = {name: os.path.getsize(path) for name, path in shared.items()}
 
-    for i, atoms in enumerate(images):
+    def stage(i, atoms):
         folder = os.path.join(output_dir, f"conf_{i:03d}")
         os.makedirs(folder, exist_ok=True)
+        write(os.path.join(folder, "POSCAR"), atoms, format="vasp")
+        if link == "shared":
+            return []
+        return [(name, _place(shared[name], os.path.join(folder, name), link)) for name in shared]
+
+    counts = {}
+    avoided = 0
+    n = 0
 
-        # Write POSCAR
-        poscar_path = os.path.join(folder, "POSCAR")
-        write(poscar_path, atoms, format="vasp")
-        
-        # Copy user-supplied INCAR, KPOINTS, POTCAR into each folder
-        for f in required_files:
-            shutil.copy(f, os.path.join(folder, f))
+    def collect(futures):
+        nonlocal avoided
+        for future in futures:
+            for name, method in future.result():
+                counts[method] = counts.get(method, 0) + 1
+                if method != "copy":
+                    avoided += sizes[name]
 
-    print(f"📁 Created {len(images)} VASP input folders in '{output_dir}' with POSCAR, INCAR, KPOINTS, POTCAR.")
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = []
+        for i, atoms in enumerate(iread(traj_path, index=":")):
+            pending.append(executor.submit(stage, i, atoms))
+            n += 1
+            # Bound the number of frames held in memory
+            if len(pending) >= 4 * jobs:
+                collect(pending)
+                pending = []
+        collect(pending)
 
+    if link == "shared":
+        avoided = n * sum(sizes.values())
+    summary = {
+        "folders": n,
+        "output_dir": output_dir,
+        "shared_dir": shared_dir,
+        "shared_files": sorted(shared),
+        "placed": counts,
+        "bytes_avoided": avoided,
+    }
+    plural = {"hardlink": "hardlinks", "symlink": "symlinks", "copy": "copies"}
+    placed = ", ".join(f"{v} {plural[k]}" for k, v in sorted(counts.items())) or f"none, jobs use {shared_dir}"
+    print(f"📁 Created {n} VASP input folders in '{output_dir}' with POSCAR; "
+          f"shared {', '.join(sorted(shared))} placed as: {placed}.")
+    print(f"💾 Avoided writing about {summary['bytes_avoided'] / 1e6:.1f} MB of duplicate input files.")
+    return summary
@@ -1,12 +1,67 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from ase.io import read, write
 from ase.optimize.precon import PreconLBFGS
 from ase.calculators.vasp import Vasp
 
+from adsgen.instrumentation import EventLog
 
-def run_single_step_optimization(skip_vasp=False, vasp_command="mpirun -np 4 vasp_std"):
-    mace_xyz = "training_data_mace_opt.xyz"
-    output_xyz = "training_data_vasp_opt.xyz"
+VASP_SETTINGS = dict(
+    encut=400,
+    kpts=[1, 1, 1],
+    ediff=1e-4,
+    nsw=1,
+    ibrion=2,
+    isif=2,
+    lwave=False,
+    lcharg=False,
+    istart=0,
+    nelm=100,
+)
+
+
+def outcar_finished(workdir):
+    """True if workdir holds an OUTCAR from a VASP run that ran to completion."""
+    outcar = os.path.join(workdir, "OUTCAR")
+    if not os.path.exists(outcar):
+        return False
+    with open(outcar, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(f.tell() - 65536, 0))
+        return b"General timing and accounting" in f.read()
+
+
+def _run_job(i, atoms, workdir, command):
+    """Single-step optimization of one structure inside its own working directory; returns (atoms, seconds)."""
+    start = time.perf_counter()
+    os.makedirs(workdir, exist_ok=True)
+    write(os.path.join(workdir, "POSCAR"), atoms)
+
+    atoms.calc = Vasp(directory=workdir, command=command, **VASP_SETTINGS)
+    opt = PreconLBFGS(atoms, maxstep=0.05, logfile=os.path.join(workdir, "opt.log"))
+    opt.run(fmax=0.05, steps=1)
+    return atoms, time.perf_counter() - start
+
+
+def run_single_step_optimization(skip_vasp=False, vasp_command="mpirun -np 4 vasp_std", output_dir=".",
+                                 max_jobs=1, skip_completed=True, event_log=None,
+                                 input_file="training_data_mace_opt.xyz"):
+    """
+    Single-step VASP optimization of every structure in input_file (in output_dir).
+
+    Up to max_jobs VASP jobs run at once, each in its own output_dir/vasp_opt_{i}
+    directory without changing the process working directory. vasp_command is
+    a template that may use {index} and {workdir}, e.g. to point at a fake
+    vasp_std script for local testing. With skip_completed, directories that
+    already contain a finished OUTCAR are read back instead of being rerun.
+    Results are written in structure order.
+
+    With event_log set to a JSONL path, one event per structure (outcome,
+    wall time, failure reason) is appended to it and a summary is printed.
+    """
+    mace_xyz = os.path.join(output_dir, input_file)
+    output_xyz = os.path.join(output_dir, "training_data_vasp_opt.xyz")
 
     if not os.path.exists(mace_xyz):
         raise FileNotFoundError(f"❌ Missing required file: {mace_xyz}")
@@ -16,42 +71,42 @@ def run_single_step_optimization(skip_vasp=False, vasp_command="mpirun -np 4 vas
         return
 
     structures = read(mace_xyz, index=":")
-    optimized_structures = []
-
-    for i, atoms in enumerate(structures):
-        workdir = f"vasp_opt_{i}"
-        os.makedirs(workdir, exist_ok=True)
-        os.chdir(workdir)
-
-        write("POSCAR", atoms)
-
-        atoms.calc = Vasp(
-            command=vasp_command,
-            encut=400,
-            kpts=[1, 1, 1],
-            ediff=1e-4,
-            nsw=1,
-            ibrion=2,
-            isif=2,
-            lwave=False,
-            lcharg=False,
-            istart=0,
-            nelm=100,
-        )
-
-        try:
-            opt = PreconLBFGS(atoms, maxstep=0.05)
-            opt.run(fmax=0.05, steps=1)
-            optimized_structures.append(atoms)
-            print(f"✅ Optimized structure {i}")
-        except Exception as e:
-            print(f"❌ Optimization failed for structure {i}: {e}")
-
-        os.chdir("..")
+    optimized_structures = [None] * len(structures)
+    events = EventLog(event_log, append=True) if event_log else None
+
+    def emit(i, outcome, seconds=0.0, **fields):
+        if events is not None:
+            events.emit("vasp_job", phases={"vasp": seconds}, outcome=outcome, index=i, **fields)
+
+    with ThreadPoolExecutor(max_workers=max_jobs) as executor:
+        futures = {}
+        for i, atoms in enumerate(structures):
+            workdir = os.path.abspath(os.path.join(output_dir, f"vasp_opt_{i}"))
+            if skip_completed and outcar_finished(workdir):
+                optimized_structures[i] = read(os.path.join(workdir, "OUTCAR"), index=-1)
+                print(f"⏭️ Structure {i} already finished, reading {workdir}/OUTCAR")
+                emit(i, "skipped")
+                continue
+            command = vasp_command.format(index=i, workdir=workdir)
+            futures[executor.submit(_run_job, i, atoms, workdir, command)] = i
+
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                optimized_structures[i], seconds = future.result()
+                print(f"✅ Optimized structure {i}")
+                emit(i, "finished", seconds, opt_steps=1)
+            except Exception as e:
+                print(f"❌ Optimization failed for structure {i}: {e}")
+                emit(i, "failed", reason=str(e))
 
+    optimized_structures = [atoms for atoms in optimized_structures if atoms is not None]
     if optimized_structures:
         write(output_xyz, optimized_structures)
         print(f"\n✅ All VASP-optimized structures saved to '{output_xyz}'")
     else:
         print("⚠️ No successful optimizations.")
 
+    if events is not None:
+        print(events.summary("VASP single-step summary"))
+        events.close()
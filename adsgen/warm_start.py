@@ -0,0 +1,55 @@
+from adsgen.pose_cache import PoseCache
+from adsgen.symmetry import _kabsch
+
+
+class WarmStartIndex:
+    """
+    Relaxed molecule geometries indexed by the pose they were placed at.
+
+    Lookups use the symmetry-aware pose metric of PoseCache with radius as
+    its tolerance. A candidate with a relaxed neighbour gets the neighbour's
+    relaxed internal geometry, rotated by Kabsch alignment onto the
+    candidate's rigidly placed molecule and centred on it, so the rigid-body
+    placement chosen by BO is kept and only the internal relaxation is
+    reused. Each entry also keeps the optimizer steps its own relaxation
+    took, so the effect of a warm start can be measured against them.
+    """
+
+    def __init__(self, engine, radius=0.5):
+        self.n_slab = engine.n_slab
+        self.poses = PoseCache(engine, tol=radius)
+        self.geometries = []
+        self.steps = []
+        self.opt_steps = []
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.geometries)
+
+    def add(self, X, atoms, step=None, opt_steps=None):
+        """Index the relaxed molecule of atoms under its initial pose X, with the optimizer steps it took."""
+        mol = atoms.get_positions()[self.n_slab:]
+        self.geometries.append(mol - mol.mean(axis=0))
+        self.steps.append(step)
+        self.opt_steps.append(opt_steps)
+        self.poses.add(X, 0.0, len(self.geometries) - 1)
+
+    def apply(self, X, atoms):
+        """
+        Replace the molecule in atoms by its nearest relaxed neighbour's geometry.
+
+        Returns (neighbour's step, neighbour's optimizer steps), or None
+        without a neighbour within the radius.
+        """
+        hit = self.poses.lookup(X)
+        if hit is None:
+            return None
+        geometry = self.geometries[hit[1]]
+        positions = atoms.get_positions()
+        placed = positions[self.n_slab:]
+        center = placed.mean(axis=0)
+        R = _kabsch(geometry, placed - center)
+        positions[self.n_slab:] = geometry @ R.T + center
+        atoms.set_positions(positions)
+        self.hits += 1
+        return self.steps[hit[1]], self.opt_steps[hit[1]]
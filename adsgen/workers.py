@@ -0,0 +1,114 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from ase.calculators.singlepoint import SinglePointCalculator
+
+# Per-process state, populated once by _init_worker in each worker process.
+_worker = {}
+
+
+def worker_threads(torch_threads, execution=None):
+    """
+    (intra-op, inter-op) torch threads of a worker process.
+
+    The execution profile's intra_threads and interop_threads apply to
+    workers as to the main process; without them a worker uses
+    torch_threads intra-op threads and a single inter-op thread.
+    """
+    from adsgen.execution import execution_profile
+
+    profile = execution_profile(execution)
+    return profile["intra_threads"] or torch_threads, profile["interop_threads"] or 1
+
+
+def worker_cores(cores, n_workers, slot):
+    """Cores of worker number slot when cores are shared out in contiguous blocks among n_workers."""
+    if len(cores) < n_workers:
+        return [cores[slot % len(cores)]]
+    return [int(c) for c in np.array_split(np.array(cores), n_workers)[slot]]
+
+
+def worker_slots(n_workers):
+    """Shared counter handing each spawned worker its slot for worker_cores, as (counter, n_workers)."""
+    return multiprocessing.get_context("spawn").Value("i", 0), n_workers
+
+
+def _init_worker(model_path, torch_threads, dtype="float64", screen_dtype=None, execution=None, slots=None):
+    """
+    Load the MACE model(s) once per worker and size its torch thread pools (see worker_threads).
+
+    With the profile's cores set and slots from worker_slots, each worker is
+    pinned to its own block of those cores (see worker_cores).
+    """
+    from adsgen.execution import execution_profile, parse_cores
+
+    profile = execution_profile(execution)
+    if profile["cores"] is not None and slots is not None and hasattr(os, "sched_setaffinity"):
+        counter, n_workers = slots
+        with counter.get_lock():
+            slot = counter.value
+            counter.value += 1
+        os.sched_setaffinity(0, worker_cores(parse_cores(profile["cores"]), n_workers, slot % n_workers))
+
+    intra, interop = worker_threads(torch_threads, execution)
+    os.environ["OMP_NUM_THREADS"] = str(intra)
+    os.environ["MKL_NUM_THREADS"] = str(intra)
+
+    import torch
+    torch.set_num_threads(intra)
+    torch.set_num_interop_threads(interop)
+
+    from adsgen.surface import get_mace_calculator
+    _worker["calc"] = get_mace_calculator(user_model_path=model_path, dtype=dtype)
+    _worker["screen_calc"] = get_mace_calculator(user_model_path=model_path, dtype=screen_dtype) if screen_dtype else None
+
+
+def _relax_in_worker(task):
+    """Relax one candidate; returns (relaxed atoms, energy, stage, error message or None, stats)."""
+    from adsgen.instrumentation import peak_rss_mb
+    from adsgen.relaxation import relax_structure
+
+    atoms, relax_kwargs = task
+    stats = {}
+    try:
+        energy, stage = relax_structure(atoms, _worker["calc"], stats=stats, screen_calc=_worker["screen_calc"],
+                                        **relax_kwargs)
+        forces = atoms.get_forces(apply_constraint=False)
+        # MACECalculator does not pickle; ship results back as a single point.
+        atoms.calc = SinglePointCalculator(atoms, energy=float(energy), forces=forces)
+        return atoms, float(energy), stage, None, stats
+    except Exception as e:
+        atoms.calc = None
+        return atoms, np.inf, None, str(e), stats
+    finally:
+        stats["worker_rss_mb"] = round(peak_rss_mb(), 1)
+
+
+class RelaxationPool:
+    """
+    Pool of worker processes, each holding one resident MACE model.
+
+    The main process sends candidate structures and receives the relaxed
+    structures and energies in submission order, so logging and trajectory
+    writes stay in a single process.
+    """
+
+    def __init__(self, n_workers, model_path=None, torch_threads=1, dtype="float64", screen_dtype=None, execution=None):
+        # Spawn rather than fork: forking a process that already holds torch
+        # thread pools can deadlock the children.
+        self.executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_path, torch_threads, dtype, screen_dtype, execution, worker_slots(n_workers)),
+        )
+
+    def relax(self, candidates, **relax_kwargs):
+        """Relax candidates in parallel; returns a list of (atoms, energy, stage, error, stats)."""
+        tasks = [(atoms, relax_kwargs) for atoms in candidates]
+        return list(self.executor.map(_relax_in_worker, tasks))
+
+    def close(self):
+        self.executor.shutdown()
@@ -14,8 +14,12 @@ setup(
     entry_points={
         "console_scripts": [
             "adsgen-generate=adsgen.generator:main",
+            "adsgen-campaign=adsgen.campaign:main",
             "adsgen-vaspgen=adsgen.structure_io:main",
             "adsgen-compare=adsgen.analysis:main",
+            "adsgen-select=adsgen.selection:main",
+            "adsgen-uncertainty=adsgen.uncertainty:main",
+            "adsgen-benchmark=adsgen.benchmark:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,30 @@
+import os
+
+import pytest
+from ase.build import molecule
+
+from adsgen.benchmark import make_synthetic_system
+from adsgen.placement import PlacementEngine
+
+
+@pytest.fixture
+def system_dir(tmp_path):
+    """Directory with a 4x4x3 Cu(111) slab (surface.inp) and CO (molecule.xyz)."""
+    make_synthetic_system(str(tmp_path))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def make_engine(system_dir):
+    """Factory of PlacementEngines for the system in system_dir, optionally with another molecule."""
+    def make(opt_dims=("x", "y", "alpha"), mol=None):
+        if mol is not None:
+            mol.write(os.path.join(system_dir, "molecule.xyz"))
+        return PlacementEngine(os.path.join(system_dir, "surface.inp"), os.path.join(system_dir, "molecule.xyz"),
+                               opt_dims=list(opt_dims))
+    return make
+
+
+@pytest.fixture
+def nh3():
+    return molecule("NH3")
@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pytest
+
+from adsgen.analysis import (compare_energies, extract_dft_energies_by_conf, load_energies_by_id_from_txt,
+                             read_dft_energy, save_energies_by_id, tail_find_line)
+
+TOTEN = "  free  energy   TOTEN  =      {:.8f} eV\n"
+
+
+def write_outcar(path, energies, filler=200, truncated_tail=""):
+    with open(path, "w") as f:
+        for e in energies:
+            f.write("".join(f" filler line {i} of an ionic step\n" for i in range(filler)))
+            f.write(TOTEN.format(e))
+        f.write(truncated_tail)
+
+
+def test_tail_find_line_last_match(tmp_path):
+    path = str(tmp_path / "OUTCAR")
+    write_outcar(path, [-10.0, -11.5, -12.25])
+    line = tail_find_line(path, "free  energy   TOTEN", block_size=64)
+    assert line.split()[-2] == "-12.25000000"
+
+
+def test_tail_find_line_truncated_outcar(tmp_path):
+    # A run killed mid-write: the last ionic step is incomplete
+    path = str(tmp_path / "OUTCAR")
+    write_outcar(path, [-10.0, -11.5], truncated_tail=" filler line 0 of an ionic step\n  free  ener")
+    for block_size in (16, 64, 1 << 16):
+        assert read_dft_energy(path) == pytest.approx(-11.5)
+        assert tail_find_line(path, "free  energy   TOTEN", block_size=block_size).split()[-2] == "-11.50000000"
+
+
+def test_tail_find_line_marker_across_blocks(tmp_path):
+    path = str(tmp_path / "OUTCAR")
+    write_outcar(path, [-7.0], filler=3)
+    size = os.path.getsize(path)
+    for block_size in range(5, 40):
+        line = tail_find_line(path, "TOTEN", block_size=block_size)
+        assert line is not None and line.split()[-2] == "-7.00000000", (block_size, size)
+
+
+def test_tail_find_line_missing(tmp_path):
+    path = str(tmp_path / "OUTCAR")
+    write_outcar(path, [], filler=5)
+    assert tail_find_line(path, "TOTEN") is None
+    open(tmp_path / "empty", "w").close()
+    assert tail_find_line(str(tmp_path / "empty"), "TOTEN") is None
+
+
+def test_oszicar_energy(tmp_path):
+    path = tmp_path / "OSZICAR"
+    path.write_text("DAV: 1 ...\n   1 F= -.12E+02 E0= -.11995E+02  d E =-.1E+02\n")
+    assert read_dft_energy(str(path)) == pytest.approx(-11.995)
+
+
+def test_extract_by_conf_with_missing_run(tmp_path):
+    for i, e in [(0, -1.0), (2, -3.0)]:
+        os.makedirs(tmp_path / f"conf_{i:03d}")
+        write_outcar(str(tmp_path / f"conf_{i:03d}" / "OUTCAR"), [e], filler=2)
+    os.makedirs(tmp_path / "conf_001")
+    energies = extract_dft_energies_by_conf(str(tmp_path), jobs=2)
+    assert energies == {"conf_000": -1.0, "conf_001": None, "conf_002": -3.0}
+    # Second pass comes from the cache
+    assert extract_dft_energies_by_conf(str(tmp_path), jobs=2) == energies
+
+
+def test_compare_energies_matches_ids(tmp_path, capsys):
+    mace = {0: -1.0, 1: -2.0, 2: -3.0}
+    dft = {0: -1.1, 2: -2.8, 3: -4.0}  # conf 1 has no DFT result, conf 3 no MACE energy
+    out = str(tmp_path / "cmp.png")
+    metrics = compare_energies(mace, dft, out, natoms={0: 10, 2: 10}, plot=False)
+    assert metrics["n"] == 2
+    assert metrics["mae"] == pytest.approx(0.15)
+    assert metrics["bias"] == pytest.approx(-0.05)
+    assert "1 MACE-only and 1 DFT-only" in capsys.readouterr().out
+    rows = open(tmp_path / "cmp.csv").read().splitlines()
+    assert rows[0] == "conf,MACE_energy,DFT_energy,difference,difference_per_atom"
+    assert [r.split(",")[0] for r in rows[1:]] == ["conf_000", "conf_002"]
+    assert not os.path.exists(out)
+
+
+def test_compare_energies_no_overlap(tmp_path):
+    with pytest.raises(ValueError):
+        compare_energies({0: -1.0}, {1: -1.0}, str(tmp_path / "cmp.png"), plot=False)
+
+
+def test_energies_by_id_round_trip(tmp_path):
+    path = str(tmp_path / "e.txt")
+    save_energies_by_id({3: -1.5, 0: -2.0}, path)
+    assert load_energies_by_id_from_txt(path) == {0: -2.0, 3: -1.5}
+    with open(path, "w") as f:
+        f.write("-1.0\n\n-2.0\n")
+    assert load_energies_by_id_from_txt(path) == {0: -1.0, 1: -2.0}
@@ -0,0 +1,10 @@
+import sys
+
+from adsgen.benchmark import bench_bo, make_synthetic_system
+
+
+def test_bench_bo_skips_without_boss(tmp_path, monkeypatch):
+    # A None entry in sys.modules makes the module unimportable and invisible to find_spec
+    monkeypatch.setitem(sys.modules, "boss", None)
+    make_synthetic_system(str(tmp_path))
+    assert bench_bo(str(tmp_path), nstruct=2) == {"skipped": "BOSS is not installed"}
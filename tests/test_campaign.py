@@ -0,0 +1,18 @@
+from adsgen.campaign import campaign_dtypes
+
+
+def test_campaign_dtypes_default():
+    assert campaign_dtypes([("a", {}), ("b", {"nstruct": 10})]) == ["float64"]
+
+
+def test_campaign_dtypes_from_execution_profiles():
+    systems = [("a", {"execution": {"dtype": "float32"}}),
+               ("b", {"execution": {"dtype": "float32", "screen_dtype": "float32"}})]
+    assert campaign_dtypes(systems) == ["float32"]
+    systems.append(("c", {"execution": {"dtype": "float64", "screen_dtype": "float32"}}))
+    assert campaign_dtypes(systems) == ["float64", "float32"]
+
+
+def test_campaign_dtypes_validation_needs_float64():
+    systems = [("a", {"execution": {"dtype": "float32"}, "validate_samples": 8})]
+    assert campaign_dtypes(systems) == ["float64", "float32"]
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from adsgen.convergence import ConvergenceMonitor, incumbent_std
+
+
+class FakeResults:
+    """Stand-in for BOSS results holding a nu_glmin history."""
+
+    def __init__(self, nu):
+        self.nu = nu
+
+    def select(self, name, index):
+        assert name == "nu_glmin"
+        return np.array([self.nu[index]])
+
+
+def test_incumbent_std_is_square_root_of_variance():
+    assert incumbent_std(FakeResults([1.0, 1e-4])) == pytest.approx(0.01)
+
+
+def test_incumbent_std_clips_negative_variance():
+    assert incumbent_std(FakeResults([-1e-12])) == 0.0
+
+
+def test_incumbent_std_without_results():
+    assert incumbent_std(object()) is None
+
+
+def test_incumbent_std_criterion_in_ev():
+    monitor = ConvergenceMonitor({"incumbent_std": 0.02})
+    monitor.observe(-1.0)
+    # variance 1e-3 eV² is a std of 0.032 eV, above the threshold
+    assert not monitor(FakeResults([1e-3]))
+    assert monitor(FakeResults([1e-4]))
+    assert "GP std 0.01 eV" in monitor.reason
+
+
+def test_disabled_without_criteria():
+    monitor = ConvergenceMonitor()
+    assert not monitor.enabled
+    for energy in np.linspace(0, 1, 20):
+        monitor.observe(energy)
+    assert monitor.check() is None
+
+
+def test_patience_counts_evaluations_since_improvement():
+    monitor = ConvergenceMonitor({"patience": 3, "min_improvement": 0.1})
+    monitor.observe(-1.0)
+    monitor.observe(-1.05)  # better, but not by min_improvement
+    monitor.observe(-1.0)
+    assert monitor.check() is None
+    monitor.observe(-1.0)
+    assert monitor.check().startswith("stagnation")
+    assert monitor.best == -1.05
+
+
+def test_min_evals_delays_stopping():
+    monitor = ConvergenceMonitor({"patience": 1, "min_evals": 5})
+    for _ in range(4):
+        monitor.observe(0.0)
+    assert monitor.check() is None
+    monitor.observe(0.0)
+    assert monitor.check() is not None
+
+
+def test_non_finite_energies_are_counted_but_not_best():
+    monitor = ConvergenceMonitor({"patience": 10})
+    monitor.observe(np.inf)
+    monitor.observe(-2.0)
+    assert monitor.evaluations == 2
+    assert monitor.best == -2.0
+    assert monitor.best_at == 2
+
+
+def test_add_minimum_uses_last_observed_evaluation():
+    monitor = ConvergenceMonitor()
+    monitor.observe(-1.0)
+    monitor.add_minimum(-1.0)
+    monitor.observe(-2.0)
+    monitor.add_minimum(-2.0)
+    monitor.add_minimum(-2.005)  # same minimum within distinct_tol
+    assert monitor.minima == [-1.0, -2.0]
+    assert monitor.discovered_at == [1, 2]
+    monitor.add_minimum(-3.0, at=7)
+    assert monitor.discovered_at[-1] == 7
+
+
+def test_discovery_rate_window():
+    monitor = ConvergenceMonitor({"discovery_window": 4, "min_discovery_rate": 0.5})
+    for energy in (-1.0, -2.0, -3.0, -4.0):
+        monitor.observe(energy)
+        monitor.add_minimum(energy)
+    assert monitor.check() is None
+    # Two more evaluations finding known minima: 2 new in the last 4
+    for energy in (-1.0, -2.0):
+        monitor.observe(energy)
+        monitor.add_minimum(energy)
+    assert monitor.check() is None
+    monitor.observe(-3.0)
+    monitor.add_minimum(-3.0)
+    assert monitor.check().startswith("discovery rate: 1 new")
+
+
+def test_reason_is_kept_once_stopped():
+    monitor = ConvergenceMonitor({"patience": 1})
+    monitor.observe(0.0)
+    monitor.observe(0.0)
+    assert monitor(FakeResults([1.0]))
+    reason = monitor.reason
+    monitor.observe(-5.0)
+    assert monitor(FakeResults([1.0]))
+    assert monitor.reason == reason
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from adsgen.domains import (MIN_DOMAIN_ITERPTS, default_split_dims, domain_points, grid_shape, split_bounds,
+                            split_budget)
+
+BOUNDS = {"x": (0.0, 4.0), "y": (0.0, 3.0), "z": (0.0, 5.0), "alpha": (0.0, 360.0), "beta": (0, 0), "gamma": (0, 0)}
+
+
+@pytest.mark.parametrize("n, dims, shape", [(1, 2, [1, 1]), (4, 2, [2, 2]), (6, 2, [3, 2]), (12, 2, [3, 4]),
+                                            (7, 2, [7, 1]), (8, 3, [2, 2, 2]), (5, 1, [5])])
+def test_grid_shape(n, dims, shape):
+    assert grid_shape(n, dims) == shape
+    assert int(np.prod(grid_shape(n, dims))) == n
+
+
+def test_default_split_dims():
+    assert default_split_dims(["x", "y", "alpha"]) == ["x", "y"]
+    assert default_split_dims(["z", "alpha", "beta"]) == ["alpha"]
+    with pytest.raises(ValueError):
+        default_split_dims(["z"])
+
+
+def test_split_bounds_tiles_the_box():
+    domains = split_bounds(BOUNDS, 6, ["x", "y"])
+    assert len(domains) == 6
+    volume = sum((d["x"][1] - d["x"][0]) * (d["y"][1] - d["y"][0]) for d in domains)
+    assert volume == pytest.approx(12.0)
+    assert {d["x"] for d in domains} == {(0.0, 4 / 3), (4 / 3, 8 / 3), (8 / 3, 4.0)}
+    assert {d["y"] for d in domains} == {(0.0, 1.5), (1.5, 3.0)}
+    # Dimensions that are not split keep their bounds
+    assert all(d["alpha"] == BOUNDS["alpha"] and d["z"] == BOUNDS["z"] for d in domains)
+
+
+def test_split_budget():
+    assert split_budget(10, 4) == [3, 3, 2, 2]
+    assert sum(split_budget(4000, 16)) == 4000
+
+
+def test_domain_points_leave_room_for_bo():
+    # A budget above the single-run nstruct <= 10 rule must still run BO
+    for n in split_budget(40, 4):
+        initpts, iterpts = domain_points(n)
+        assert initpts + iterpts == n
+        assert iterpts >= MIN_DOMAIN_ITERPTS
+    assert domain_points(250) == (50, 200)
+    assert domain_points(100, init_fraction=0.5) == (50, 50)
+
+
+def test_domain_points_tiny_budget():
+    assert domain_points(2) == (2, 0)
+    assert domain_points(1) == (1, 0)
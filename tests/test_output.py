@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pytest
+from ase.build import molecule
+from ase.calculators.emt import EMT
+from ase.io import read
+
+from adsgen.output import StructureWriter
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return (str(tmp_path / "initial.xyz"), str(tmp_path / "opt.traj"), str(tmp_path / "combined.xyz"))
+
+
+def frames(n):
+    out = []
+    for i in range(n):
+        atoms = molecule("CO", cell=[10, 10, 10], pbc=True)
+        atoms.positions += 0.1 * i
+        out.append(atoms)
+    return out
+
+
+def relaxed_frames(n):
+    out = []
+    for atoms in frames(n):
+        atoms.positions[1, 2] += 0.05
+        atoms.calc = EMT()
+        atoms.get_forces()
+        out.append(atoms)
+    return out
+
+
+def test_round_trip_extxyz_and_traj(paths):
+    initial_file, traj_file, combined_file = paths
+    initial, relaxed = frames(3), relaxed_frames(2)
+    writer = StructureWriter(initial_file, traj_file, combined_file, flush_every=2)
+    for atoms in initial:
+        writer.write_initial(atoms)
+    for atoms in relaxed:
+        writer.write_relaxed(atoms)
+    assert writer.close() == combined_file
+
+    read_initial = read(initial_file, index=":")
+    assert len(read_initial) == 3
+    for a, b in zip(initial, read_initial):
+        assert np.allclose(a.positions, b.positions)
+        assert a.get_chemical_symbols() == b.get_chemical_symbols()
+        assert np.allclose(a.cell, b.cell)
+        assert b.calc is None
+
+    traj = read(traj_file, index=":")
+    assert len(traj) == 2
+    for a, b in zip(relaxed, traj):
+        assert np.allclose(a.positions, b.positions)
+        assert b.get_potential_energy() == pytest.approx(a.get_potential_energy())
+        assert np.allclose(b.get_forces(), a.get_forces())
+
+
+def test_combined_file_holds_initial_then_relaxed_frames(paths):
+    initial_file, traj_file, combined_file = paths
+    initial, relaxed = frames(2), relaxed_frames(3)
+    writer = StructureWriter(initial_file, traj_file, combined_file)
+    for atoms in relaxed:
+        writer.write_relaxed(atoms)
+    for atoms in initial:
+        writer.write_initial(atoms)
+    writer.close()
+
+    combined = read(combined_file, index=":")
+    assert len(combined) == 5
+    for a, b in zip(initial + relaxed, combined):
+        assert np.allclose(a.positions, b.positions)
+    assert all(b.calc is None for b in combined[:2])
+    for a, b in zip(relaxed, combined[2:]):
+        assert b.get_potential_energy() == pytest.approx(a.get_potential_energy())
+        assert np.allclose(b.get_forces(), a.get_forces())
+    assert not os.path.exists(writer.relaxed_xyz_file)
+
+
+def test_relaxed_frame_keeps_only_frame_properties(paths):
+    writer = StructureWriter(*paths)
+    atoms = relaxed_frames(1)[0]
+    atoms.calc.results["magmoms"] = np.ones(len(atoms))
+    writer.write_relaxed(atoms)
+    writer.close()
+    frame = read(paths[2])
+    assert "energy" in frame.calc.results and "forces" in frame.calc.results
+    assert "magmoms" not in frame.calc.results and "magmoms" not in frame.arrays
+
+
+def test_flush_every_makes_frames_readable_before_close(paths):
+    initial_file = paths[0]
+    writer = StructureWriter(*paths, flush_every=2)
+    initial = frames(3)
+    writer.write_initial(initial[0])
+    writer.write_initial(initial[1])
+    assert len(read(initial_file, index=":")) == 2
+    writer.write_initial(initial[2])
+    writer.close()
+    assert len(read(initial_file, index=":")) == 3
+
+
+def test_empty_run(paths):
+    writer = StructureWriter(*paths)
+    writer.close()
+    assert os.path.getsize(paths[2]) == 0
@@ -0,0 +1,37 @@
+import numpy as np
+
+from adsgen.pose_cache import PoseCache
+
+
+def test_molecular_symmetry_hit(make_engine, nh3):
+    cache = PoseCache(make_engine(mol=nh3), tol=0.05)
+    assert len(cache.rotations) == 3
+    cache.add(np.array([1.0, 1.0, 10.0]), -3.5, step=4)
+    # C3 images of the molecule about its own axis
+    assert cache.lookup(np.array([1.0, 1.0, 130.0])) == (-3.5, 4)
+    assert cache.lookup(np.array([1.0, 1.0, 250.0])) == (-3.5, 4)
+    assert cache.lookup(np.array([1.0, 1.0, 70.0])) is None
+    assert cache.hits == 2 and cache.lookups == 3
+
+
+def test_angle_wraparound_hit(make_engine, nh3):
+    cache = PoseCache(make_engine(mol=nh3), tol=0.05)
+    cache.add(np.array([1.0, 1.0, 0.5]), -1.0, step=1)
+    assert cache.lookup(np.array([1.0, 1.0, 359.8])) == (-1.0, 1)
+
+
+def test_lattice_translation_and_cell_edge_hits(make_engine):
+    engine = make_engine()
+    lx, ly = engine.cell.lengths()[:2]
+    cache = PoseCache(engine, tol=0.05)
+    cache.add(np.array([0.01, 2.0, 45.0]), -2.0, step=1)
+    assert cache.lookup(np.array([0.01 + lx, 2.0 + ly, 45.0])) == (-2.0, 1)
+    # Across the cell edge: 0.02 Å apart through the periodic boundary
+    assert cache.lookup(np.array([lx - 0.01, 2.0, 45.0])) == (-2.0, 1)
+    assert cache.lookup(np.array([0.5, 2.0, 45.0])) is None
+
+
+def test_empty_cache(make_engine):
+    cache = PoseCache(make_engine())
+    assert cache.lookup(np.array([0.0, 0.0, 0.0])) is None
+    assert cache.hit_rate == 0.0
@@ -0,0 +1,64 @@
+import warnings
+
+import numpy as np
+import pytest
+from ase.calculators.emt import EMT
+
+from adsgen.benchmark import CalculatorEvaluator
+from adsgen.relaxation import count_calls, relax_batch_staged, relax_structure
+
+
+class CountingEMT(EMT):
+    """EMT that counts its calculations at the class level, out of reach of count_calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.calculations = 0
+
+    def calculate(self, *args, **kwargs):
+        self.calculations += 1
+        return super().calculate(*args, **kwargs)
+
+
+def _candidates(make_engine, n, seed=1):
+    engine = make_engine()
+    rng = np.random.default_rng(seed)
+    return [engine.build(rng.random(3) * [3.0, 3.0, 360.0]) for _ in range(n)]
+
+
+def test_force_calls_are_actual_calculations(make_engine):
+    for atoms in _candidates(make_engine, 3):
+        calc = CountingEMT()
+        stats = {}
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            relax_structure(atoms, calc, fmax=0.05, steps=150, loose_fmax=0.3, stats=stats)
+        assert stats["force_calls"] == calc.calculations
+        assert stats["opt_steps"] > 0
+
+
+def test_count_calls_restores_calculate():
+    calc = EMT()
+    stats = {}
+    with count_calls(calc, stats):
+        assert "calculate" in vars(calc)
+    assert "calculate" not in vars(calc)
+
+
+def test_batched_force_calls_one_per_step(make_engine):
+    candidates = _candidates(make_engine, 2)
+    stats = [{} for _ in candidates]
+    outcome = relax_batch_staged(candidates, CalculatorEvaluator(EMT()), fmax=0.1, steps=60, stats=stats)
+    assert [stage for _, stage in outcome] == ["tight", "tight"]
+    for s in stats:
+        assert s["force_calls"] == s["opt_steps"] + 1
+
+
+@pytest.mark.filterwarnings("ignore:Armijo linesearch failed")
+@pytest.mark.parametrize("screen_cutoff", [-np.inf, np.inf])
+def test_single_point_screen(make_engine, screen_cutoff):
+    atoms = _candidates(make_engine, 1)[0]
+    stats = {}
+    energy, stage = relax_structure(atoms, EMT(), fmax=0.1, steps=5, screen_cutoff=screen_cutoff, stats=stats)
+    assert stage == ("single-point" if screen_cutoff == -np.inf else "tight")
+    assert np.isfinite(energy)
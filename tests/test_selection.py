@@ -0,0 +1,43 @@
+import numpy as np
+
+from adsgen.selection import DistanceHistogram, farthest_point_sampling, k_medoids, select_diverse
+
+
+def _clusters(seed=0):
+    rng = np.random.default_rng(seed)
+    centers = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0], [10.0, 10.0]])
+    return np.vstack([c + rng.normal(0, 0.1, (25, 2)) for c in centers]), np.repeat(np.arange(4), 25)
+
+
+def test_fps_covers_every_cluster():
+    X, labels = _clusters()
+    picked = farthest_point_sampling(X, 4)
+    assert sorted(labels[picked]) == [0, 1, 2, 3]
+
+
+def test_fps_stops_at_duplicates():
+    X = np.array([[0.0, 0.0], [1.0, 1.0], [1.0, 1.0], [0.0, 0.0]])
+    assert len(farthest_point_sampling(X, 4)) == 2
+
+
+def test_k_medoids_one_per_cluster():
+    X, labels = _clusters(1)
+    medoids = k_medoids(X, 4)
+    assert len(medoids) == 4
+    assert sorted(labels[medoids]) == [0, 1, 2, 3]
+
+
+def test_select_diverse_all_when_small():
+    assert list(select_diverse(np.zeros((3, 2)), 5)) == [0, 1, 2]
+
+
+def test_distance_histogram_invariant_to_lattice_shift(make_engine):
+    engine = make_engine()
+    lx = engine.cell.lengths()[0]
+    descriptor = DistanceHistogram(engine.numbers, n_slab=engine.n_slab)
+    a = descriptor(engine.build(np.array([1.0, 1.0, 30.0])))
+    b = descriptor(engine.build(np.array([1.0 + lx, 1.0, 30.0])))
+    c = descriptor(engine.build(np.array([1.9, 1.3, 30.0])))
+    assert a.shape == (descriptor.size,)
+    assert np.allclose(a, b)
+    assert not np.allclose(a, c)
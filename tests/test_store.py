@@ -0,0 +1,35 @@
+import numpy as np
+from ase.build import molecule
+from ase.calculators.singlepoint import SinglePointCalculator
+
+from adsgen.store import EvaluationStore
+
+
+def relaxed(z, energy):
+    atoms = molecule("CO")
+    atoms.positions[:, 2] += z
+    atoms.calc = SinglePointCalculator(atoms, energy=energy, forces=np.zeros((2, 3)))
+    return atoms
+
+
+def test_initial_structures_are_kept_apart_from_evaluations(tmp_path):
+    store = EvaluationStore(str(tmp_path / "evaluations.db"))
+    for z in (1.0, 2.0, 3.0):
+        initial = molecule("CO")
+        initial.positions[:, 2] += z
+        store.add_initial(initial)
+    store.add(2, np.arange(6.0), relaxed(2.0, -2.0))
+    store.add(1, np.zeros(6), relaxed(1.0, -1.0))
+
+    assert len(store) == 2
+    assert [(step, energy) for step, _, _, energy in store.load()] == [(1, -1.0), (2, -2.0)]
+    # Initial structures of every pose, relaxed or not, in the order written
+    z = [atoms.positions[0, 2] - molecule("CO").positions[0, 2] for atoms in store.load_initial()]
+    assert np.allclose(z, [1.0, 2.0, 3.0])
+
+
+def test_reopened_store_keeps_initial_structures(tmp_path):
+    path = str(tmp_path / "evaluations.db")
+    EvaluationStore(path).add_initial(molecule("CO"))
+    assert len(EvaluationStore(path).load_initial()) == 1
+    assert EvaluationStore(path, fresh=True).load_initial() == []
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from ase.calculators.emt import EMT
+
+from adsgen.symmetry import SearchDomain, lattice_translations, molecule_rotations, z_rotation_order
+
+FULL = {"x": (0, 10.21), "y": (0, 8.84), "z": (0, 5.0), "alpha": (0, 360), "beta": (0, 360), "gamma": (0, 360)}
+
+
+def test_lattice_translations_count_primitive_cells(make_engine):
+    engine = make_engine()
+    translations = lattice_translations(engine.slab_positions, engine.slab_numbers, engine.cell)
+    assert len(translations) == 16
+    assert np.allclose(translations[0], 0.0)
+
+
+def test_molecule_rotations(nh3):
+    local = nh3.get_positions() - nh3.get_center_of_mass()
+    rotations = molecule_rotations(local, nh3.numbers)
+    assert len(rotations) == 3
+    assert z_rotation_order(rotations) == 3
+
+
+def test_bounds_cu111_co(make_engine):
+    domain = SearchDomain(make_engine(), ["x", "y", "alpha"], FULL)
+    assert domain.n == 1 and domain.m == 3
+    assert domain.bounds["x"] == pytest.approx((0.0, 2.5527), abs=1e-3)
+    assert domain.bounds["y"] == pytest.approx((0.0, 2.2107), abs=1e-3)
+    assert domain.bounds["alpha"] == (0.0, 120.0)
+    # 16 cells x 3 rotations, up to the given box not being exactly the slab cell
+    assert domain.reduction == pytest.approx(48.0, rel=1e-2)
+
+
+def test_slab_rotation_dropped_with_tilts(make_engine, nh3):
+    engine = make_engine(opt_dims=("x", "y", "alpha", "beta"), mol=nh3)
+    domain = SearchDomain(engine, ["x", "y", "alpha", "beta"], FULL)
+    assert domain.m == 1 and domain.n == 3
+    assert domain.bounds["alpha"] == (0.0, 120.0)
+    assert domain.bounds["beta"] == FULL["beta"]
+
+
+def test_tolerance_reaches_molecule(make_engine, nh3):
+    distorted = nh3.copy()
+    distorted.positions[1] += [0.03, 0.0, 0.0]
+    dims = ("x", "y", "alpha", "beta")
+    engine = make_engine(opt_dims=dims, mol=distorted)
+    assert SearchDomain(engine, dims, FULL, tol=0.1).n == 3
+    assert SearchDomain(engine, dims, FULL, tol=0.01).n == 1
+
+
+@pytest.mark.parametrize("pose", [[0, 0, 1, 0, 0, 0], [0.3, 0.2, 1, 359.9999999, 0, 0],
+                                  [2.5527, 2.2107, 1, 119.9999999, 0, 0]])
+def test_expand_has_no_edge_duplicates(make_engine, pose):
+    domain = SearchDomain(make_engine(), ["x", "y", "alpha"], FULL)
+    images = domain.expand(pose)
+    assert len(images) == 48
+    lengths = domain.engine.cell.lengths()
+    assert np.all(images[:, 0] >= 0) and np.all(images[:, 0] < lengths[0] - 1e-4)
+    assert np.all(images[:, 1] >= 0) and np.all(images[:, 1] < lengths[1] - 1e-4)
+    assert np.all(images[:, 3] >= 0) and np.all(images[:, 3] < 360 - 1e-4)
+
+
+def test_expanded_images_are_equivalent(make_engine):
+    engine = make_engine()
+    domain = SearchDomain(engine, ["x", "y", "alpha"], FULL)
+    images = domain.expand([0.7, 0.4, 0.5, 17.0, 0, 0])
+    energies = []
+    for image in images[::7]:
+        atoms = engine.build(engine.points(image[None, :]))
+        atoms.calc = EMT()
+        energies.append(atoms.get_potential_energy())
+    assert np.ptp(energies) < 1e-5
+
+
+def test_write_expanded(make_engine, tmp_path):
+    domain = SearchDomain(make_engine(), ["x", "y", "alpha"], FULL)
+    path = domain.write_expanded([[0, 0, 1, 0, 0, 0]], [-1.5], str(tmp_path / "full.csv"))
+    rows = open(path).read().splitlines()
+    assert rows[0] == "step,image,x,y,z,alpha,beta,gamma,energy"
+    assert len(rows) == 49
+    assert len(set(rows[1:])) == 48
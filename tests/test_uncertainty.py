@@ -0,0 +1,70 @@
+import csv
+
+import numpy as np
+import pytest
+from ase.build import molecule
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io import read, write
+
+from adsgen.uncertainty import is_relaxed, select_uncertain
+
+
+class SpreadCommittee:
+    """Two-model committee whose force disagreement is each frame's info["spread"]."""
+
+    def __init__(self):
+        self.scored = []
+
+    def __call__(self, atoms_list):
+        self.scored.extend(atoms.info["spread"] for atoms in atoms_list)
+        forces = []
+        for atoms in atoms_list:
+            f = np.zeros((2, len(atoms), 3))
+            f[1, :, 0] = 2 * atoms.info["spread"]
+            forces.append(f)
+        return np.zeros((2, len(atoms_list))), forces
+
+
+@pytest.fixture
+def combined_xyz(tmp_path):
+    """Combined run output: unrelaxed initial frames first, then relaxed frames with energies."""
+    frames = []
+    for spread in (9.0, 8.0):
+        atoms = molecule("CO")
+        atoms.info["spread"] = spread
+        frames.append(atoms)
+    for spread in (1.0, 3.0, 2.0):
+        atoms = molecule("CO")
+        atoms.info["spread"] = spread
+        atoms.calc = SinglePointCalculator(atoms, energy=-spread, forces=np.zeros((2, 3)))
+        frames.append(atoms)
+    path = str(tmp_path / "combined.xyz")
+    write(path, frames)
+    return path
+
+
+def test_is_relaxed_after_round_trip(combined_xyz):
+    assert [is_relaxed(a) for a in read(combined_xyz, index=":")] == [False, False, True, True, True]
+
+
+def test_scores_only_relaxed_frames_by_default(combined_xyz, tmp_path):
+    committee = SpreadCommittee()
+    out = str(tmp_path / "uncertain.xyz")
+    selected = select_uncertain(combined_xyz, out, 2, committee, batch_size=2)
+    assert sorted(committee.scored) == [1.0, 2.0, 3.0]
+    assert selected.tolist() == [3, 4]
+    assert [a.info["spread"] for a in read(out, index=":")] == [3.0, 2.0]
+    with open(str(tmp_path / "uncertain.scores.csv")) as f:
+        assert [int(row["index"]) for row in csv.DictReader(f)] == [2, 3, 4]
+
+
+def test_scores_all_frames_on_request(combined_xyz, tmp_path):
+    committee = SpreadCommittee()
+    selected = select_uncertain(combined_xyz, str(tmp_path / "uncertain.xyz"), 2, committee, frames="all")
+    assert len(committee.scored) == 5
+    assert selected.tolist() == [0, 1]
+
+
+def test_unknown_frames_choice(combined_xyz, tmp_path):
+    with pytest.raises(ValueError):
+        select_uncertain(combined_xyz, str(tmp_path / "out.xyz"), 1, SpreadCommittee(), frames="initial")
@@ -0,0 +1,110 @@
+import errno
+import os
+
+import pytest
+from ase.build import molecule
+from ase.io import Trajectory
+
+from adsgen import vasp_io
+from adsgen.vasp_io import _place, traj_to_vasp_inputs
+
+
+@pytest.fixture
+def src(tmp_path):
+    path = tmp_path / "INCAR"
+    path.write_text("ENCUT = 400\n")
+    return str(path)
+
+
+def refuse_links(monkeypatch, code):
+    def link(src, dst):
+        raise OSError(code, os.strerror(code))
+    monkeypatch.setattr(vasp_io.os, "link", link)
+
+
+def test_hardlink_when_possible(src, tmp_path):
+    dst = str(tmp_path / "conf" / "INCAR")
+    os.makedirs(os.path.dirname(dst))
+    assert _place(src, dst, "hardlink") == "hardlink"
+    assert os.path.samefile(src, dst) and not os.path.islink(dst)
+
+
+@pytest.mark.parametrize("code", [errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP])
+def test_hardlink_falls_back_to_relative_symlink(src, tmp_path, monkeypatch, code):
+    refuse_links(monkeypatch, code)
+    dst = str(tmp_path / "conf" / "INCAR")
+    os.makedirs(os.path.dirname(dst))
+    assert _place(src, dst, "hardlink") == "symlink"
+    assert os.readlink(dst) == os.path.join("..", "INCAR")
+    assert open(dst).read() == "ENCUT = 400\n"
+
+
+def test_unexpected_hardlink_error_is_raised(src, tmp_path, monkeypatch):
+    refuse_links(monkeypatch, errno.ENOSPC)
+    with pytest.raises(OSError):
+        _place(src, str(tmp_path / "dst"), "hardlink")
+
+
+def test_symlink_and_copy_modes(src, tmp_path):
+    assert _place(src, str(tmp_path / "link"), "symlink") == "symlink"
+    assert os.path.islink(str(tmp_path / "link"))
+    assert _place(src, str(tmp_path / "copy"), "copy") == "copy"
+    assert not os.path.islink(str(tmp_path / "copy"))
+    assert not os.path.samefile(src, str(tmp_path / "copy"))
+
+
+def test_existing_destination_is_replaced(src, tmp_path):
+    dst = str(tmp_path / "dst")
+    os.symlink("missing", dst)
+    assert _place(src, dst, "copy") == "copy"
+    assert open(dst).read() == "ENCUT = 400\n"
+
+
+@pytest.fixture
+def vasp_setup(tmp_path):
+    template = tmp_path / "template"
+    template.mkdir()
+    for name in ("INCAR", "KPOINTS", "POTCAR"):
+        (template / name).write_text(f"{name}\n")
+    traj = str(tmp_path / "opt.traj")
+    with Trajectory(traj, "w") as t:
+        for _ in range(3):
+            t.write(molecule("CO", cell=[8, 8, 8], pbc=True))
+    return traj, str(template), str(tmp_path / "vasp_inputs")
+
+
+def test_traj_to_vasp_inputs_hardlinks(vasp_setup):
+    traj, template, out = vasp_setup
+    summary = traj_to_vasp_inputs(traj, out, link="hardlink", jobs=2, template_dir=template)
+    assert summary["folders"] == 3
+    assert summary["placed"] == {"hardlink": 9}
+    assert summary["bytes_avoided"] == 3 * len("INCAR\nKPOINTS\nPOTCAR\n")
+    for i in range(3):
+        folder = os.path.join(out, f"conf_{i:03d}")
+        assert sorted(os.listdir(folder)) == ["INCAR", "KPOINTS", "POSCAR", "POTCAR"]
+        assert os.path.samefile(os.path.join(folder, "POTCAR"), os.path.join(out, "shared", "POTCAR"))
+
+
+def test_traj_to_vasp_inputs_falls_back_across_filesystems(vasp_setup, monkeypatch):
+    traj, template, out = vasp_setup
+    refuse_links(monkeypatch, errno.EXDEV)
+    summary = traj_to_vasp_inputs(traj, out, link="hardlink", template_dir=template)
+    assert summary["placed"] == {"symlink": 9}
+    assert os.path.islink(os.path.join(out, "conf_000", "INCAR"))
+
+
+def test_traj_to_vasp_inputs_shared_mode(vasp_setup):
+    traj, template, out = vasp_setup
+    summary = traj_to_vasp_inputs(traj, out, link="shared", template_dir=template)
+    assert summary["placed"] == {}
+    assert os.listdir(os.path.join(out, "conf_002")) == ["POSCAR"]
+    assert summary["bytes_avoided"] == 3 * len("INCAR\nKPOINTS\nPOTCAR\n")
+
+
+def test_traj_to_vasp_inputs_checks_inputs(vasp_setup):
+    traj, template, out = vasp_setup
+    with pytest.raises(ValueError):
+        traj_to_vasp_inputs(traj, out, link="reflink", template_dir=template)
+    os.remove(os.path.join(template, "KPOINTS"))
+    with pytest.raises(FileNotFoundError):
+        traj_to_vasp_inputs(traj, out, template_dir=template)
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+from ase.build import molecule
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io import read, write
+
+from adsgen import vasp_single_step_opt as vasp
+from adsgen.vasp_single_step_opt import outcar_finished, run_single_step_optimization
+
+FINISHED = "General timing and accounting informations for this job:\n"
+
+
+class FakeVasp:
+    """Stand-in for _run_job: tags each structure with its index and writes a finished OUTCAR."""
+
+    def __init__(self, delay=0.05, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, i, atoms, workdir, command):
+        with self.lock:
+            self.calls.append((i, command))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            # Later structures finish first, so results arrive out of order
+            time.sleep(self.delay * (1 + 1 / (i + 1)))
+            if i in self.fail:
+                raise RuntimeError("VASP crashed")
+            os.makedirs(workdir, exist_ok=True)
+            with open(os.path.join(workdir, "OUTCAR"), "w") as f:
+                f.write(FINISHED)
+            atoms.calc = SinglePointCalculator(atoms, energy=-float(i), forces=np.zeros((len(atoms), 3)))
+            return atoms, self.delay
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def run_dir(tmp_path, monkeypatch):
+    """Output dir with six structures; finished OUTCARs are read back as a frame tagged energy 100 + index."""
+    frames = []
+    for i in range(6):
+        atoms = molecule("CO")
+        atoms.positions[:, 2] += i
+        frames.append(atoms)
+    write(str(tmp_path / "training_data_mace_opt.xyz"), frames)
+
+    def read_outcar(path, index=None):
+        if os.path.basename(path) != "OUTCAR":
+            return read(path, index=index)
+        i = int(os.path.basename(os.path.dirname(path)).split("_")[-1])
+        atoms = molecule("CO")
+        atoms.calc = SinglePointCalculator(atoms, energy=100.0 + i)
+        return atoms
+    monkeypatch.setattr(vasp, "read", read_outcar)
+    return str(tmp_path)
+
+
+def events(run_dir):
+    with open(os.path.join(run_dir, "events.jsonl")) as f:
+        return [json.loads(line) for line in f if '"vasp_job"' in line]
+
+
+def energies(run_dir):
+    return [a.get_potential_energy() for a in read(os.path.join(run_dir, "training_data_vasp_opt.xyz"), index=":")]
+
+
+@pytest.mark.parametrize("max_jobs", [1, 3])
+def test_runs_at_most_max_jobs_at_once(run_dir, monkeypatch, max_jobs):
+    fake = FakeVasp()
+    monkeypatch.setattr(vasp, "_run_job", fake)
+    run_single_step_optimization(output_dir=run_dir, max_jobs=max_jobs, vasp_command="vasp {index} {workdir}")
+    assert fake.max_active == max_jobs
+    assert sorted(fake.calls) == [(i, f"vasp {i} {os.path.join(run_dir, f'vasp_opt_{i}')}") for i in range(6)]
+    # Written in structure order although jobs finish out of order
+    assert energies(run_dir) == [0.0, -1.0, -2.0, -3.0, -4.0, -5.0]
+
+
+def test_rerun_skips_finished_jobs(run_dir, monkeypatch):
+    fake = FakeVasp(fail={2, 4})
+    monkeypatch.setattr(vasp, "_run_job", fake)
+    log = os.path.join(run_dir, "events.jsonl")
+    run_single_step_optimization(output_dir=run_dir, max_jobs=2, event_log=log)
+    assert [e["outcome"] for e in sorted(events(run_dir), key=lambda e: e["index"])] == \
+        ["finished", "finished", "failed", "finished", "failed", "finished"]
+    assert energies(run_dir) == [0.0, -1.0, -3.0, -5.0]
+
+    rerun = FakeVasp()
+    monkeypatch.setattr(vasp, "_run_job", rerun)
+    run_single_step_optimization(output_dir=run_dir, max_jobs=2, event_log=log)
+    # Only the failed structures run again; finished ones are read back from their OUTCARs
+    assert sorted(i for i, _ in rerun.calls) == [2, 4]
+    second = sorted(events(run_dir)[6:], key=lambda e: e["index"])
+    assert [e["outcome"] for e in second] == ["skipped", "skipped", "finished", "skipped", "finished", "skipped"]
+    assert energies(run_dir) == [100.0, 101.0, -2.0, 103.0, -4.0, 105.0]
+
+
+def test_rerun_without_skip_completed_runs_everything(run_dir, monkeypatch):
+    monkeypatch.setattr(vasp, "_run_job", FakeVasp(delay=0.0))
+    run_single_step_optimization(output_dir=run_dir, max_jobs=2)
+    rerun = FakeVasp(delay=0.0)
+    monkeypatch.setattr(vasp, "_run_job", rerun)
+    run_single_step_optimization(output_dir=run_dir, max_jobs=2, skip_completed=False)
+    assert len(rerun.calls) == 6
+
+
+def test_outcar_finished(tmp_path):
+    workdir = str(tmp_path)
+    assert not outcar_finished(workdir)
+    outcar = os.path.join(workdir, "OUTCAR")
+    with open(outcar, "w") as f:
+        f.write("running\n")
+    assert not outcar_finished(workdir)
+    with open(outcar, "a") as f:
+        f.write("x" * 100000 + "\n" + FINISHED + "y" * 1000)
+    assert outcar_finished(workdir)
+
+
+def test_skip_vasp_and_missing_input(run_dir, tmp_path, monkeypatch):
+    fake = FakeVasp()
+    monkeypatch.setattr(vasp, "_run_job", fake)
+    run_single_step_optimization(skip_vasp=True, output_dir=run_dir)
+    assert fake.calls == []
+    with pytest.raises(FileNotFoundError):
+        run_single_step_optimization(output_dir=str(tmp_path / "missing"))
@@ -0,0 +1,51 @@
+import json
+
+import numpy as np
+
+from adsgen.instrumentation import EventLog, relaxed_opt_steps
+from adsgen.warm_start import WarmStartIndex
+
+
+def test_warm_start_keeps_placement(make_engine, nh3):
+    engine = make_engine(mol=nh3)
+    index = WarmStartIndex(engine, radius=0.5)
+    relaxed = engine.build(np.array([1.0, 1.0, 0.0]))
+    positions = relaxed.get_positions()
+    positions[engine.n_slab:] += np.random.default_rng(0).normal(0, 0.05, (4, 3))
+    relaxed.set_positions(positions)
+    index.add(np.array([1.0, 1.0, 0.0]), relaxed, step=3, opt_steps=40)
+
+    candidate = engine.build(np.array([1.1, 1.0, 5.0]))
+    placed = candidate.get_positions()[engine.n_slab:]
+    assert index.apply(np.array([1.1, 1.0, 5.0]), candidate) == (3, 40)
+    moved = candidate.get_positions()[engine.n_slab:]
+    # Same centre as the placed molecule, internal distances of the relaxed one
+    assert np.allclose(moved.mean(axis=0), placed.mean(axis=0))
+    relaxed_mol = relaxed.get_positions()[engine.n_slab:]
+    d = lambda p: np.linalg.norm(p[:, None] - p[None], axis=-1)
+    assert np.allclose(d(moved), d(relaxed_mol))
+    assert index.apply(np.array([3.0, 3.0, 60.0]), engine.build(np.array([3.0, 3.0, 60.0]))) is None
+    assert index.hits == 1
+
+
+def test_summary_totals_steps_saved_including_losses(tmp_path):
+    events = EventLog(str(tmp_path / "events.jsonl"))
+    events.emit("evaluation", phases={}, outcome="relaxed", step=1, opt_steps=50)
+    events.emit("evaluation", phases={}, outcome="relaxed", step=2, opt_steps=30, warm_start=1,
+                neighbor_steps=50, steps_saved=20)
+    events.emit("evaluation", phases={}, outcome="relaxed", step=3, opt_steps=45, warm_start=2,
+                neighbor_steps=30, steps_saved=-15)
+    summary = events.summary()
+    events.close()
+    assert "5 total, 2.5 mean, 1 of 2 warm starts took more steps" in summary
+
+
+def test_relaxed_opt_steps_for_resume(tmp_path):
+    path = tmp_path / "events.jsonl"
+    assert relaxed_opt_steps(str(path)) == {}
+    with open(path, "w") as f:
+        f.write(json.dumps({"event": "evaluation", "outcome": "relaxed", "step": 1, "opt_steps": 12}) + "\n")
+        f.write(json.dumps({"event": "evaluation", "outcome": "screened", "opt_steps": 3}) + "\n")
+        f.write(json.dumps({"event": "evaluation", "outcome": "relaxed", "step": 2, "opt_steps": 7}) + "\n")
+        f.write('{"event": "evaluation", "outc')
+    assert relaxed_opt_steps(str(path)) == {1: 12, 2: 7}
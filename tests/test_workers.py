@@ -0,0 +1,21 @@
+from adsgen.workers import worker_cores, worker_threads
+
+
+def test_worker_threads_default():
+    assert worker_threads(2) == (2, 1)
+    assert worker_threads(2, {"dtype": "float32"}) == (2, 1)
+
+
+def test_worker_threads_from_execution_profile():
+    assert worker_threads(1, {"intra_threads": 4}) == (4, 1)
+    assert worker_threads(1, {"intra_threads": 4, "interop_threads": 2}) == (4, 2)
+
+
+def test_worker_cores_disjoint_blocks():
+    cores = list(range(8))
+    blocks = [worker_cores(cores, 3, slot) for slot in range(3)]
+    assert blocks == [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+
+def test_worker_cores_fewer_cores_than_workers():
+    assert [worker_cores([4, 5], 3, slot) for slot in range(3)] == [[4], [5], [4]]